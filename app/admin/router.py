@@ -0,0 +1,130 @@
+# app/admin/router.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from app.auth.config import verify_admin_token
+from app.auth.state import oauth_store
+from app.core.cache import response_cache
+from app.core.http_client import http_pool_stats
+from app.core.resilience import resilience_stats
+from app.core.result_sets import result_sets
+from app.core.singleflight import coalescing_stats
+from app.main_ref import mcp
+from app.repositories.sharding import parse_day
+from app.repositories.transactions_store import get_transaction_store
+from app.services.catalog import item_catalog
+from app.services.items import get_items_async
+from app.services.purchases import get_purchases_async
+from app.services.sales import get_sales_async
+from app.services.transactions_mirror import sync_once
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(verify_admin_token)])
+
+
+class FlushRequest(BaseModel):
+    endpoint: Optional[str] = None  # e.g. "/api/Items/GetAllItems"; all entries when omitted
+
+
+class TransactionsRange(BaseModel):
+    from_date: str
+    to_date: str
+    transaction_type_id: Optional[int] = None
+    item_id: Optional[str] = None
+    item_name: Optional[str] = None
+    partner_name: Optional[str] = None
+
+
+class DirtyRequest(BaseModel):
+    transaction_type_id: int
+    from_date: str
+    to_date: str
+
+
+class WarmRequest(BaseModel):
+    item_pages: List[int] = []
+    page_size: int = 20
+    sales: List[TransactionsRange] = []
+    purchases: List[TransactionsRange] = []
+
+
+@router.get("/diagnostics")
+async def diagnostics():
+    """Upstream pool, breaker/limiter state per host, request coalescing and auth state."""
+    return {
+        "http_pool": http_pool_stats(),
+        "upstream": resilience_stats(),
+        "coalescing": coalescing_stats(),
+        "auth_cache": mcp.auth.stats(),
+        "oauth": oauth_store.stats(),
+    }
+
+
+@router.get("/cache")
+async def cache_stats():
+    return response_cache.stats()
+
+
+@router.post("/cache/flush")
+async def cache_flush(body: Optional[FlushRequest] = None):
+    endpoint = body.endpoint if body else None
+    return {"flushed": response_cache.flush(endpoint)}
+
+
+@router.post("/cache/warm")
+async def cache_warm(body: WarmRequest):
+    """Load the given pages/ranges through the normal service path so they land in the cache."""
+    warmed = {"item_pages": 0, "sales": 0, "purchases": 0}
+    for page_number in body.item_pages:
+        await get_items_async(page_number, body.page_size)
+        warmed["item_pages"] += 1
+    for r in body.sales:
+        await get_sales_async(
+            r.from_date, r.to_date, r.transaction_type_id or 2,
+            item_id=r.item_id, item_name=r.item_name, partner_name=r.partner_name
+        )
+        warmed["sales"] += 1
+    for r in body.purchases:
+        await get_purchases_async(
+            r.from_date, r.to_date, r.transaction_type_id or 1,
+            item_id=r.item_id, item_name=r.item_name, partner_name=r.partner_name
+        )
+        warmed["purchases"] += 1
+    return {"warmed": warmed, "cache": response_cache.stats()}
+
+
+@router.get("/result-sets")
+async def result_set_stats():
+    return result_sets.stats()
+
+
+@router.get("/mirror")
+async def mirror_stats():
+    return get_transaction_store().stats()
+
+
+@router.post("/mirror/dirty")
+async def mirror_mark_dirty(body: DirtyRequest):
+    """Days changed in the ERP after they were mirrored; the next sync downloads them again."""
+    marked = get_transaction_store().mark_dirty(
+        body.transaction_type_id, parse_day(body.from_date), parse_day(body.to_date)
+    )
+    response_cache.flush("/api/Transactions/TransactionsList")
+    return {"marked": marked}
+
+
+@router.post("/mirror/sync")
+async def mirror_sync():
+    return {"synced": await sync_once()}
+
+
+@router.get("/catalog")
+async def catalog_stats():
+    return item_catalog.stats()
+
+
+@router.post("/catalog/refresh")
+async def catalog_refresh():
+    await item_catalog.refresh()
+    return item_catalog.stats()
@@ -8,8 +8,9 @@ from typing import Optional
 
 from fastapi import HTTPException, Header
 from app.core.keys import PRIVATE_KEY, PUBLIC_KEY
-from jose import jwt
-from app.auth.state import oauth_sessions, registered_clients
+from jose import jwt, JWTError
+from app.core.config import settings
+from app.auth.state import RegisteredClient, oauth_store
 from app.services.users import UserService
 
 HERE = os.path.dirname(os.path.abspath(__file__))
@@ -40,33 +41,33 @@ def verify_code_challenge(code_verifier: str, code_challenge: str) -> bool:
     expected = base64.urlsafe_b64encode(digest).decode().rstrip('=')
     return expected == code_challenge
 
-async def verify_mcp_token(authorization: Optional[str] = Header(None)) -> dict:
-    """Validate Bearer token for MCP requests"""
+def bearer_token(authorization: Optional[str]) -> str:
+    """The token of an `Authorization: Bearer <token>` header, or 401."""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=401,
             detail="Authorization header required",
             headers={"WWW-Authenticate": "Bearer"}
         )
+    return authorization.split(" ")[1]
+
+async def verify_mcp_token(authorization: Optional[str] = Header(None)) -> dict:
+    """Validate Bearer token for MCP requests"""
+    token = bearer_token(authorization)
     
-    token = authorization.split(" ")[1]
-    
-    for session_key, session_data in oauth_sessions.items():
-        if (session_key.startswith("test_token_") and 
-            session_data.get("access_token") == token and
-            session_data.get("user_id") == 9999):
-            
-            # Check if test token is expired
-            if datetime.utcnow() > session_data.get("expires_at", datetime.utcnow()):
-                del oauth_sessions[session_key]
-                raise HTTPException(
-                    status_code=401,
-                    detail="Token expired",
-                    headers={"WWW-Authenticate": "Bearer"}
-                )
-            
-            logger.info("Valid MCP request from test user")
-            return {"user_id": 9999, "scopes": ["claudeai"]}
+    test_token = oauth_store.get_token(token)
+    if test_token is not None and test_token.user_id == 9999:
+        # Check if test token is expired
+        if test_token.expired(datetime.utcnow()):
+            oauth_store.pop_token(token)
+            raise HTTPException(
+                status_code=401,
+                detail="Token expired",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+        logger.info("Valid MCP request from test user")
+        return {"user_id": 9999, "scopes": test_token.scopes}
 
     service = UserService()
     try:
@@ -86,6 +87,30 @@ async def verify_mcp_token(authorization: Optional[str] = Header(None)) -> dict:
     finally:
         logger.info(f"Authorization session ended for token: {token}")
 
+async def verify_admin_token(authorization: Optional[str] = Header(None)) -> dict:
+    """
+    Bearer JWT issued by our /token endpoint, checked against the public key, whose
+    subject is listed in ADMIN_USER_IDS. With ADMIN_USER_IDS unset the admin routes
+    refuse everyone.
+    """
+    token = bearer_token(authorization)
+    try:
+        claims = jwt.decode(token, PUBLIC_KEY, algorithms=["RS256"], options={"verify_aud": False})
+    except JWTError:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    admins = {u.strip() for u in settings.admin_user_ids.split(",") if u.strip()}
+    if not admins:
+        raise HTTPException(status_code=403, detail="Admin access is disabled; set ADMIN_USER_IDS to enable it")
+    if str(claims.get("sub")) not in admins:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return {"user_id": claims.get("sub"), "scopes": claims.get("scopes", [])}
+
 def create_access_token(user_id: int, expires_delta: int = 3600, scopes=None):
     expire = datetime.utcnow() + timedelta(seconds=expires_delta)
     payload = {
@@ -96,32 +121,31 @@ def create_access_token(user_id: int, expires_delta: int = 3600, scopes=None):
 
 def ensure_claude_client(client_id: str) -> bool:
     """Ensure Claude client is registered"""
-    if client_id not in registered_clients:
+    if oauth_store.get_client(client_id) is None:
         if client_id.startswith("claude_client_"):
-            registered_clients[client_id] = {
-                "client_id": client_id,
-                "redirect_uris": [
+            oauth_store.add_client(RegisteredClient(
+                client_id=client_id,
+                redirect_uris=[
                     "https://claude.ai/api/mcp/auth_callback",
                     "https://claude.anthropic.com/api/mcp/auth_callback",
                     "https://claude.ai/api/mcp/oauth/callback",
                     "https://claude.anthropic.com/api/mcp/oauth/callback"
-                ],
-                "created_at": datetime.utcnow()
-            }
+                ]
+            ))
             logger.info(f"Auto-registered Claude client: {client_id}")
             return True
         elif client_id == "test_client":
-            registered_clients[client_id] = {
-                "client_id": client_id,
-                "redirect_uris": [
+            oauth_store.add_client(RegisteredClient(
+                client_id=client_id,
+                redirect_uris=[
                     "http://localhost:3000/callback",
                     "https://localhost:3000/callback", 
                     "http://127.0.0.1:3000/callback",
                     "https://httpbin.org/get",  # This will show the callback data
                     f"{AUTH_BASE_URL}/test-callback"  # Our own test callback
-                ],
-                "created_at": datetime.utcnow()
-            }
+                ]
+            ))
             logger.info(f"Auto-registered test client: {client_id}")
             return True
-    return client_id in registered_clients
\ No newline at end of file
+        return False
+    return True
\ No newline at end of file
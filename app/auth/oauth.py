@@ -4,7 +4,7 @@ import os
 import base64
 import ctypes
 import ctypes.wintypes as wt
-from datetime import datetime, timedelta
+from datetime import datetime
 from urllib.parse import urlencode
 
 from fastapi import APIRouter, Request, Form, HTTPException, Query
@@ -14,7 +14,7 @@ from app.utils.templates import login_form_html
 from app.auth.config import (
     INSTALL_KEY, generate_auth_code, logger, TOKEN_EXPIRY_HOURS, create_access_token, verify_code_challenge, ensure_claude_client
 )
-from app.auth.state import oauth_sessions, registered_clients
+from app.auth.state import AuthCode, AuthRequest, RegisteredClient, oauth_store
 from app.repositories.user_repository import _store_creds
 
 router = APIRouter()
@@ -85,8 +85,8 @@ async def authorize(
     if not ensure_claude_client(client_id):
         raise HTTPException(status_code=400, detail="Invalid client_id")
 
-    client_info = registered_clients[client_id]
-    if redirect_uri not in client_info["redirect_uris"]:
+    client_info = oauth_store.get_client(client_id)
+    if redirect_uri not in client_info.redirect_uris:
         raise HTTPException(status_code=400, detail="Invalid redirect_uri")
 
     # Auto-login if we have stdio credentials
@@ -104,28 +104,28 @@ async def authorize(
                 logger.warning(f"Failed to store creds in keyring during stdio auto-login: {e}")
 
             auth_code = generate_auth_code()
-            oauth_sessions[f"code_{auth_code}"] = {
-                "user_id": user["UserID"],
-                "client_id": client_id,
-                "scope": scope,
-                "code_challenge": code_challenge,
-                "expires_at": datetime.utcnow() + timedelta(minutes=10)
-            }
+            oauth_store.add_code(AuthCode(
+                code=auth_code,
+                user_id=user["UserID"],
+                client_id=client_id,
+                scope=scope,
+                code_challenge=code_challenge
+            ))
             
             redirect_url = f"{redirect_uri}?{urlencode({'code': auth_code, 'state': state})}"
             return RedirectResponse(url=redirect_url, status_code=302)
 
     # Show login form if no auto-login
     auth_request_id = secrets.token_urlsafe(16)
-    oauth_sessions[auth_request_id] = {
-        "client_id": client_id,
-        "redirect_uri": redirect_uri,
-        "scope": scope,
-        "state": state,
-        "code_challenge": code_challenge,
-        "code_challenge_method": code_challenge_method,
-        "created_at": datetime.utcnow()
-    }
+    oauth_store.add_request(AuthRequest(
+        request_id=auth_request_id,
+        client_id=client_id,
+        redirect_uri=redirect_uri,
+        scope=scope,
+        state=state,
+        code_challenge=code_challenge,
+        code_challenge_method=code_challenge_method
+    ))
 
     return HTMLResponse(login_form_html(auth_request_id))
 
@@ -137,10 +137,9 @@ async def process_authorization(
     password: str = Form(...),
     install_key: str = Form(...) 
 ):
-    if auth_request_id not in oauth_sessions:
+    session = oauth_store.get_request(auth_request_id)
+    if session is None:
         raise HTTPException(status_code=400, detail="Invalid authorization request")
-    
-    session = oauth_sessions[auth_request_id]
 
     if install_key != INSTALL_KEY:
         return HTMLResponse(
@@ -167,16 +166,16 @@ async def process_authorization(
             logger.warning(f"Failed to store creds in keyring during form login: {e}")
 
     auth_code = generate_auth_code()
-    oauth_sessions[f"code_{auth_code}"] = {
-        "user_id": user_id,
-        "client_id": session["client_id"],
-        "scope": session["scope"],
-        "code_challenge": session["code_challenge"],
-        "expires_at": datetime.utcnow() + timedelta(minutes=10)
-    }
+    oauth_store.add_code(AuthCode(
+        code=auth_code,
+        user_id=user_id,
+        client_id=session.client_id,
+        scope=session.scope,
+        code_challenge=session.code_challenge
+    ))
     
-    del oauth_sessions[auth_request_id]
-    redirect_url = f"{session['redirect_uri']}?{urlencode({'code': auth_code, 'state': session['state']})}"
+    oauth_store.pop_request(auth_request_id)
+    redirect_url = f"{session.redirect_uri}?{urlencode({'code': auth_code, 'state': session.state})}"
     return RedirectResponse(url=redirect_url, status_code=302)
 
 @router.post("/token")
@@ -206,38 +205,37 @@ async def token_endpoint(request: Request):
                 content={"error": "invalid_request", "error_description": "Missing authorization code"}
             )
 
-        code_key = f"code_{auth_code}"
-        if code_key not in oauth_sessions:
+        code_data = oauth_store.get_code(auth_code)
+        if code_data is None:
             return JSONResponse(
                 status_code=400,
                 content={"error": "invalid_grant", "error_description": "Authorization code not found"}
             )
 
-        code_data = oauth_sessions[code_key]
-        if datetime.utcnow() > code_data["expires_at"]:
-            del oauth_sessions[code_key]
+        if code_data.expired(datetime.utcnow()):
+            oauth_store.pop_code(auth_code)
             return JSONResponse(
                 status_code=400,
                 content={"error": "invalid_grant", "error_description": "Authorization code expired"}
             )
 
-        if code_verifier and not verify_code_challenge(code_verifier, code_data["code_challenge"]):
+        if code_verifier and not verify_code_challenge(code_verifier, code_data.code_challenge):
             return JSONResponse(
                 status_code=400,
                 content={"error": "invalid_grant", "error_description": "PKCE verification failed"}
             )
 
-        user_id = code_data["user_id"]
-        scope = code_data["scope"].split() if isinstance(code_data["scope"], str) else ["claudeai"]
+        user_id = code_data.user_id
+        scope = code_data.scope.split() if isinstance(code_data.scope, str) else ["claudeai"]
         access_token = create_access_token(user_id, expires_delta=TOKEN_EXPIRY_HOURS * 3600 * 30 * 12, scopes=scope)
 
-        del oauth_sessions[code_key]
+        oauth_store.pop_code(auth_code)
         
         return {
             "access_token": access_token,
             "token_type": "bearer",
             "expires_in": TOKEN_EXPIRY_HOURS * 3600 * 30 * 12,
-            "scope": code_data["scope"]
+            "scope": code_data.scope
         }
     except Exception as e:
         logger.error(f"Token endpoint error: {e}")
@@ -252,11 +250,10 @@ async def register_client(request: Request):
     try:
         body = await request.json()
         client_id = f"claude_client_{secrets.token_urlsafe(16)}"
-        registered_clients[client_id] = {
-            "client_id": client_id,
-            "redirect_uris": body.get("redirect_uris", []),
-            "created_at": datetime.utcnow()
-        }
+        oauth_store.add_client(RegisteredClient(
+            client_id=client_id,
+            redirect_uris=body.get("redirect_uris", [])
+        ))
         return {
             "client_id": client_id,
             "client_id_issued_at": int(datetime.utcnow().timestamp()),
@@ -1,2 +1,203 @@
-oauth_sessions = {}
-registered_clients = {}
+# app/auth/state.py
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+log = logging.getLogger("finabit-mcp")
+
+
+@dataclass
+class AuthRequest:
+    """A GET /authorize waiting for its login form to be posted."""
+    request_id: str
+    client_id: str
+    redirect_uri: str
+    scope: str
+    state: str
+    code_challenge: str
+    code_challenge_method: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def expired(self, now: datetime) -> bool:
+        return now > self.created_at + timedelta(seconds=settings.oauth_request_ttl)
+
+
+@dataclass
+class AuthCode:
+    """An authorization code waiting to be exchanged at /token."""
+    code: str
+    user_id: int
+    client_id: str
+    scope: str
+    code_challenge: str
+    expires_at: datetime = field(
+        default_factory=lambda: datetime.utcnow() + timedelta(seconds=settings.oauth_code_ttl)
+    )
+
+    def expired(self, now: datetime) -> bool:
+        return now > self.expires_at
+
+
+@dataclass
+class IssuedToken:
+    """A bearer token accepted without a database lookup (the test user's); only its hash is kept."""
+    token_hash: bytes
+    user_id: int
+    expires_at: datetime
+    scopes: List[str] = field(default_factory=lambda: ["claudeai"])
+
+    def expired(self, now: datetime) -> bool:
+        return now > self.expires_at
+
+
+@dataclass
+class RegisteredClient:
+    client_id: str
+    redirect_uris: List[str]
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    last_used: datetime = field(default_factory=datetime.utcnow)
+
+    def expired(self, now: datetime) -> bool:
+        if settings.oauth_client_ttl <= 0:
+            return False  # the default: clients never expire
+        return now > self.last_used + timedelta(seconds=settings.oauth_client_ttl)
+
+
+def token_hash(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class OAuthStore:
+    """
+    The OAuth state of this process: one dict per record type, keyed by what that record
+    is looked up by (request id, code, token hash, client id), so every lookup is a single
+    probe. Expired records read as missing (codes excepted: /token reports those as
+    expired), and a background sweep drops requests past OAUTH_REQUEST_TTL and codes and
+    tokens past expires_at, so memory follows the live logins rather than the uptime.
+    Registered clients are kept: MCP clients register once and reuse their client_id,
+    so they are only dropped when OAUTH_CLIENT_TTL is set, after that long unused.
+    """
+
+    def __init__(self):
+        self.requests: Dict[str, AuthRequest] = {}
+        self.codes: Dict[str, AuthCode] = {}
+        self.tokens: Dict[bytes, IssuedToken] = {}
+        self.clients: Dict[str, RegisteredClient] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.swept = 0
+
+    # -- pending /authorize requests --
+
+    def add_request(self, request: AuthRequest) -> AuthRequest:
+        self.requests[request.request_id] = request
+        return request
+
+    def get_request(self, request_id: str) -> Optional[AuthRequest]:
+        request = self.requests.get(request_id)
+        if request is not None and request.expired(datetime.utcnow()):
+            del self.requests[request_id]
+            return None
+        return request
+
+    def pop_request(self, request_id: str) -> Optional[AuthRequest]:
+        return self.requests.pop(request_id, None)
+
+    # -- authorization codes --
+
+    def add_code(self, code: AuthCode) -> AuthCode:
+        self.codes[code.code] = code
+        return code
+
+    def get_code(self, code: str) -> Optional[AuthCode]:
+        return self.codes.get(code)
+
+    def pop_code(self, code: str) -> Optional[AuthCode]:
+        return self.codes.pop(code, None)
+
+    # -- bearer tokens checked in memory --
+
+    def add_token(self, token: str, user_id: int, expires_at: datetime,
+                  scopes: Optional[List[str]] = None) -> IssuedToken:
+        record = IssuedToken(token_hash(token), user_id, expires_at, scopes or ["claudeai"])
+        self.tokens[record.token_hash] = record
+        return record
+
+    def get_token(self, token: str) -> Optional[IssuedToken]:
+        return self.tokens.get(token_hash(token))
+
+    def pop_token(self, token: str) -> Optional[IssuedToken]:
+        return self.tokens.pop(token_hash(token), None)
+
+    # -- registered clients --
+
+    def add_client(self, client: RegisteredClient) -> RegisteredClient:
+        self.clients[client.client_id] = client
+        return client
+
+    def get_client(self, client_id: str) -> Optional[RegisteredClient]:
+        client = self.clients.get(client_id)
+        if client is None:
+            return None
+        now = datetime.utcnow()
+        if client.expired(now):
+            del self.clients[client_id]
+            return None
+        client.last_used = now
+        return client
+
+    # -- expiry --
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """Drop every expired record; returns how many."""
+        now = now or datetime.utcnow()
+        removed = 0
+        for records in (self.requests, self.codes, self.tokens, self.clients):
+            expired = [key for key, record in records.items() if record.expired(now)]
+            for key in expired:
+                del records[key]
+            removed += len(expired)
+        self.swept += removed
+        return removed
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(settings.oauth_sweep_interval)
+            try:
+                removed = self.sweep()
+                if removed:
+                    log.info(f"OAuth sweep removed {removed} expired records")
+            except Exception as e:
+                log.warning(f"OAuth sweep failed: {e}")
+
+    def ensure_started(self):
+        if settings.oauth_sweep_interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._loop())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": len(self.requests),
+            "codes": len(self.codes),
+            "tokens": len(self.tokens),
+            "clients": len(self.clients),
+            "swept": self.swept,
+        }
+
+
+oauth_store = OAuthStore()
@@ -0,0 +1,124 @@
+# app/core/cache.py
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+
+def approx_size(value: Any, _sample: int = 20) -> int:
+    """
+    Rough in-memory size of a parsed API result. Lists are sampled (first `_sample`
+    elements) and extrapolated, so sizing a 100k-row result stays cheap. Columnar
+    values (TransactionFrame, NumPy arrays) report their own nbytes.
+    """
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        n = len(value)
+        if not n:
+            return sys.getsizeof(value)
+        head = value[:_sample]
+        per_item = sum(approx_size(v) for v in head) / len(head)
+        return sys.getsizeof(value) + int(per_item * n)
+    return sys.getsizeof(value)
+
+
+class ResponseCache:
+    """
+    In-process LRU cache for repository results, bounded by entry count and by the
+    approximate byte size of the cached values. Every entry carries its own TTL.
+    Keys are SingleFlight-style tuples whose first element is the endpoint.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        if ttl <= 0 or not settings.cache_enabled:
+            return
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def flush(self, endpoint: Optional[str] = None) -> int:
+        with self._lock:
+            keys = [k for k in self._entries if endpoint is None or k[0] == endpoint]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            per_endpoint: Dict[str, int] = {}
+            for key in self._entries:
+                per_endpoint[key[0]] = per_endpoint.get(key[0], 0) + 1
+            return {
+                "enabled": settings.cache_enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries_per_endpoint": per_endpoint,
+            }
+
+
+def transactions_ttl(to_date: str) -> float:
+    """Closed periods hardly change; anything reaching today stays fresh only briefly."""
+    try:
+        closed = date.fromisoformat(str(to_date)[:10]) < date.today()
+    except ValueError:
+        closed = False
+    return settings.cache_ttl_closed_range if closed else settings.cache_ttl_open_range
+
+
+response_cache = ResponseCache(settings.cache_max_entries, settings.cache_max_bytes)
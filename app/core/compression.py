@@ -0,0 +1,200 @@
+# app/core/compression.py
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # optional: pip install zstandard
+except ImportError:
+    zstandard = None
+
+
+def available_encodings() -> List[str]:
+    """Content codings this process can produce and decode, best first."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings += ["gzip", "deflate"]
+    return encodings
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._c = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._c.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def _compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith("text/") or any(t in content_type for t in ("json", "javascript", "xml"))
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best coding the client accepts (zstd, br, gzip; the
+    first two only when their packages are installed). Bodies below `minimum_size`
+    are sent as-is. Streaming responses, including the text/event-stream that MCP's
+    streamable HTTP transport uses, are compressed chunk by chunk and flushed after
+    every chunk so events are not held back.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, zstd_level: int = 3, event_stream: bool = True):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+        self.event_stream = event_stream
+
+    def choose(self, accept_encoding: str) -> Optional[str]:
+        accepted = _accepted(accept_encoding)
+        for encoding in available_encodings():
+            if encoding == "deflate":
+                continue
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+    def compressor(self, encoding: str):
+        if encoding == "zstd":
+            return _Zstd(self.zstd_level)
+        if encoding == "br":
+            return _Brotli(self.brotli_quality)
+        return _Gzip(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(self, encoding, send).send)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start: Optional[Message] = None
+        self.mode: Optional[str] = None  # "plain" | "whole" | "stream"
+        self.compressor = None
+
+    async def send(self, message: Message):
+        kind = message["type"]
+        if kind == "http.response.start":
+            self.start = message
+            return
+        if kind != "http.response.body" or self.mode == "plain":
+            await self._flush_start()
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.mode is None:
+            self.mode = self._decide(body, more_body)
+            if self.mode == "plain":
+                await self._flush_start()
+                await self.downstream(message)
+                return
+            self.start["headers"] = list(self.start.get("headers", []))
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = self.middleware.compressor(self.encoding)
+            if self.mode == "whole":
+                data = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(data))
+                await self._flush_start()
+                await self.downstream({"type": "http.response.body", "body": data})
+                return
+            if "content-length" in headers:
+                del headers["content-length"]
+            await self._flush_start()
+
+        data = self.compressor.compress(body)
+        data += self.compressor.flush() if more_body else self.compressor.finish()
+        await self.downstream({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _decide(self, body: bytes, more_body: bool) -> str:
+        headers = Headers(raw=self.start.get("headers", []))
+        if "content-encoding" in headers or self.start["status"] in (204, 304):
+            return "plain"
+        content_type = headers.get("content-type", "")
+        if not _compressible(content_type):
+            return "plain"
+        if content_type.startswith("text/event-stream"):
+            return "stream" if self.middleware.event_stream else "plain"
+        if more_body:
+            return "stream"
+        return "whole" if len(body) >= self.middleware.minimum_size else "plain"
+
+    async def _flush_start(self):
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.downstream(start)
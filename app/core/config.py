@@ -10,4 +10,107 @@ class Settings(BaseSettings):
     server_api_url: str
     debug: bool = False
 
+    # Shared upstream HTTP pool (app/core/http_client.py)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 30.0
+    http_pool_timeout: float = 10.0
+    http2: bool = False
+    upstream_compression: bool = True  # Accept-Encoding: zstd/br (when installed), gzip, deflate
+
+    # Response compression on /mcp (app/core/compression.py)
+    mcp_compression: bool = True
+    mcp_compression_min_size: int = 1024
+    mcp_gzip_level: int = 6
+    mcp_brotli_quality: int = 4
+    mcp_zstd_level: int = 3
+    mcp_compress_event_stream: bool = True
+
+    # Upstream resilience (app/core/resilience.py), per API host
+    upstream_resilience: bool = True
+    upstream_initial_concurrency: int = 8
+    upstream_min_concurrency: int = 1
+    upstream_max_concurrency: int = 20
+    upstream_latency_tolerance: float = 0.0  # > 0: also back off when an endpoint gets this much slower
+    upstream_queue_timeout: float = 10.0
+    upstream_rate_per_second: float = 100.0  # 0 = unlimited
+    upstream_burst: int = 100
+    upstream_breaker_failures: int = 5
+    upstream_breaker_reset: float = 30.0
+    upstream_retry_attempts: int = 3
+    upstream_retry_backoff: float = 0.25
+    upstream_retry_max_backoff: float = 5.0
+
+    # GetAllItems fan-out (get_all_items)
+    items_fanout_concurrency: int = 8
+    items_fanout_page_size: int = 500
+
+    # TransactionsList date-range sharding (app/repositories/sharding.py)
+    transactions_shard_threshold_days: int = 31
+    transactions_shard_days: int = 7
+    transactions_shard_max_days: int = 31
+    transactions_shard_target_rows: int = 5000
+    transactions_shard_concurrency: int = 4
+    transactions_shard_attempts: int = 3
+
+    # JSON codec (app/core/json_codec.py): auto = orjson, then msgspec, then stdlib json
+    json_codec: str = "auto"
+    # Row validation (app/models/batch.py): a trusted upstream only gets the coercions
+    # the tools rely on (numbers, dates, field names); text/int/bool fields pass through
+    upstream_trusted: bool = False
+
+    # Streaming TransactionsList ingestion (app/utils/json_stream.py)
+    stream_chunk_size: int = 64 * 1024
+    stream_batch_size: int = 1000
+
+    # Response cache (app/core/cache.py); TTLs in seconds
+    cache_enabled: bool = True
+    cache_max_entries: int = 512
+    cache_max_bytes: int = 256 * 1024 * 1024
+    cache_ttl_items: int = 300
+    cache_ttl_closed_range: int = 6 * 3600
+    cache_ttl_open_range: int = 60
+
+    # Paged get_sales/get_purchases results (app/core/result_sets.py); page size 0 = whole result
+    result_page_size: int = 0
+    result_set_ttl: int = 900
+    result_sets_max_entries: int = 64
+    result_sets_max_bytes: int = 128 * 1024 * 1024
+
+    # Local TransactionsList mirror (app/repositories/transactions_store.py)
+    mirror_enabled: bool = True
+    mirror_transaction_types: str = "1,2"
+    # Opt-in background sync: download the last MIRROR_BACKFILL_DAYS closed days and any dirty
+    # day every MIRROR_SYNC_INTERVAL seconds. Off, the mirror keeps what unfiltered queries fetched.
+    mirror_sync: bool = False
+    mirror_sync_interval: int = 900
+    mirror_backfill_days: int = 90
+    mirror_settle_days: int = 2
+    # Answer summaries over mirrored days from the daily cubes kept next to the mirror
+    mirror_cubes: bool = True
+
+    # Arrow/Parquet exports (app/services/export.py, needs pyarrow); empty dir = %APPDATA%/FinabitMCP/exports
+    export_dir: str = ""
+    export_compression: str = "zstd"
+
+    # In-memory item catalog (app/services/catalog.py); 0 disables the background refresh
+    catalog_refresh_interval: int = 1800
+
+    # Verified /mcp bearer tokens kept in memory (app/main_ref.py); size 0 disables the cache
+    auth_cache_size: int = 1024
+    auth_cache_ttl: int = 300
+    auth_negative_ttl: int = 30
+
+    # In-memory OAuth state (app/auth/state.py); lifetimes in seconds, sweep 0 = expire on lookup only
+    oauth_request_ttl: int = 600
+    oauth_code_ttl: int = 600
+    # Registered (/register) clients are kept for the process lifetime unless this is > 0:
+    # then a client unused that long is dropped and must register again
+    oauth_client_ttl: int = 0
+    oauth_sweep_interval: int = 300
+
+    # Admin routes: comma-separated user ids allowed; empty = admin routes disabled
+    admin_user_ids: str = ""
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,398 @@
+# app/core/http_client.py
+import asyncio
+import threading
+import time
+import logging
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+import httpx
+
+from app.core.compression import available_encodings
+from app.core.config import settings
+from app.core.resilience import HostGuard, guard_for
+
+log = logging.getLogger("finabit-mcp")
+
+
+class PoolStats:
+    """
+    Counters for the shared upstream connection pool.
+    A request "reuses" a connection when httpcore never had to open a TCP socket for it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wire_bytes = 0
+        self.encodings: Dict[str, int] = {}
+
+    def record(self, connected: bool, waited: float):
+        with self._lock:
+            self.requests += 1
+            if connected:
+                self.new_connections += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+
+    def record_body(self, response: httpx.Response):
+        """Bytes as received (before decompression) and the coding the API chose."""
+        encoding = response.headers.get("content-encoding", "identity")
+        with self._lock:
+            self.wire_bytes += response.num_bytes_downloaded
+            self.encodings[encoding] = self.encodings.get(encoding, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.requests
+            reused = requests - self.new_connections
+            return {
+                "requests": requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": round(reused / requests, 4) if requests else 0.0,
+                "avg_wait_ms": round(self.wait_total / requests * 1000, 3) if requests else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+                "wire_bytes": self.wire_bytes,
+                "content_encodings": dict(self.encodings),
+            }
+
+
+class _RequestTrace:
+    """
+    httpcore `trace` extension callback for one request.
+    Wait time is measured from the moment the request enters the pool until it either
+    starts opening a new connection or starts writing headers on a pooled one.
+    """
+    __slots__ = ("started", "waited", "connected")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.waited: Optional[float] = None
+        self.connected = False
+
+    def __call__(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.started":
+            self.connected = True
+            self._mark()
+        elif event_name.endswith("send_request_headers.started"):
+            self._mark()
+
+    def _mark(self):
+        if self.waited is None:
+            self.waited = time.perf_counter() - self.started
+
+    async def atrace(self, event_name: str, info: Dict[str, Any]):
+        self(event_name, info)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def finish(self):
+        pool_stats.record(self.connected, self.waited or 0.0)
+
+
+pool_stats = PoolStats()
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+# An AsyncClient is bound to the event loop it first ran on: one per loop.
+_async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def _limits() -> httpx.Limits:
+    # Every repository talks to settings.server_api_url, so the client-wide limits
+    # are effectively the per-host pool size.
+    return httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+
+
+def _headers() -> Dict[str, str]:
+    # httpx decodes every listed coding incrementally in iter_bytes()/aiter_bytes(),
+    # so streamed bodies are decompressed chunk by chunk as they arrive.
+    if not settings.upstream_compression:
+        return {"Accept-Encoding": "identity"}
+    return {"Accept-Encoding": ", ".join(available_encodings())}
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.http_timeout, pool=settings.http_pool_timeout)
+
+
+def _http2_enabled() -> bool:
+    if not settings.http2:
+        return False
+    try:
+        import h2  # noqa: F401  (installed by `httpx[http2]`)
+        return True
+    except ImportError:
+        log.warning("HTTP2=true but the 'h2' package is not installed; using HTTP/1.1.")
+        return False
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Process-wide keep-alive client used by every module in app/repositories/.
+    Created lazily; closed by close_http_client() on application shutdown.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    headers=_headers(),
+                    limits=_limits(),
+                    timeout=_timeout(),
+                    http2=_http2_enabled(),
+                )
+    return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Async counterpart of get_http_client() for `async def` tools.
+    An AsyncClient is bound to the event loop it first ran on, so each loop gets its
+    own (e.g. stdio mode vs. the uvicorn server loop); aclose_http_clients() closes
+    them all.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        with _client_lock:
+            # A loop that ended without aclose_http_clients() can no longer run its
+            # pool's close; forget it rather than keep its connections referenced.
+            for stale in [owner for owner in _async_clients if owner.is_closed()]:
+                log.warning("Dropping the upstream async pool of a closed event loop; close it with aclose_http_clients()")
+                del _async_clients[stale]
+            client = _async_clients.setdefault(loop, httpx.AsyncClient(
+                headers=_headers(),
+                limits=_limits(),
+                timeout=_timeout(),
+                http2=_http2_enabled(),
+            ))
+    return client
+
+
+def _request_timeout(timeout: Optional[float]):
+    return timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+
+
+def _finish(guard: Optional[HostGuard], trace: _RequestTrace, latency: float,
+            response: Optional[httpx.Response] = None, error: Optional[BaseException] = None):
+    trace.finish()
+    if response is not None:
+        pool_stats.record_body(response)
+    if guard is not None:
+        guard.done(latency, response, error)
+
+
+def _open(url: str, send: Callable[[_RequestTrace, ExitStack], httpx.Response]):
+    """
+    Send one GET through the host's guard (breaker, rate limit, adaptive concurrency),
+    retrying with jitter while the failure is retryable. Returns the guard, the
+    response with its ExitStack (still open for streams), the trace and the latency to
+    response headers; the caller reports the final outcome via _finish().
+    """
+    guard = guard_for(url)
+    attempt = 0
+    while True:
+        if guard is not None:
+            guard.admit()
+        trace = _RequestTrace()
+        stack = ExitStack()
+        try:
+            response = send(trace, stack)
+        except httpx.TransportError as e:
+            stack.close()
+            _finish(guard, trace, trace.elapsed(), error=e)
+            delay = guard.retry_delay(attempt, error=e) if guard is not None else None
+            if delay is None:
+                raise
+        except BaseException:
+            stack.close()
+            trace.finish()
+            if guard is not None:
+                guard.abandon()
+            raise
+        else:
+            latency = trace.elapsed()
+            delay = guard.retry_delay(attempt, response=response) if guard is not None else None
+            if delay is None:
+                return guard, response, stack, trace, latency
+            stack.close()
+            _finish(guard, trace, latency, response)
+        attempt += 1
+        time.sleep(delay)
+
+
+async def _aopen(url: str, send: Callable[[_RequestTrace, AsyncExitStack], Awaitable[httpx.Response]]):
+    """Async counterpart of _open()."""
+    guard = guard_for(url)
+    attempt = 0
+    while True:
+        if guard is not None:
+            await guard.admit_async()
+        trace = _RequestTrace()
+        stack = AsyncExitStack()
+        try:
+            response = await send(trace, stack)
+        except httpx.TransportError as e:
+            await stack.aclose()
+            _finish(guard, trace, trace.elapsed(), error=e)
+            delay = guard.retry_delay(attempt, error=e) if guard is not None else None
+            if delay is None:
+                raise
+        except BaseException:
+            await stack.aclose()
+            trace.finish()
+            if guard is not None:
+                guard.abandon()
+            raise
+        else:
+            latency = trace.elapsed()
+            delay = guard.retry_delay(attempt, response=response) if guard is not None else None
+            if delay is None:
+                return guard, response, stack, trace, latency
+            await stack.aclose()
+            _finish(guard, trace, latency, response)
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+def api_get(url: str, *, params: Optional[Dict[str, Any]] = None, auth=None,
+            headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+    """GET through the shared pool and the host's resilience guard, recording connection reuse and pool wait time."""
+    guard, response, _, trace, latency = _open(url, lambda trace, stack: get_http_client().get(
+        url,
+        params=params,
+        auth=auth,
+        headers=headers,
+        timeout=_request_timeout(timeout),
+        extensions={"trace": trace},
+    ))
+    _finish(guard, trace, latency, response)
+    return response
+
+
+async def api_get_async(url: str, *, params: Optional[Dict[str, Any]] = None, auth=None,
+                        headers: Optional[Dict[str, str]] = None,
+                        timeout: Optional[float] = None) -> httpx.Response:
+    guard, response, _, trace, latency = await _aopen(url, lambda trace, stack: get_async_http_client().get(
+        url,
+        params=params,
+        auth=auth,
+        headers=headers,
+        timeout=_request_timeout(timeout),
+        extensions={"trace": trace.atrace},
+    ))
+    _finish(guard, trace, latency, response)
+    return response
+
+
+@contextmanager
+def api_stream(url: str, *, params: Optional[Dict[str, Any]] = None, auth=None,
+               headers: Optional[Dict[str, str]] = None,
+               timeout: Optional[float] = None) -> Iterator[httpx.Response]:
+    """
+    Streaming GET: the body is read incrementally via response.iter_bytes().
+    Only opening the stream is retried; the request keeps its concurrency slot until
+    the body is closed.
+    """
+    guard, response, stack, trace, latency = _open(url, lambda trace, stack: stack.enter_context(
+        get_http_client().stream(
+            "GET",
+            url,
+            params=params,
+            auth=auth,
+            headers=headers,
+            timeout=_request_timeout(timeout),
+            extensions={"trace": trace},
+        )
+    ))
+    error = None
+    try:
+        with stack:
+            yield response
+    except httpx.TransportError as e:
+        error = e
+        raise
+    finally:
+        _finish(guard, trace, latency, response, error)
+
+
+@asynccontextmanager
+async def api_stream_async(url: str, *, params: Optional[Dict[str, Any]] = None, auth=None,
+                           headers: Optional[Dict[str, str]] = None,
+                           timeout: Optional[float] = None) -> AsyncIterator[httpx.Response]:
+    async def send(trace: _RequestTrace, stack: AsyncExitStack) -> httpx.Response:
+        return await stack.enter_async_context(get_async_http_client().stream(
+            "GET",
+            url,
+            params=params,
+            auth=auth,
+            headers=headers,
+            timeout=_request_timeout(timeout),
+            extensions={"trace": trace.atrace},
+        ))
+
+    guard, response, stack, trace, latency = await _aopen(url, send)
+    error = None
+    try:
+        async with stack:
+            yield response
+    except httpx.TransportError as e:
+        error = e
+        raise
+    finally:
+        _finish(guard, trace, latency, response, error)
+
+
+def _pool_size(client) -> int:
+    if client is None:
+        return 0
+    pool = getattr(client._transport, "_pool", None)
+    return len(getattr(pool, "connections", []) or [])
+
+
+def open_connections() -> int:
+    return _pool_size(_client) + sum(_pool_size(c) for c in list(_async_clients.values()))
+
+
+def http_pool_stats() -> Dict[str, Any]:
+    stats = pool_stats.snapshot()
+    stats["open_connections"] = open_connections()
+    stats["http2"] = bool(settings.http2)
+    return stats
+
+
+def close_http_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            log.info(f"Closing upstream HTTP pool: {http_pool_stats()}")
+            _client.close()
+            _client = None
+
+
+async def aclose_http_clients():
+    """
+    Close every pool: the running loop's async client here, those of other loops that
+    are still running on their own loop, then the sync client.
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        clients = list(_async_clients.items())
+        _async_clients.clear()
+    for owner, client in clients:
+        if owner is loop:
+            await client.aclose()
+        elif owner.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), owner))
+    close_http_client()
@@ -0,0 +1,87 @@
+# app/core/json_codec.py
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Tuple, Union
+
+from app.core.config import settings
+
+try:
+    import orjson  # optional: pip install orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec  # optional: pip install msgspec
+except ImportError:
+    msgspec = None
+
+
+def _default(value: Any) -> Any:
+    """Types the fast codecs know natively, for the stdlib path and as a fallback hook."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "tolist"):  # numpy arrays and scalars
+        return value.tolist()
+    return str(value)
+
+
+def _stdlib() -> Tuple[str, Callable[[Union[bytes, str]], Any], Callable[[Any], bytes]]:
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return "json", json.loads, dumps
+
+
+def _orjson():
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=options)
+
+    # orjson.JSONDecodeError already subclasses json.JSONDecodeError
+    return "orjson", orjson.loads, dumps
+
+
+def _msgspec():
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from e
+
+    return "msgspec", loads, encoder.encode
+
+
+def _select():
+    wanted = settings.json_codec.lower()
+    if wanted in ("auto", "orjson") and orjson is not None:
+        return _orjson()
+    if wanted in ("auto", "msgspec") and msgspec is not None:
+        return _msgspec()
+    return _stdlib()
+
+
+CODEC, _loads, _dumps = _select()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON bytes (or text); raises json.JSONDecodeError whichever codec is active."""
+    return _loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Compact UTF-8 JSON. datetime/date become ISO 8601 strings, Decimal a float, numpy
+    values plain numbers/lists; anything else unknown falls back to str().
+    """
+    return _dumps(value)
+
+
+def dumps_str(value: Any) -> str:
+    return _dumps(value).decode("utf-8")
@@ -0,0 +1,17 @@
+# app/core/paths.py
+import os
+from pathlib import Path
+
+def appdata_path(*parts: str) -> Path:
+    """
+    Persistent, user-writable path (e.g., %APPDATA%/FinabitMCP on Windows).
+    Use for files you create/write at runtime (like install.key).
+    """
+    appdata_root = os.getenv("APPDATA")
+    if appdata_root:
+        root = Path(appdata_root)
+    else:
+        root = Path.home() / ".finabitmcp"
+    d = root / "FinabitMCP"
+    d.mkdir(parents=True, exist_ok=True)
+    return d.joinpath(*parts)
@@ -0,0 +1,360 @@
+# app/core/resilience.py
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+# Worth another try for an idempotent GET: the request most likely never reached the
+# ERP or it answered "busy". Read timeouts are not retried here; the server was slow,
+# and asking again only adds load (sharded fetches split the range instead). A
+# PoolTimeout never left this process, so it is retried but is no overload or outage.
+RETRY_STATUSES = {429, 502, 503, 504}
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout,
+                httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError)
+OVERLOAD_STATUSES = {429, 503}
+# Count toward the breaker: the ERP (or the proxy in front of it) is down or unreachable.
+# A plain 500 is its application failing this one request, often over the request's own
+# input, and 4xx are the caller's; neither says anything about the next request.
+BREAKER_STATUSES = {502, 503, 504}
+
+
+class UpstreamError(RuntimeError):
+    """The Finabit API could not answer; surfaced to the tool caller instead of []."""
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on concurrent upstream requests. The limit grows by 1/limit per answered
+    request while it is actually in use, and is cut by `backoff` (at most once per round
+    trip) on overload signals: timeouts and 429/503. With `tolerance` > 0 a latency above
+    `tolerance` times the best latency seen recently on the same endpoint counts as well
+    (the Vegas-style queueing signal); endpoints are compared only with themselves, since
+    a GetAllItems page and a month of TransactionsList take very different times. "Recently"
+    is the minimum over the current and previous `window` seconds, so a baseline inflated
+    by a slow period cannot hide the next one.
+    """
+
+    window = 60.0
+
+    def __init__(self, initial: int, minimum: int, maximum: int, tolerance: float, backoff: float = 0.7):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        # endpoint path -> [baseline, window start, window minimum]
+        self.baselines: Dict[str, list] = {}
+        self.increases = self.decreases = self.rejected = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    def _try_acquire(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def _overloaded(self, timeout: float) -> UpstreamError:
+        self.rejected += 1
+        return UpstreamError(
+            f"Finabit API is overloaded: no request slot within {timeout:g}s "
+            f"({self.in_flight} in flight, limit {int(self.limit)})."
+        )
+
+    def acquire(self, timeout: float):
+        with self._cond:
+            if not self._cond.wait_for(self._try_acquire, timeout):
+                raise self._overloaded(timeout)
+
+    async def acquire_async(self, timeout: float):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            with self._cond:
+                if self._try_acquire():
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                with self._cond:
+                    raise self._overloaded(timeout)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, latency: Optional[float], overloaded: bool, endpoint: Optional[str] = None):
+        """
+        latency=None: the call was abandoned, give the slot back without learning from it.
+        endpoint: path of the answered request; None when no response arrived, in which
+        case the latency says nothing about the server's queue.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if latency is not None:
+                baseline = self.baselines.get(endpoint) if endpoint is not None else None
+                slow = (self.tolerance > 0 and baseline is not None
+                        and latency > baseline[0] * self.tolerance)
+                if overloaded or slow:
+                    if now - self._last_decrease >= max(latency, 0.05):
+                        self.limit = max(self.minimum, self.limit * self.backoff)
+                        self._last_decrease = now
+                        self.decreases += 1
+                else:
+                    if self.in_flight + 1 >= int(self.limit) and self.limit < self.maximum:
+                        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                        self.increases += 1
+                    if endpoint is not None and self.tolerance > 0:
+                        self._observe(endpoint, latency, now)
+            self._cond.notify_all()
+            waiters, self._waiters = self._waiters, deque()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def _observe(self, endpoint: str, latency: float, now: float):
+        state = self.baselines.get(endpoint)
+        if state is None:
+            self.baselines[endpoint] = [latency, now, latency]
+            return
+        baseline, window_start, window_min = state
+        if now - window_start >= self.window:
+            baseline, window_start, window_min = window_min, now, None
+        if window_min is None or latency < window_min:
+            window_min = latency
+        state[:] = [min(baseline, latency), window_start, window_min]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "baseline_ms": {endpoint: round(state[0] * 1000, 1) for endpoint, state in self.baselines.items()},
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "rejected": self.rejected,
+        }
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class TokenBucket:
+    """Requests per second with a burst allowance; reserve() says how long to wait."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.delayed = 0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            self.delayed += 1
+            return -self.tokens / self.rate
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rate": self.rate, "burst": self.burst, "delayed": self.delayed}
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures (transport errors, timeouts, 502/503/504) and
+    fails fast for `reset_timeout` seconds; then lets a single probe through and closes
+    again if it succeeds.
+    """
+
+    def __init__(self, host: str, threshold: int, reset_timeout: float):
+        self.host = host
+        self.threshold = max(1, threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.trips = 0
+        self.short_circuited = 0
+        self.last_error: Optional[str] = None
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before(self):
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            if self.state != "closed":
+                self.short_circuited += 1
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+                raise CircuitOpenError(
+                    f"Finabit API at {self.host} is unavailable ({self.failures} consecutive failures, "
+                    f"last: {self.last_error}); not retrying for another {retry_in:.0f}s."
+                )
+
+    def success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def failure(self, error: str):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def abandon(self):
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "short_circuited": self.short_circuited,
+            "last_error": self.last_error,
+        }
+
+
+class HostGuard:
+    """Circuit breaker, token bucket and adaptive limiter for one upstream host."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.breaker = CircuitBreaker(host, settings.upstream_breaker_failures, settings.upstream_breaker_reset)
+        self.bucket = TokenBucket(settings.upstream_rate_per_second, settings.upstream_burst)
+        self.limiter = AdaptiveLimiter(
+            settings.upstream_initial_concurrency,
+            settings.upstream_min_concurrency,
+            settings.upstream_max_concurrency,
+            settings.upstream_latency_tolerance,
+        )
+        self.retries = 0
+
+    def admit(self):
+        self.breaker.before()
+        delay = self.bucket.reserve()
+        if delay:
+            time.sleep(delay)
+        try:
+            self.limiter.acquire(settings.upstream_queue_timeout)
+        except UpstreamError:
+            self.breaker.abandon()
+            raise
+
+    async def admit_async(self):
+        self.breaker.before()
+        delay = self.bucket.reserve()
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            await self.limiter.acquire_async(settings.upstream_queue_timeout)
+        except BaseException:
+            self.breaker.abandon()
+            raise
+
+    def done(self, latency: float, response: Optional[httpx.Response] = None,
+             error: Optional[BaseException] = None):
+        """Record the outcome of an admitted request and free its slot."""
+        if isinstance(error, httpx.PoolTimeout):
+            # no free connection in our own pool: local pressure, nothing learned about the ERP
+            self.abandon()
+            return
+        timed_out = isinstance(error, httpx.TimeoutException)
+        status = response.status_code if response is not None else None
+        self.limiter.release(
+            latency,
+            overloaded=timed_out or status in OVERLOAD_STATUSES,
+            endpoint=response.url.path if response is not None else None,
+        )
+        if error is not None:
+            self.breaker.failure(f"{type(error).__name__}: {error}" if str(error) else type(error).__name__)
+        elif status in BREAKER_STATUSES:
+            self.breaker.failure(f"HTTP {status}")
+        else:
+            self.breaker.success()
+
+    def abandon(self):
+        """The caller went away (cancelled) before an outcome was known."""
+        self.limiter.release(None, overloaded=False)
+        self.breaker.abandon()
+
+    def retry_delay(self, attempt: int, response: Optional[httpx.Response] = None,
+                    error: Optional[BaseException] = None) -> Optional[float]:
+        """Seconds to wait before retrying, or None when the outcome is final."""
+        if attempt + 1 >= settings.upstream_retry_attempts:
+            return None
+        if error is not None:
+            if not isinstance(error, RETRY_ERRORS):
+                return None
+        elif response is None or response.status_code not in RETRY_STATUSES:
+            return None
+        if self.breaker.state == "open":
+            return None
+        self.retries += 1
+        cap = min(settings.upstream_retry_max_backoff, settings.upstream_retry_backoff * 2 ** attempt)
+        delay = random.uniform(0, cap)  # full jitter
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), settings.upstream_retry_max_backoff))
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "limiter": self.limiter.stats(),
+            "rate_limit": self.bucket.stats(),
+            "retries": self.retries,
+        }
+
+
+_guards: Dict[str, HostGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def guard_for(url: str) -> Optional[HostGuard]:
+    """The host's guard, or None when settings.upstream_resilience is off."""
+    if not settings.upstream_resilience:
+        return None
+    parsed = httpx.URL(url)
+    host = f"{parsed.host}:{parsed.port}" if parsed.port else parsed.host
+    guard = _guards.get(host)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.setdefault(host, HostGuard(host))
+    return guard
+
+
+def resilience_stats() -> Dict[str, Any]:
+    return {host: guard.stats() for host, guard in _guards.items()}
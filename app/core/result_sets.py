@@ -0,0 +1,102 @@
+# app/core/result_sets.py
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.core.cache import approx_size
+from app.core.config import settings
+
+
+class ResultSets:
+    """
+    Materialized tool results that later calls page through by cursor, so a long
+    get_sales/get_purchases answer is fetched and validated once and handed out in
+    slices. Bounded like ResponseCache: entry count, approximate bytes (least recently
+    paged set goes first) and a TTL per set, counted from when it was stored.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # cursor -> (kind, rows, page size, expires_at, size)
+        self._sets: "OrderedDict[str, Tuple[str, Sequence[Any], int, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self.stored = 0
+        self.pages = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def first_page(self, kind: str, rows: Sequence[Any], page_size: int) -> Dict[str, Any]:
+        """
+        The first `page_size` rows. When more remain, the whole result is stored and the
+        page carries a cursor for fetch_page; otherwise the cursor is None.
+        """
+        page_size = max(1, page_size)
+        cursor = self._store(kind, rows, page_size) if len(rows) > page_size else None
+        return _page(cursor, kind, rows, 0, page_size)
+
+    def page(self, cursor: str, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._sets.get(cursor)
+            if entry is not None and entry[3] <= time.monotonic():
+                self._remove(cursor)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                raise ValueError(
+                    f"Unknown or expired cursor {cursor!r}; result sets are kept for "
+                    f"{settings.result_set_ttl} s. Repeat the original query for a new one."
+                )
+            self._sets.move_to_end(cursor)
+            self.pages += 1
+        kind, rows, page_size, _, _ = entry
+        return _page(cursor, kind, rows, max(0, offset), max(1, limit or page_size))
+
+    def _store(self, kind: str, rows: Sequence[Any], page_size: int) -> Optional[str]:
+        size = approx_size(rows)
+        if size > self.max_bytes:
+            return None  # too big to keep; the caller still gets its first page
+        cursor = secrets.token_urlsafe(12)
+        with self._lock:
+            self._sets[cursor] = (kind, rows, page_size, time.monotonic() + settings.result_set_ttl, size)
+            self._bytes += size
+            self.stored += 1
+            while len(self._sets) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._sets)))
+                self.evictions += 1
+        return cursor
+
+    def _remove(self, cursor: str):
+        *_, size = self._sets.pop(cursor)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sets": len(self._sets),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "stored": self.stored,
+                "pages": self.pages,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def _page(cursor: Optional[str], kind: str, rows: Sequence[Any], offset: int, limit: int) -> Dict[str, Any]:
+    end = min(offset + limit, len(rows))
+    return {
+        "cursor": cursor,
+        "kind": kind,
+        "total": len(rows),
+        "offset": offset,
+        "rows": list(rows[offset:end]),
+        "next_offset": end if end < len(rows) else None,
+    }
+
+
+result_sets = ResultSets(settings.result_sets_max_entries, settings.result_sets_max_bytes)
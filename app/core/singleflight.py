@@ -0,0 +1,101 @@
+# app/core/singleflight.py
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_groups: Dict[str, "SingleFlight"] = {}
+
+
+def make_key(endpoint: str, params: Dict[str, Any], scope: Optional[str] = None) -> Tuple:
+    """
+    Normalized key for an upstream call: the endpoint plus its params sorted by name.
+    None/"" values are dropped because the repositories never send them, and values
+    are compared as the strings that end up in the query string. `scope` separates
+    callers that validate the same response into different models.
+    """
+    return (endpoint,) + tuple(
+        sorted((k, str(v).strip()) for k, v in params.items() if v is not None and str(v).strip() != "")
+    ) + ((("scope", scope),) if scope else ())
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into one: the first caller for a key runs the
+    function, everyone arriving while it is in flight gets the same result (or error).
+    Nothing is remembered once the call finishes; that is the response cache's job.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        _groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        # Only touched from the event loop thread, so no lock around the task map.
+        self.calls += 1
+        task = self._tasks.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _t, key=key: self._tasks.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: one caller giving up must not cancel the call the others wait on
+        return await asyncio.shield(task)
+
+    def do_sync(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                self.executions += 1
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._tasks) + len(self._calls),
+        }
+
+
+def coalescing_stats() -> Dict[str, Dict[str, int]]:
+    return {name: group.stats() for name, group in _groups.items()}
@@ -1,11 +1,16 @@
 # app/main_ref.py
+import hashlib
 import os, sys
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 from fastmcp import FastMCP
 try:
     from fastmcp.server.auth.providers.jwt import JWTVerifier as AuthProvider
 except Exception:
     from fastmcp.server.auth import BearerAuthProvider as AuthProvider
+from app.core.config import settings
 
 def locate_public_key() -> Path:
     p = os.getenv("PUBLIC_KEY_PATH")
@@ -26,5 +31,87 @@ PUBLIC_KEY_FILE = locate_public_key()
 if not PUBLIC_KEY_FILE.exists():
     raise FileNotFoundError(f"public.pem not found at {PUBLIC_KEY_FILE}")
 
+class CachedJWTVerifier(AuthProvider):
+    """
+    RS256 bearer verification with a bounded LRU of verified tokens, keyed by the
+    token's SHA-256, so the requests of one MCP session pay for the signature check
+    once. A cached token is trusted until the earliest of its `exp`, AUTH_CACHE_TTL
+    after verification, or eviction, and never before its `nbf`. Rejected tokens
+    are remembered for AUTH_NEGATIVE_TTL seconds (0 turns that off).
+    """
+
+    def __init__(self, *args, cache_size: int = 1024, ttl: float = 300, negative_ttl: float = 30, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # sha256(token) -> (access token or None when rejected, not before, valid until)
+        self._verified: "OrderedDict[bytes, Tuple[Optional[Any], float, float]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    async def load_access_token(self, token: str):
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+        entry = self._verified.get(key)
+        if entry is not None:
+            access, not_before, valid_until = entry
+            if now < valid_until:
+                self._verified.move_to_end(key)
+                if access is None:
+                    self.negative_hits += 1
+                    return None
+                if now >= not_before:
+                    self.hits += 1
+                    return access
+                return None  # verified, but not valid yet
+            del self._verified[key]
+        self.misses += 1
+
+        access = await super().load_access_token(token)
+        if access is None:
+            if self.negative_ttl > 0:
+                self._remember(key, None, now, now + self.negative_ttl)
+            return None
+        claims = getattr(access, "claims", None) or {}
+        not_before = _timestamp(claims.get("nbf"), now)
+        valid_until = min(now + self.ttl, _timestamp(claims.get("exp"), float("inf")))
+        if self.ttl > 0:
+            self._remember(key, access, not_before, valid_until)
+        return access if now >= not_before else None
+
+    def _remember(self, key: bytes, access: Optional[Any], not_before: float, valid_until: float):
+        if self.cache_size <= 0:
+            return
+        self._verified[key] = (access, not_before, valid_until)
+        self._verified.move_to_end(key)
+        while len(self._verified) > self.cache_size:
+            self._verified.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._verified),
+            "max_entries": self.cache_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _timestamp(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
 PUBLIC_KEY = PUBLIC_KEY_FILE.read_bytes()
-mcp = FastMCP("Finabit", auth=AuthProvider(public_key=PUBLIC_KEY))
\ No newline at end of file
+mcp = FastMCP("Finabit", auth=CachedJWTVerifier(
+    public_key=PUBLIC_KEY,
+    cache_size=settings.auth_cache_size,
+    ttl=settings.auth_cache_ttl,
+    negative_ttl=settings.auth_negative_ttl,
+))
\ No newline at end of file
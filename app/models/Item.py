@@ -1,5 +1,6 @@
 from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict
+from app.models.types import LenientFloat
 
 class Item(BaseModel):
     ItemID: Optional[str] = Field(default=None, alias="itemID")
@@ -14,17 +15,17 @@ class Item(BaseModel):
     Akciza: Optional[bool] = Field(default=None, alias="akciza")
     Color: Optional[str] = Field(default=None, alias="color")
     PDAItemName: Optional[str] = Field(default=None, alias="pdaItemName")
-    VATValue: Optional[float] = Field(default=None, alias="vatValue")
-    AkcizaValue: Optional[float] = Field(default=None, alias="akcizaValue")
-    MaximumQuantity: Optional[float] = Field(default=None, alias="maximumQuantity")
-    Coefficient: Optional[float] = Field(default=None, alias="coefficient")
-    SalesPrice2: Optional[float] = Field(default=None, alias="salesPrice2")
-    SalesPrice3: Optional[float] = Field(default=None, alias="salesPrice3")
+    VATValue: LenientFloat = Field(default=None, alias="vatValue")
+    AkcizaValue: LenientFloat = Field(default=None, alias="akcizaValue")
+    MaximumQuantity: LenientFloat = Field(default=None, alias="maximumQuantity")
+    Coefficient: LenientFloat = Field(default=None, alias="coefficient")
+    SalesPrice2: LenientFloat = Field(default=None, alias="salesPrice2")
+    SalesPrice3: LenientFloat = Field(default=None, alias="salesPrice3")
     Origin: Optional[str] = Field(default=None, alias="origin")
     Category: Optional[str] = Field(default=None, alias="category")
     PLU: Optional[str] = Field(default=None, alias="plu")
     ItemTemplate: Optional[str] = Field(default=None, alias="itemTemplate")
-    Weight: Optional[float] = Field(default=None, alias="weight")
+    Weight: LenientFloat = Field(default=None, alias="weight")
     Author: Optional[str] = Field(default=None, alias="author")
     Publisher: Optional[str] = Field(default=None, alias="publisher")
     CustomField1: Optional[str] = Field(default=None, alias="customField1")
@@ -34,9 +35,9 @@ class Item(BaseModel):
     CustomField5: Optional[str] = Field(default=None, alias="customField5")
     CustomField6: Optional[str] = Field(default=None, alias="customField6")
     Barcode3: Optional[str] = Field(default=None, alias="barcode3")
-    NettoBruttoWeight: Optional[float] = Field(default=None, alias="nettoBruttoWeight")
-    BrutoWeight: Optional[float] = Field(default=None, alias="brutoWeight")
-    MaxDiscount: Optional[float] = Field(default=None, alias="maxDiscount")
+    NettoBruttoWeight: LenientFloat = Field(default=None, alias="nettoBruttoWeight")
+    BrutoWeight: LenientFloat = Field(default=None, alias="brutoWeight")
+    MaxDiscount: LenientFloat = Field(default=None, alias="maxDiscount")
     ShifraProdhuesit: Optional[str] = Field(default=None, alias="shifraProdhuesit")
     Prodhuesi: Optional[str] = Field(default=None, alias="prodhuesi")
     Id: Optional[int] = Field(default=None, alias="id")
@@ -45,17 +46,3 @@ class Item(BaseModel):
         populate_by_name=True,
         extra="ignore"
     )
-
-    @field_validator(
-        "VATValue", "AkcizaValue", "MaximumQuantity",
-        "Coefficient", "SalesPrice2", "SalesPrice3",
-        "Weight", "NettoBruttoWeight", "BrutoWeight",
-        "MaxDiscount", mode="before"
-    )
-    def parse_optional_float(cls, v):
-        if v is None:
-            return None
-        try:
-            return float(v)
-        except (ValueError, TypeError):
-            return None
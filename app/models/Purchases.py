@@ -1,8 +1,9 @@
 # app/models/sales.py
 
-from typing import Optional, Union
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
+from app.models.types import LenientFloat
 
 class Purchases(BaseModel):
     ID: Optional[int] = Field(default=None, alias="id")
@@ -15,19 +16,10 @@ class Purchases(BaseModel):
     Shifra: Optional[str] = Field(default=None, alias="shifra")
     Emertimi: Optional[str] = Field(default=None, alias="emertimi")
     Njesia_Artik: Optional[str] = Field(default=None, alias="njesia_Artik")
-    Sasia: Optional[Union[float, str]] = Field(default=None, alias="sasia")
-    Cmimi: Optional[Union[float, str]] = Field(default=None, alias="cmimi")
+    Sasia: LenientFloat = Field(default=None, alias="sasia")
+    Cmimi: LenientFloat = Field(default=None, alias="cmimi")
 
     model_config = ConfigDict(
         populate_by_name=True,
         extra="ignore"
     )
-
-    @field_validator("Sasia", "Cmimi", mode="before")
-    def parse_numeric(cls, v):
-        if v is None:
-            return None
-        try:
-            return float(v)
-        except (ValueError, TypeError):
-            return None
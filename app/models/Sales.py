@@ -1,7 +1,8 @@
 # app/models/Sales.py
-from typing import Optional, Union
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
+from app.models.types import LenientFloat
 
 class Sales(BaseModel):
     ID: Optional[int] = Field(default=None, alias="id")
@@ -14,19 +15,10 @@ class Sales(BaseModel):
     Shifra: Optional[str] = Field(default=None, alias="shifra")
     Emertimi: Optional[str] = Field(default=None, alias="emertimi")
     Njesia_Artik: Optional[str] = Field(default=None, alias="njesia_Artik")
-    Sasia: Optional[Union[float, str]] = Field(default=None, alias="sasia")
-    Cmimi: Optional[Union[float, str]] = Field(default=None, alias="cmimi")
+    Sasia: LenientFloat = Field(default=None, alias="sasia")
+    Cmimi: LenientFloat = Field(default=None, alias="cmimi")
 
     model_config = ConfigDict(
         populate_by_name=True,
         extra="ignore"
     )
-
-    @field_validator("Sasia", "Cmimi", mode="before")
-    def parse_numeric(cls, v):
-        if v is None:
-            return None
-        try:
-            return float(v)
-        except (ValueError, TypeError):
-            return None
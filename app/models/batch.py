@@ -0,0 +1,122 @@
+# app/models/batch.py
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing_extensions import Annotated, NotRequired, TypedDict
+
+from app.core import json_codec
+from app.core.config import settings
+from app.models.Item import Item
+from app.models.Purchases import Purchases
+from app.models.Sales import Sales
+
+# Passed through unchecked in trusted mode: the ERP already sends them with the right type.
+_PASS_THROUGH = (Optional[str], Optional[int], Optional[bool])
+
+# Adapters kept per requested field set; the oldest goes first beyond this.
+_MAX_FIELD_SETS = 64
+
+
+def _row_type(model: Type[BaseModel], trusted: bool, names: Optional[Sequence[str]] = None) -> type:
+    """
+    TypedDict twin of `model`: same aliases, defaults and coercions, but plain dicts out.
+    With `names`, only those fields in that order; other keys are skipped unvalidated.
+    """
+    fields = {}
+    for name in names or model.model_fields:
+        info = model.model_fields[name]
+        annotation = Any if trusted and info.annotation in _PASS_THROUGH else info.annotation
+        field = Field(default=None, alias=info.alias)
+        fields[name] = NotRequired[Annotated[(annotation, *info.metadata, field)]]
+    row_type = TypedDict(f"{model.__name__}Row", fields)
+    # upstream rows always use the aliases, so trusted mode skips the second lookup by name
+    row_type.__pydantic_config__ = {**model.model_config, "populate_by_name": not trusted}
+    return row_type
+
+
+class RowValidator:
+    """
+    Validates a whole list of upstream rows in one pydantic-core call and returns the
+    same dicts as [model.model_validate(r).model_dump() for r in rows], without a
+    model instance or a Python-level validator per row.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._checked = TypeAdapter(List[_row_type(model, trusted=False)])
+        self._trusted = TypeAdapter(List[_row_type(model, trusted=True)])
+        self._projected: Dict[Tuple[Tuple[str, ...], bool], TypeAdapter] = {}
+        self._names = {}
+        for name, info in model.model_fields.items():
+            self._names[name.casefold()] = name
+            if info.alias:
+                self._names[info.alias.casefold()] = name
+
+    @property
+    def adapter(self) -> TypeAdapter:
+        return self._trusted if settings.upstream_trusted else self._checked
+
+    def adapter_for(self, fields: Optional[Iterable[str]] = None) -> TypeAdapter:
+        """
+        Adapter for rows of only `fields` (all when empty). The per-field-set row type
+        is built once and cached, so the other columns are never validated or copied.
+        """
+        if not fields:
+            return self.adapter
+        key = (self.field_names(fields), settings.upstream_trusted)
+        adapter = self._projected.get(key)
+        if adapter is None:
+            adapter = TypeAdapter(List[_row_type(self.model, key[1], key[0])])
+            if len(self._projected) >= _MAX_FIELD_SETS:
+                del self._projected[next(iter(self._projected))]
+            self._projected[key] = adapter
+        return adapter
+
+    def validate(self, rows: Union[List[Any], Dict[str, Any]],
+                 fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Rows as a list, or a {"items": [...]} envelope; only `fields` when given."""
+        if isinstance(rows, dict):
+            rows = rows.get("items", [])
+        return self.adapter_for(fields).validate_python(rows)
+
+    def validate_json(self, data: bytes, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Parse and validate a response body in one pass; no intermediate tree of raw
+        dicts. Bodies that are not a bare array go through json_codec first.
+        """
+        try:
+            return self.adapter_for(fields).validate_json(data)
+        except ValidationError as e:
+            if e.errors()[0]["loc"]:
+                raise  # a row is invalid, not the envelope
+        return self.validate(json_codec.loads(data), fields)
+
+    def field_names(self, fields: Iterable[str]) -> Tuple[str, ...]:
+        """Field names for `fields`, matched case-insensitively against names and aliases."""
+        names, unknown = [], []
+        for field in fields:
+            name = self._names.get(field.strip().casefold())
+            if name is None:
+                unknown.append(field)
+            elif name not in names:
+                names.append(name)
+        if unknown:
+            raise ValueError(
+                f"Unknown field(s) {', '.join(map(repr, unknown))}; "
+                f"{self.model.__name__} fields are {', '.join(self.model.model_fields)}."
+            )
+        return tuple(names)
+
+    def project(self, rows: Sequence[Dict[str, Any]], drop_nulls: bool = False) -> Sequence[Dict[str, Any]]:
+        """
+        Validated rows without their None values when drop_nulls is set; untouched
+        otherwise. Selecting fields happens at validation (adapter_for).
+        """
+        if drop_nulls:
+            return [{k: v for k, v in row.items() if v is not None} for row in rows]
+        return rows
+
+
+sales_rows = RowValidator(Sales)
+purchases_rows = RowValidator(Purchases)
+item_rows = RowValidator(Item)
@@ -0,0 +1,18 @@
+# app/models/types.py
+from typing import Any, Optional
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+from typing_extensions import Annotated
+
+
+class _NoneOnError:
+    """Turn a validation error into None inside pydantic-core instead of a Python validator."""
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.with_default_schema(handler(source), default=None, on_error="default")
+
+
+# Numbers the ERP sends as 12.5, "12.5" or "": numeric strings are parsed, anything
+# unparseable becomes None.
+LenientFloat = Annotated[Optional[float], _NoneOnError()]
@@ -1,15 +1,18 @@
 # app/repositories/items_repository.py
-import requests
-from typing import Any, Dict
+import asyncio
+import logging
+import math
+import httpx
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from app.core import json_codec
 from app.core.config import settings
-from requests.auth import HTTPBasicAuth
-from app.repositories.user_repository import _get_creds  # stored creds
+from app.core.http_client import api_get, api_get_async
+from app.repositories.user_repository import _get_creds, _get_creds_async  # stored creds
+from app.utils.auth import upstream_auth
 
-def fetch_items(page_number: int = 1, page_size: int = 20) -> Dict[str, Any]:
-    """
-    Calls GET {server_api_url}/Items/GetAllItems and returns:
-    { items: [...], total_count: int, total_pages: int, current_page: int }
-    """
+log = logging.getLogger("finabit-mcp")
+
+def _items_request(page_number: int, page_size: int) -> Tuple[str, Dict[str, Any], httpx.Auth]:
     endpoint = f"{settings.server_api_url.rstrip('/')}/api/Items/GetAllItems"
     params = {"pageNumber": page_number, "pageSize": page_size}
 
@@ -17,27 +20,98 @@ def fetch_items(page_number: int = 1, page_size: int = 20) -> Dict[str, Any]:
     if not username or not password:
         raise RuntimeError("No saved credentials for Basic authentication.")
 
+    return endpoint, params, upstream_auth
+
+def _items_page(data: Dict[str, Any], page_number: int) -> Dict[str, Any]:
+    return {
+        "items": data.get("items", []),
+        "total_count": data.get("total_count", len(data.get("items", []))),
+        "total_pages": data.get("total_pages", 1),
+        "current_page": data.get("current_page", page_number),
+    }
+
+def _empty_page(page_number: int) -> Dict[str, Any]:
+    return {
+        "items": [],
+        "total_count": 0,
+        "total_pages": 0,
+        "current_page": page_number
+    }
+
+def fetch_items(page_number: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """
+    Calls GET {server_api_url}/Items/GetAllItems and returns:
+    { items: [...], total_count: int, total_pages: int, current_page: int }
+    """
+    endpoint, params, auth = _items_request(page_number, page_size)
+
     try:
-        resp = requests.get(
-            endpoint,
-            params=params,
-            auth=HTTPBasicAuth(username, password),
-            timeout=30
-        )
+        resp = api_get(endpoint, params=params, auth=auth)
         resp.raise_for_status()
-        data = resp.json()
-        
-        return {
-            "items": data.get("items", []),
-            "total_count": data.get("total_count", len(data.get("items", []))),
-            "total_pages": data.get("total_pages", 1),
-            "current_page": data.get("current_page", page_number),
-        }
+        return _items_page(json_codec.loads(resp.content), page_number)
     except Exception as e:
-        print(f"Error fetching items from API: {e}")
-        return {
-            "items": [],
-            "total_count": 0,
-            "total_pages": 0,
-            "current_page": page_number
-        }
\ No newline at end of file
+        log.warning(f"Error fetching items from API: {e}")
+        return _empty_page(page_number)
+
+async def _fetch_items_page_async(page_number: int, page_size: int) -> Dict[str, Any]:
+    await _get_creds_async()  # resolved off the loop; _items_request then reads the cache
+    endpoint, params, auth = _items_request(page_number, page_size)
+    resp = await api_get_async(endpoint, params=params, auth=auth)
+    resp.raise_for_status()
+    return _items_page(json_codec.loads(resp.content), page_number)
+
+async def fetch_items_async(page_number: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """Same as fetch_items, on the shared async client."""
+    try:
+        return await _fetch_items_page_async(page_number, page_size)
+    except Exception as e:
+        log.warning(f"Error fetching items from API: {e}")
+        return _empty_page(page_number)
+
+async def iter_item_pages_async(
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    attempts: int = 2
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield every GetAllItems page: page 1 first (it carries total_pages), then pages
+    2..total_pages in completion order, at most `concurrency` requests in flight.
+
+    page_size defaults to settings.items_fanout_page_size and only sizes page 1; the
+    rest is planned from its response. If the API capped the page (page 1 came back
+    shorter than requested while total_count says more items exist), the cap is the
+    page size from then on, and the page count is total_count over that size rather
+    than the total_pages the API computed for the requested size.
+
+    A page that still fails after `attempts` tries is yielded as
+    {"current_page": n, "items": [], "error": "..."} so callers can report it.
+    """
+    page_size = page_size or settings.items_fanout_page_size
+    semaphore = asyncio.Semaphore(concurrency or settings.items_fanout_concurrency)
+
+    first = await _fetch_items_page_async(1, page_size)
+    yield first
+
+    served, total = len(first["items"]), int(first["total_count"] or 0)
+    if 0 < served < page_size and total > served:
+        page_size = served  # the server's page-size cap
+    pages = math.ceil(total / page_size) if total else int(first["total_pages"] or 1)
+
+    async def fetch(page_number: int) -> Dict[str, Any]:
+        error = "not attempted"
+        async with semaphore:
+            for _ in range(max(1, attempts)):
+                try:
+                    return await _fetch_items_page_async(page_number, page_size)
+                except Exception as e:
+                    error = str(e)
+            log.warning(f"Error fetching items page {page_number}: {error}")
+            return {"current_page": page_number, "items": [], "error": error}
+
+    tasks = [asyncio.create_task(fetch(n)) for n in range(2, pages + 1)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
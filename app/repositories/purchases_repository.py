@@ -1,20 +1,25 @@
-import requests
-from typing import List, Optional, Dict, Any
+import logging
+import httpx
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Dict, Any, Tuple
+from app.core import json_codec
 from app.core.config import settings
-from requests.auth import HTTPBasicAuth
-from app.repositories.user_repository import _get_creds 
+from app.core.resilience import UpstreamError
+from app.core.http_client import api_get, api_get_async, api_stream, api_stream_async
+from app.repositories.sharding import fetch_sharded
+from app.utils.json_stream import aiter_json_array, iter_json_array
+from app.repositories.user_repository import _get_creds, _get_creds_async
+from app.utils.auth import upstream_auth
 
-def fetch_purchases(
+log = logging.getLogger("finabit-mcp")
+
+def _purchases_request(
     from_date: str,
     to_date: str,
     transaction_type_id: int,
     item_id: Optional[str] = None,
     item_name: Optional[str] = None,
     partner_name: Optional[str] = None
-) -> List[Dict[str, Any]]:
-    """
-    Call the remote PurchasesList API endpoint using Basic Auth creds from keyring.
-    """
+) -> Tuple[str, Dict[str, Any], httpx.Auth]:
     endpoint = f"{settings.server_api_url}/api/Transactions/TransactionsList"
 
     params = {
@@ -33,18 +38,136 @@ def fetch_purchases(
     if not username or not password:
         raise RuntimeError("No saved credentials for Basic authentication.")
 
+    return endpoint, params, upstream_auth
+
+def fetch_purchases(
+    from_date: str,
+    to_date: str,
+    transaction_type_id: int,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Call the remote PurchasesList API endpoint using Basic Auth creds from keyring.
+    """
+    endpoint, params, auth = _purchases_request(
+        from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+    )
+
     try:
-        response = requests.get(
-            endpoint,
-            params=params,
-            auth=HTTPBasicAuth(username, password),  
-            timeout=30
-        )
+        response = api_get(endpoint, params=params, auth=auth)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error calling PurchasesList API: {e}")
+        return json_codec.loads(response.content)
+    except httpx.HTTPError as e:
+        log.warning(f"Error calling PurchasesList API: {e}")
         return []
     except Exception as e:
-        print(f"Unexpected error: {e}")
-        return []
\ No newline at end of file
+        log.warning(f"Unexpected error: {e}")
+        return []
+
+def iter_purchases_rows(
+    from_date: str,
+    to_date: str,
+    transaction_type_id: int,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None,
+    decode: Callable[[bytes], Any] = json_codec.loads
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream TransactionsList rows one by one while the response body is still
+    arriving; `decode` turns each run of complete rows (JSON array bytes) into a list,
+    so a RowValidator.validate_json yields validated rows. Errors are raised, not swallowed.
+    """
+    endpoint, params, auth = _purchases_request(
+        from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+    )
+    with api_stream(endpoint, params=params, auth=auth) as response:
+        response.raise_for_status()
+        yield from iter_json_array(response.iter_bytes(settings.stream_chunk_size), decode)
+
+async def aiter_purchases_rows(
+    from_date: str,
+    to_date: str,
+    transaction_type_id: int,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None,
+    decode: Callable[[bytes], Any] = json_codec.loads
+) -> AsyncIterator[Dict[str, Any]]:
+    await _get_creds_async()  # resolved off the loop; _purchases_request then reads the cache
+    endpoint, params, auth = _purchases_request(
+        from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+    )
+    async with api_stream_async(endpoint, params=params, auth=auth) as response:
+        response.raise_for_status()
+        async for row in aiter_json_array(response.aiter_bytes(settings.stream_chunk_size), decode):
+            yield row
+
+async def _fetch_purchases_raw_async(
+    from_date: str,
+    to_date: str,
+    transaction_type_id: int,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None,
+    decode: Callable[[bytes], Any] = json_codec.loads
+) -> List[Dict[str, Any]]:
+    await _get_creds_async()
+    endpoint, params, auth = _purchases_request(
+        from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+    )
+    response = await api_get_async(endpoint, params=params, auth=auth)
+    response.raise_for_status()
+    return decode(response.content)
+
+async def fetch_purchases_async(
+    from_date: str,
+    to_date: str,
+    transaction_type_id: int,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Same as fetch_purchases, on the shared async client (no worker thread per call).
+    """
+    try:
+        return await _fetch_purchases_raw_async(
+            from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+        )
+    except httpx.HTTPError as e:
+        log.warning(f"Error calling PurchasesList API: {e}")
+        return []
+    except Exception as e:
+        log.warning(f"Unexpected error: {e}")
+        return []
+
+async def fetch_purchases_sharded_async(
+    from_date: str,
+    to_date: str,
+    transaction_type_id: int,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None,
+    decode: Callable[[bytes], Any] = json_codec.loads
+) -> List[Dict[str, Any]]:
+    """
+    Split the date range into concurrent sub-range requests (see fetch_sharded).
+    Raises if some sub-ranges still fail after their retries, naming them,
+    instead of returning a silently incomplete list.
+
+    decode turns each response body into rows; pass a RowValidator's validate_json
+    to get validated rows without decoding into raw dicts first.
+    """
+    async def fetch_shard(shard_from: str, shard_to: str) -> List[Dict[str, Any]]:
+        return await _fetch_purchases_raw_async(
+            shard_from, shard_to, transaction_type_id, item_id, item_name, partner_name, decode
+        )
+
+    rows, failed = await fetch_sharded(fetch_shard, from_date, to_date)
+    if failed:
+        ranges = ", ".join(f"{f}..{t}" for f, t in failed)
+        raise UpstreamError(f"PurchasesList API failed for date ranges {ranges} ({len(rows)} rows fetched for the rest).")
+    return rows
@@ -0,0 +1,172 @@
+# app/repositories/sharding.py
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.resilience import CircuitOpenError
+
+log = logging.getLogger("finabit-mcp")
+
+# fetch(from_date, to_date) -> rows; must raise on failure instead of returning []
+ShardFetch = Callable[[str, str], Awaitable[List[Dict[str, Any]]]]
+
+
+@dataclass
+class _Shard:
+    start: date
+    end: date
+    attempt: int = 0
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+
+def parse_day(value: str) -> date:
+    """'2024-01-31' or '2024-01-31T00:00:00' -> date(2024, 1, 31)"""
+    return datetime.fromisoformat(str(value)[:10]).date()
+
+
+def check_dates(**dates: str):
+    """ValueError naming the first argument that is not a date, before anything is sent upstream."""
+    for name, value in dates.items():
+        try:
+            parse_day(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {name} {value!r}; use YYYY-MM-DD.") from None
+
+
+def span_days(from_date: str, to_date: str) -> int:
+    return (parse_day(to_date) - parse_day(from_date)).days + 1
+
+
+def should_shard(from_date: str, to_date: str) -> bool:
+    """Ranges longer than settings.transactions_shard_threshold_days are fetched sharded."""
+    try:
+        return span_days(from_date, to_date) > settings.transactions_shard_threshold_days
+    except ValueError:
+        return False
+
+
+# What makes a TransactionsList line distinct: rows are line items, so one document ID repeats.
+ROW_IDENTITY = ("ID", "Shifra", "Data", "Sasia", "Cmimi")
+
+
+def _identity(row: Dict[str, Any]) -> Tuple:
+    return tuple(row.get(k, row.get(k[0].lower() + k[1:])) for k in ROW_IDENTITY)
+
+
+def _client_error(error: BaseException) -> bool:
+    """A 4xx other than 429: deterministic, so not worth another attempt."""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return False
+    status = error.response.status_code
+    return 400 <= status < 500 and status != 429
+
+
+def merge_rows(chunks: List[Tuple[date, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Concatenate (shard start, rows) results in date order, each shard's rows as the ERP
+    sent them. Shards never share a day, so nothing inside one is dropped; only a line
+    an earlier shard already returned (same ROW_IDENTITY) is skipped.
+    """
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    for _, rows in sorted(chunks, key=lambda c: c[0]):
+        if merged:
+            rows = [row for row in rows if _identity(row) not in seen]
+        seen.update(map(_identity, rows))
+        merged.extend(rows)
+    return merged
+
+
+async def fetch_sharded(
+    fetch: ShardFetch,
+    from_date: str,
+    to_date: str,
+    *,
+    shard_days: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    attempts: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
+    """
+    Fetch [from_date, to_date] as consecutive whole-day sub-ranges (both ends inclusive,
+    like the TransactionsList filter), with up to `concurrency` shards in flight.
+
+    Shard size adapts to the rows/day observed so far so each request stays near
+    settings.transactions_shard_target_rows. A failed shard is retried on its own with
+    jittered backoff; a timed-out multi-day shard is split in half first. A 4xx response
+    other than 429 is raised at once, as is CircuitOpenError.
+
+    Returns (rows merged by merge_rows, [(from, to), ...] shards that never succeeded).
+    """
+    start, end = parse_day(from_date), parse_day(to_date)
+    size = max(1, shard_days or settings.transactions_shard_days)
+    concurrency = max(1, concurrency or settings.transactions_shard_concurrency)
+    attempts = max(1, attempts or settings.transactions_shard_attempts)
+
+    cursor = start
+    retry: List[_Shard] = []
+    in_flight: Dict[asyncio.Task, _Shard] = {}
+    chunks: List[Tuple[date, List[Dict[str, Any]]]] = []
+    failed: List[Tuple[str, str]] = []
+    rows_seen = days_seen = 0
+
+    async def run(shard: _Shard) -> List[Dict[str, Any]]:
+        if shard.attempt:
+            await asyncio.sleep(random.uniform(0, 0.5 * 2 ** shard.attempt))
+        return await fetch(shard.start.isoformat(), shard.end.isoformat())
+
+    try:
+        while cursor <= end or retry or in_flight:
+            while len(in_flight) < concurrency and (retry or cursor <= end):
+                if retry:
+                    shard = retry.pop()
+                else:
+                    shard = _Shard(cursor, min(cursor + timedelta(days=size - 1), end))
+                    cursor = shard.end + timedelta(days=1)
+                in_flight[asyncio.create_task(run(shard))] = shard
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                shard = in_flight.pop(task)
+                error = task.exception()
+                if error is None:
+                    rows = task.result() or []
+                    chunks.append((shard.start, rows))
+                    rows_seen += len(rows)
+                    days_seen += shard.days
+                    if rows_seen:
+                        per_day = rows_seen / days_seen
+                        size = int(settings.transactions_shard_target_rows / per_day)
+                    else:
+                        size *= 2
+                    size = min(max(size, 1), settings.transactions_shard_max_days)
+                    continue
+
+                if isinstance(error, CircuitOpenError):
+                    raise error  # upstream is down; retrying the other shards is pointless
+                if _client_error(error):
+                    raise error  # the request itself is wrong; every retry or split would be too
+                shard.attempt += 1
+                if shard.attempt >= attempts:
+                    log.warning(f"TransactionsList shard {shard.start}..{shard.end} failed: {error}")
+                    failed.append((shard.start.isoformat(), shard.end.isoformat()))
+                elif (isinstance(error, httpx.TimeoutException) and not isinstance(error, httpx.PoolTimeout)
+                      and shard.days > 1):  # a full local pool is no reason to send more requests
+                    middle = shard.start + timedelta(days=shard.days // 2 - 1)
+                    retry.append(_Shard(shard.start, middle, shard.attempt))
+                    retry.append(_Shard(middle + timedelta(days=1), shard.end, shard.attempt))
+                else:
+                    retry.append(shard)
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+    return merge_rows(chunks), failed
@@ -0,0 +1,266 @@
+# app/repositories/transactions_store.py
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from app.core.paths import appdata_path
+
+# Validated Sales/Purchases field names; both models share the TransactionsList row shape.
+COLUMNS = (
+    "ID", "Data", "Numri", "ID_Konsumatorit", "Konsumatori", "Komercialisti",
+    "Statusi_Faturimit", "Shifra", "Emertimi", "Njesia_Artik", "Sasia", "Cmimi",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    type_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    ID INTEGER,
+    Data TEXT,
+    Numri TEXT,
+    ID_Konsumatorit INTEGER,
+    Konsumatori TEXT,
+    Komercialisti TEXT,
+    Statusi_Faturimit TEXT,
+    Shifra TEXT,
+    Emertimi TEXT,
+    Njesia_Artik TEXT,
+    Sasia REAL,
+    Cmimi REAL
+);
+CREATE INDEX IF NOT EXISTS ix_transactions_type_day ON transactions(type_id, day);
+CREATE INDEX IF NOT EXISTS ix_transactions_data ON transactions(Data);
+CREATE INDEX IF NOT EXISTS ix_transactions_shifra ON transactions(Shifra);
+CREATE INDEX IF NOT EXISTS ix_transactions_partner ON transactions(ID_Konsumatorit);
+
+CREATE TABLE IF NOT EXISTS synced_days (
+    type_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    synced_at TEXT NOT NULL,
+    dirty INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (type_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS daily_cube (
+    type_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    Shifra TEXT,
+    ID_Konsumatorit INTEGER,
+    Emertimi TEXT,
+    Konsumatori TEXT,
+    lines INTEGER NOT NULL,
+    quantity REAL NOT NULL,
+    revenue REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_daily_cube_type_day ON daily_cube(type_id, day);
+"""
+
+# One cube cell per (type, day, Shifra, ID_Konsumatorit); the names ride along in the key,
+# so groupings by name agree with the rows even where the ERP renamed something.
+# TOTAL() skips NULLs: a line missing Sasia or Cmimi adds nothing to revenue, as in memory.
+_CUBE_SELECT = """
+SELECT type_id, day, Shifra, ID_Konsumatorit, Emertimi, Konsumatori,
+       COUNT(*), TOTAL(Sasia), TOTAL(Sasia * Cmimi)
+FROM transactions
+"""
+_CUBE_GROUP = " GROUP BY type_id, day, Shifra, ID_Konsumatorit, Emertimi, Konsumatori"
+
+# group_by key -> SQL expression over daily_cube; labels match app/services/analytics.py
+CUBE_KEYS = {
+    "day": "day",
+    "week": "date(day, '-' || ((CAST(strftime('%w', day) AS INTEGER) + 6) % 7) || ' days')",
+    "month": "substr(day, 1, 7)",
+    "quarter": "substr(day, 1, 4) || '-Q' || ((CAST(substr(day, 6, 2) AS INTEGER) + 2) / 3)",
+    "year": "substr(day, 1, 4)",
+    "Shifra": "Shifra",
+    "Konsumatori": "Konsumatori",
+}
+
+
+def _day_of(row: Dict[str, Any]) -> Optional[date]:
+    value = row.get("Data")
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str) and value:
+        return date.fromisoformat(value[:10])
+    return None
+
+
+def _days(start: date, end: date) -> Iterable[date]:
+    d = start
+    while d <= end:
+        yield d
+        d += timedelta(days=1)
+
+
+class TransactionStore:
+    """
+    On-disk mirror of TransactionsList rows, one complete set of rows per
+    (transaction type, day). A day is only "covered" once it was saved in full and
+    is not marked dirty; partial/filtered results are never stored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._build_missing_cubes()
+
+    def _build_missing_cubes(self):
+        """Mirrors saved before the cubes existed get theirs once, on open."""
+        with self._lock, self._db:
+            if self._db.execute("SELECT 1 FROM daily_cube LIMIT 1").fetchone():
+                return
+            if not self._db.execute("SELECT 1 FROM transactions LIMIT 1").fetchone():
+                return
+            self._db.execute(f"INSERT INTO daily_cube {_CUBE_SELECT} {_CUBE_GROUP}")
+
+    def covered_days(self, type_id: int, start: date, end: date) -> Set[date]:
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT day FROM synced_days WHERE type_id = ? AND day BETWEEN ? AND ? AND dirty = 0",
+                (type_id, start.isoformat(), end.isoformat()),
+            )
+            return {date.fromisoformat(r["day"]) for r in cur}
+
+    def save_days(self, type_id: int, start: date, end: date, rows: List[Dict[str, Any]]):
+        """
+        Replace every day in [start, end] with `rows` (a complete, unfiltered fetch) and
+        rebuild those days' cube cells in the same transaction.
+        """
+        by_day: Dict[date, List[tuple]] = {d: [] for d in _days(start, end)}
+        for row in rows:
+            day = _day_of(row)
+            if day in by_day:
+                by_day[day].append(tuple(
+                    row.get(c).isoformat() if isinstance(row.get(c), datetime) else row.get(c)
+                    for c in COLUMNS
+                ))
+
+        now = datetime.utcnow().isoformat(timespec="seconds")
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM transactions WHERE type_id = ? AND day BETWEEN ? AND ?",
+                (type_id, start.isoformat(), end.isoformat()),
+            )
+            for day, day_rows in by_day.items():
+                self._db.executemany(
+                    f"INSERT INTO transactions (type_id, day, {', '.join(COLUMNS)}) VALUES (?, ?, {placeholders})",
+                    [(type_id, day.isoformat()) + r for r in day_rows],
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO synced_days (type_id, day, row_count, synced_at, dirty) VALUES (?, ?, ?, ?, 0)",
+                    (type_id, day.isoformat(), len(day_rows), now),
+                )
+            span = (type_id, start.isoformat(), end.isoformat())
+            self._db.execute("DELETE FROM daily_cube WHERE type_id = ? AND day BETWEEN ? AND ?", span)
+            self._db.execute(
+                f"INSERT INTO daily_cube {_CUBE_SELECT} WHERE type_id = ? AND day BETWEEN ? AND ? {_CUBE_GROUP}", span
+            )
+
+    def query(self, type_id: int, start: date, end: date,
+              columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Every stored row of the range, with only `columns` (of COLUMNS) when given.
+        There are no filters: the ERP's item/partner matching is not reproduced here,
+        so filtered queries always go upstream.
+        """
+        columns = [c for c in columns if c in COLUMNS] if columns else COLUMNS
+        sql = (
+            f"SELECT {', '.join(columns)} FROM transactions WHERE type_id = ? AND day BETWEEN ? AND ? "
+            "ORDER BY Data, rowid"
+        )
+        with self._lock:
+            rows = [dict(r) for r in self._db.execute(sql, (type_id, start.isoformat(), end.isoformat()))]
+        if "Data" in columns:
+            for row in rows:
+                if row["Data"]:
+                    row["Data"] = datetime.fromisoformat(row["Data"])
+        return rows
+
+    def cube(
+        self,
+        type_id: int,
+        start: date,
+        end: date,
+        group_by: Sequence[str],
+    ) -> List[tuple]:
+        """
+        (group labels..., lines, quantity, revenue) summed from the daily cube cells of
+        [start, end], unfiltered like query(). Callers only ask for covered days.
+        """
+        keys = [CUBE_KEYS[k] for k in group_by]
+        sql = (
+            f"SELECT {''.join(k + ', ' for k in keys)}SUM(lines), TOTAL(quantity), TOTAL(revenue) "
+            "FROM daily_cube WHERE type_id = ? AND day BETWEEN ? AND ?"
+        )
+        if keys:
+            sql += " GROUP BY " + ", ".join(str(i + 1) for i in range(len(keys)))
+        with self._lock:
+            rows = self._db.execute(sql, (type_id, start.isoformat(), end.isoformat()))
+            return [tuple(r) for r in rows if r[len(keys)] is not None]
+
+    def mark_dirty(self, type_id: int, start: date, end: date) -> int:
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "UPDATE synced_days SET dirty = 1 WHERE type_id = ? AND day BETWEEN ? AND ?",
+                (type_id, start.isoformat(), end.isoformat()),
+            )
+            return cur.rowcount
+
+    def dirty_days(self, type_id: int) -> List[date]:
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT day FROM synced_days WHERE type_id = ? AND dirty = 1 ORDER BY day", (type_id,)
+            )
+            return [date.fromisoformat(r["day"]) for r in cur]
+
+    def last_synced_day(self, type_id: int) -> Optional[date]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MAX(day) AS day FROM synced_days WHERE type_id = ?", (type_id,)
+            ).fetchone()
+            return date.fromisoformat(row["day"]) if row and row["day"] else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT type_id, COUNT(*) AS days, SUM(row_count) AS row_count, SUM(dirty) AS dirty, "
+                "MIN(day) AS first_day, MAX(day) AS last_day FROM synced_days GROUP BY type_id"
+            )
+            types = {r["type_id"]: dict(r) for r in cur}
+            for r in self._db.execute("SELECT type_id, COUNT(*) AS cells FROM daily_cube GROUP BY type_id"):
+                types.setdefault(r["type_id"], {})["cube_cells"] = r["cells"]
+            return {"path": self.path, "types": types}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_store: Optional[TransactionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_transaction_store() -> TransactionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TransactionStore(str(appdata_path("transactions.sqlite3")))
+    return _store
+
+
+def close_transaction_store():
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -1,7 +1,9 @@
 
-import base64, pathlib, keyring, requests
+import base64, pathlib, keyring
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.core.http_client import api_get
+from app.utils.auth import credentials
 
 KR_SERVICE = "finabit-api"
 KR_USERKEY = "finabit-user"
@@ -9,11 +11,15 @@ KR_USERKEY = "finabit-user"
 def _store_creds(username: str, password: str):
     keyring.set_password(KR_SERVICE, KR_USERKEY, username)
     keyring.set_password(KR_SERVICE, username, password)
+    credentials.set(username, password)
 
 def _get_creds() -> tuple[Optional[str], Optional[str]]:
-    u = keyring.get_password(KR_SERVICE, KR_USERKEY)
-    p = keyring.get_password(KR_SERVICE, u) if u else None
-    return u, p
+    """Cached credentials; the keyring is only read again after a 401 or a new login."""
+    return credentials.get()
+
+async def _get_creds_async() -> tuple[Optional[str], Optional[str]]:
+    """_get_creds() for async callers: a cache miss reads the keyring in a worker thread."""
+    return await credentials.aget()
 
 def _basic_header(username: str, password: str) -> Dict[str, str]:
     token = base64.b64encode(f"{username}:{password}".encode("utf-8")).decode("ascii")
@@ -49,14 +55,15 @@ class UserRepository:
 
         # verify credentials by calling a protected endpoint
         hdr = _basic_header(username, password)
-        r = requests.get(f"{self.base}/api/Account/userinfo", headers=hdr, timeout=15)
-        if not r.ok:
+        r = api_get(f"{self.base}/api/Account/userinfo", headers=hdr, timeout=15)
+        if not r.is_success:
             # bad creds; don't keep them
             keyring.delete_password(KR_SERVICE, KR_USERKEY)
             try:
                 keyring.delete_password(KR_SERVICE, username)
             except Exception:
                 pass
+            credentials.invalidate()
             return None
 
         info = r.json()
@@ -68,10 +75,11 @@ class UserRepository:
     def get_userinfo(self) -> Optional[Dict[str, Any]]:
         try:
             hdr = auth_header(self.base)
-            r = requests.get(f"{self.base}/api/Account/userinfo", headers=hdr, timeout=15)
+            r = api_get(f"{self.base}/api/Account/userinfo", headers=hdr, timeout=15)
             if r.status_code == 401:
                 # saved creds might be wrong/changed
+                credentials.invalidate()
                 return None
-            return r.json() if r.ok else None
+            return r.json() if r.is_success else None
         except Exception:
             return None
\ No newline at end of file
@@ -0,0 +1,535 @@
+# app/services/analytics.py
+import asyncio
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.frame import Categorical, TransactionFrame
+from app.repositories.transactions_store import CUBE_KEYS, get_transaction_store
+from app.services.purchases import get_purchases_frame_async
+from app.services.sales import get_sales_frame_async
+from app.services.transactions_mirror import Run, mirror_applies, split_covered
+
+PERIODS = ("day", "week", "month", "quarter", "year")
+GROUP_KEYS = PERIODS + ("Shifra", "Konsumatori", "Komercialisti", "Statusi_Faturimit")
+METRICS = ("count", "quantity", "revenue", "avg_price")
+
+# kind -> (frame loader, default TransactionTypeID)
+KINDS = {
+    "sales": (get_sales_frame_async, 2),
+    "purchases": (get_purchases_frame_async, 1),
+}
+
+
+def _check(name: str, value: str, allowed: Sequence[str]) -> str:
+    if value not in allowed:
+        raise ValueError(f"Unknown {name} {value!r}; use one of {', '.join(allowed)}.")
+    return value
+
+
+def check_group_by(group_by: Sequence[str]) -> List[str]:
+    lookup = {k.casefold(): k for k in GROUP_KEYS}
+    keys = [lookup.get(k.strip().casefold(), k) for k in group_by]
+    for key in keys:
+        _check("group_by key", key, GROUP_KEYS)
+    return keys
+
+
+def check_metrics(metrics: Optional[Sequence[str]]) -> List[str]:
+    if not metrics:
+        return list(METRICS)
+    return [_check("metric", m.strip().lower(), METRICS) for m in metrics]
+
+
+async def load_frame(
+    kind: str,
+    from_date: str,
+    to_date: str,
+    transaction_type_id: Optional[int] = None,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None
+) -> TransactionFrame:
+    loader, default_type = KINDS[_check("kind", kind, tuple(KINDS))]
+    return await loader(
+        from_date,
+        to_date,
+        transaction_type_id if transaction_type_id is not None else default_type,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name
+    )
+
+
+def amounts(frame: TransactionFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """(quantity, Sasia * Cmimi) per row, 0 where a value is missing."""
+    quantity = np.nan_to_num(frame["Sasia"])
+    value = np.nan_to_num(frame["Sasia"] * frame["Cmimi"])
+    return quantity, value
+
+
+def _day_label(n: int) -> str:
+    return str(np.datetime64(n, "D"))
+
+
+def _buckets(data: np.ndarray, period: str) -> Tuple[np.ndarray, int, Callable[[int], str]]:
+    """
+    (bucket number per row, step between buckets, bucket number -> label) of a
+    datetime64 column; the caller masks out NaT rows. Labels match the daily cube's.
+    """
+    if period == "year":
+        return data.astype("datetime64[Y]").astype(np.int64), 1, lambda n: str(1970 + n)
+    if period in ("month", "quarter"):
+        months = data.astype("datetime64[M]").astype(np.int64)
+        if period == "month":
+            return months, 1, lambda n: str(np.datetime64(n, "M"))
+        return months // 3, 1, lambda n: f"{1970 + n // 4}-Q{n % 4 + 1}"
+    days = data.astype("datetime64[D]").astype(np.int64)
+    if period == "week":  # Monday of the ISO week; 1970-01-01 was a Thursday
+        return days - (days + 3) % 7, 7, _day_label
+    return days, 1, _day_label
+
+
+def factorize(frame: TransactionFrame, key: str) -> Tuple[np.ndarray, List[Any]]:
+    """
+    (group number per row, label per group number) for one group_by key, in linear
+    time: periods are offsets from the earliest one, categories reuse their codes.
+    Labels run in key order (periods chronologically, text alphabetically, None last
+    for periods and first for text); a label may have no rows.
+    """
+    if key in PERIODS:
+        missing = np.isnat(frame["Data"])
+        if missing.all():
+            return np.zeros(len(missing), dtype=np.int64), [None]
+        n, step, label = _buckets(frame["Data"], key)
+        base = int(n[~missing].min())
+        index = (n - base) // step
+        size = int(index[~missing].max()) + 1
+        index[missing] = size
+        labels = [label(base + i * step) for i in range(size)]
+        return index, labels + [None]
+    column: Categorical = frame[key]
+    # renumber so groups sort alphabetically; None (code -1) becomes group 0
+    categories = column.categories
+    order = sorted(range(len(categories)), key=categories.__getitem__)
+    rank = np.zeros(len(categories) + 1, dtype=np.int64)
+    rank[np.array(order, dtype=np.int64) + 1] = np.arange(1, len(categories) + 1)
+    return rank[column.codes + 1], [None] + [categories[i] for i in order]
+
+
+def _compact(composite: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(dense group number per row, composite value per group), keeping composite order."""
+    if size <= 4 * len(composite) + 65536:
+        present = np.bincount(composite, minlength=size) > 0
+        return (np.cumsum(present) - 1)[composite], np.flatnonzero(present)
+    used, inverse = np.unique(composite, return_inverse=True)  # sparse: sort instead
+    return inverse.ravel(), used
+
+
+def group(frame: TransactionFrame, keys: Sequence[str]) -> Tuple[np.ndarray, int, Callable[[int], Tuple[Any, ...]]]:
+    """
+    (group number per row, number of groups, group number -> key labels) over several
+    keys at once. Only groups with rows exist; they are numbered in key order. Labels
+    are looked up on demand, so a million groups cost nothing until listed.
+    """
+    if not keys:
+        return np.zeros(len(frame), dtype=np.int64), 1, lambda g: ()
+    parts = [factorize(frame, key) for key in keys]
+    dims = tuple(len(labels) for _, labels in parts)
+    composite = np.ravel_multi_index(tuple(inverse for inverse, _ in parts), dims)
+    inverse, used = _compact(composite, math.prod(dims))
+
+    def labels(g: int) -> Tuple[Any, ...]:
+        positions = np.unravel_index(used[g], dims)
+        return tuple(part[1][int(p)] for part, p in zip(parts, positions))
+
+    return inverse, len(used), labels
+
+
+def _metrics(count: np.ndarray, quantity: np.ndarray, revenue: np.ndarray) -> Dict[str, np.ndarray]:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_price = np.where(quantity != 0, revenue / quantity, np.nan)
+    return {"count": count, "quantity": quantity, "revenue": revenue, "avg_price": avg_price}
+
+
+def select(score: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores, largest first, by partial selection: O(n) to
+    find them with argpartition, then only those k are sorted. NaN counts as lowest.
+    """
+    score = np.nan_to_num(score, nan=-np.inf)
+    if k < len(score):
+        picked = np.argpartition(-score, k - 1)[:k]
+    else:
+        picked = np.arange(len(score))
+    return picked[np.argsort(-score[picked], kind="stable")]
+
+
+# rounding per metric; prices and unit costs keep 4 decimals
+_DECIMALS = {"quantity": 3, "revenue": 2, "cost": 2, "margin": 2, "margin_pct": 2}
+
+
+def _cell(metric: str, value: Any) -> Any:
+    if metric == "count":
+        return int(value)
+    if value != value:  # NaN
+        return None
+    return round(float(value), _DECIMALS.get(metric, 4))
+
+
+def _tabulate(group_by: Sequence[str], metrics: Sequence[str], order_by: Optional[str], limit: int,
+              labels: Callable[[int], Tuple[Any, ...]], count: np.ndarray, quantity: np.ndarray,
+              revenue: np.ndarray) -> Dict[str, Any]:
+    """The summary table of groups numbered in key order, whatever they were summed from."""
+    if order_by is None:
+        order_by = "key" if group_by and group_by[0] in PERIODS else "revenue"
+    order_by = _check("order_by", order_by, ("key",) + METRICS)
+
+    n = len(count)
+    table = _metrics(count, quantity, revenue)
+    limit = max(1, limit)
+    if order_by == "key":
+        order = np.arange(min(n, limit))
+    else:
+        order = select(table[order_by], limit)
+    totals = _metrics(np.array([count.sum()]), np.array([quantity.sum()]), np.array([revenue.sum()]))
+
+    return {
+        "columns": list(group_by) + list(metrics),
+        "rows": [
+            list(labels(g)) + [_cell(m, table[m][g]) for m in metrics]
+            for g in order
+        ],
+        "groups": n if count.sum() else 0,
+        "truncated": n > limit,
+        "totals": {m: _cell(m, totals[m][0]) for m in metrics},
+    }
+
+
+def summarize(frame: TransactionFrame, group_by: Sequence[str], metrics: Sequence[str],
+              order_by: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+    """
+    One table row per group: count of lines, quantity (sum of Sasia), revenue (sum of
+    Sasia * Cmimi) and avg_price (revenue / quantity). order_by is "key" or a metric;
+    by default time groupings run chronologically and the others by revenue, largest
+    first. Totals always cover every group, also those cut off by `limit`.
+    """
+    inverse, n, labels = group(frame, group_by)
+    quantity, value = amounts(frame)
+    return _tabulate(
+        group_by, metrics, order_by, limit, labels,
+        np.bincount(inverse, minlength=n),
+        np.bincount(inverse, weights=quantity, minlength=n),
+        np.bincount(inverse, weights=value, minlength=n),
+    )
+
+
+def _label_order(group_by: Sequence[str]) -> Callable[[Tuple[Any, ...]], Tuple[Any, ...]]:
+    """Sort key giving label tuples the order factorize numbers groups in."""
+    def key(labels: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        return tuple(
+            ((v is None) if k in PERIODS else (v is not None), v or "")
+            for k, v in zip(group_by, labels)
+        )
+    return key
+
+
+def summarize_cells(group_by: Sequence[str], metrics: Sequence[str], order_by: Optional[str], limit: int,
+                    cube_rows: Sequence[tuple], frames: Sequence[TransactionFrame]) -> Dict[str, Any]:
+    """
+    summarize() over summed daily cube cells, (labels..., lines, quantity, revenue) from
+    TransactionStore.cube, plus frames of the days the cube does not cover yet.
+    """
+    k = len(group_by)
+    cells: Dict[Tuple[Any, ...], List[float]] = {}
+    for row in cube_rows:
+        cell = cells.setdefault(row[:k], [0, 0.0, 0.0])
+        cell[0] += row[k]
+        cell[1] += row[k + 1]
+        cell[2] += row[k + 2]
+    for frame in frames:
+        if not len(frame):
+            continue
+        inverse, n, labels = group(frame, group_by)
+        quantity, value = amounts(frame)
+        count = np.bincount(inverse, minlength=n)
+        quantity = np.bincount(inverse, weights=quantity, minlength=n)
+        value = np.bincount(inverse, weights=value, minlength=n)
+        for g in np.flatnonzero(count):
+            cell = cells.setdefault(labels(int(g)), [0, 0.0, 0.0])
+            cell[0] += int(count[g])
+            cell[1] += quantity[g]
+            cell[2] += value[g]
+
+    keys = sorted(cells, key=_label_order(group_by))
+    sums = np.array([cells[key] for key in keys], dtype=np.float64).reshape(-1, 3)
+    return _tabulate(
+        group_by, metrics, order_by, limit, keys.__getitem__,
+        sums[:, 0].astype(np.int64), sums[:, 1], sums[:, 2],
+    )
+
+
+def _cubes_apply(type_id: int, from_date: str, to_date: str, group_by: Sequence[str], item_id: Optional[str],
+                 item_name: Optional[str], partner_name: Optional[str]) -> bool:
+    return (settings.mirror_cubes and mirror_applies(type_id, from_date, to_date, item_id, item_name, partner_name)
+            and all(k in CUBE_KEYS for k in group_by))
+
+
+async def _summarize_with_cubes(
+    kind: str,
+    type_id: int,
+    local_runs: Sequence[Run],
+    remote_runs: Sequence[Run],
+    group_by: Sequence[str],
+    metrics: Sequence[str],
+    order_by: Optional[str],
+    limit: int
+) -> Dict[str, Any]:
+    store = get_transaction_store()
+
+    def read_cube() -> List[tuple]:
+        return [row for a, b in local_runs for row in store.cube(type_id, a, b, group_by)]
+
+    cube_rows, *frames = await asyncio.gather(
+        asyncio.to_thread(read_cube),
+        *(load_frame(kind, a.isoformat(), b.isoformat(), type_id, None, None, None)
+          for a, b in remote_runs),
+    )
+    summary = await asyncio.to_thread(summarize_cells, group_by, metrics, order_by, limit, cube_rows, frames)
+    return {"rows_scanned": sum(len(f) for f in frames), "cube_cells": len(cube_rows), **summary}
+
+
+async def summarize_transactions(
+    kind: str,
+    from_date: str,
+    to_date: str,
+    group_by: Sequence[str] = ("month",),
+    metrics: Optional[Sequence[str]] = None,
+    transaction_type_id: Optional[int] = None,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None,
+    order_by: Optional[str] = None,
+    limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Unfiltered summaries answer the days the mirror holds from their daily cube cells
+    when every group_by key exists in the cube; only the remaining days are loaded as rows.
+    """
+    group_by, metrics = check_group_by(group_by), check_metrics(metrics)
+    if order_by is not None:
+        _check("order_by", order_by, ("key",) + METRICS)
+    type_id = transaction_type_id if transaction_type_id is not None else KINDS[_check("kind", kind, tuple(KINDS))][1]
+    if _cubes_apply(type_id, from_date, to_date, group_by, item_id, item_name, partner_name):
+        local_runs, remote_runs = await split_covered(type_id, from_date, to_date)
+        if local_runs:
+            summary = await _summarize_with_cubes(
+                kind, type_id, local_runs, remote_runs, group_by, metrics, order_by, limit
+            )
+            return {"kind": kind, "from_date": from_date, "to_date": to_date, **summary}
+    frame = await load_frame(kind, from_date, to_date, type_id, item_id, item_name, partner_name)
+    summary = await asyncio.to_thread(summarize, frame, group_by, metrics, order_by, limit)
+    return {"kind": kind, "from_date": from_date, "to_date": to_date, "rows_scanned": len(frame), **summary}
+
+
+def _first_rows(inverse: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Row index of the first row of each of `groups`, in one pass over the rows."""
+    rows = np.flatnonzero(np.isin(inverse, groups))
+    found, first = np.unique(inverse[rows], return_index=True)
+    return rows[first][np.searchsorted(found, groups)]
+
+
+def rank(frame: TransactionFrame, by: str, metric: str = "revenue", n: int = 10, order: str = "top",
+         metrics: Optional[Sequence[str]] = None, ties: bool = True, others: bool = True) -> Dict[str, Any]:
+    """
+    The n best (order="top") or worst ("bottom") `by` groups by `metric`, found with
+    argpartition in time linear in the rows. With ties, groups scoring the same as
+    the n-th are listed too, and equal scores share a rank (1, 2, 2, 4). `others`
+    sums every group that is not listed. Groups whose metric is undefined (avg_price
+    without quantity) are never ranked.
+    """
+    metrics = list(metrics) if metrics else list(METRICS)
+    inverse, groups, labels = group(frame, [by])
+    quantity, value = amounts(frame)
+    table = _metrics(
+        np.bincount(inverse, minlength=groups),
+        np.bincount(inverse, weights=quantity, minlength=groups),
+        np.bincount(inverse, weights=value, minlength=groups),
+    )
+    score = np.nan_to_num(table[metric] if order == "top" else -table[metric], nan=-np.inf)
+    if not len(frame):
+        groups, score = 0, score[:0]
+    picked = select(score, max(1, n)) if groups else np.empty(0, dtype=np.int64)
+    picked = picked[np.isfinite(score[picked])]
+    if ties and len(picked) and groups > len(picked):
+        tied = np.flatnonzero(score == score[picked[-1]])
+        picked = np.concatenate([picked, np.setdiff1d(tied, picked)])
+    ranks = np.searchsorted(-score[picked], -score[picked], side="left") + 1
+
+    named = by == "Shifra"  # item codes alone are hard to read
+    if named and len(picked):
+        names = frame["Emertimi"].take(_first_rows(inverse, picked)).decode()
+    columns = ["rank", by] + (["Emertimi"] if named else []) + metrics
+    rows = []
+    for i, g in enumerate(picked):
+        rows.append(
+            [int(ranks[i]), labels(int(g))[0]] + ([names[i]] if named else [])
+            + [_cell(m, table[m][g]) for m in metrics]
+        )
+
+    total_count, total_quantity, total_value = len(frame), quantity.sum(), value.sum()
+    result = {
+        "by": by,
+        "metric": metric,
+        "order": order,
+        "columns": columns,
+        "rows": rows,
+        "groups": groups,
+        "others": None,
+        "totals": {m: _cell(m, v[0]) for m, v in _metrics(
+            np.array([total_count]), np.array([total_quantity]), np.array([total_value])
+        ).items() if m in metrics},
+    }
+    if others and groups > len(picked):
+        rest = _metrics(
+            np.array([total_count - table["count"][picked].sum()]),
+            np.array([total_quantity - table["quantity"][picked].sum()]),
+            np.array([total_value - table["revenue"][picked].sum()]),
+        )
+        result["others"] = {"groups": groups - len(picked), **{m: _cell(m, rest[m][0]) for m in metrics}}
+    return result
+
+
+async def rank_transactions(
+    kind: str,
+    from_date: str,
+    to_date: str,
+    by: str = "Shifra",
+    metric: str = "revenue",
+    n: int = 10,
+    order: str = "top",
+    metrics: Optional[Sequence[str]] = None,
+    transaction_type_id: Optional[int] = None,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None,
+    ties: bool = True,
+    others: bool = True
+) -> Dict[str, Any]:
+    by = check_group_by([by])[0]
+    metric = _check("metric", metric.strip().lower(), METRICS)
+    order = _check("order", order.strip().lower(), ("top", "bottom"))
+    metrics = check_metrics(metrics)
+    frame = await load_frame(kind, from_date, to_date, transaction_type_id, item_id, item_name, partner_name)
+    ranking = await asyncio.to_thread(rank, frame, by, metric, n, order, metrics, ties, others)
+    return {"kind": kind, "from_date": from_date, "to_date": to_date, "rows_scanned": len(frame), **ranking}
+
+
+MARGIN_METRICS = ("margin", "margin_pct", "revenue", "cost", "quantity")
+
+
+def purchase_costs(purchases: TransactionFrame) -> Dict[str, float]:
+    """
+    Hash index Shifra -> weighted average unit cost over the purchases, i.e.
+    sum(Sasia * Cmimi) / sum(Sasia). Items with no positive purchased quantity are left out.
+    """
+    column: Categorical = purchases["Shifra"]
+    quantity, value = amounts(purchases)
+    size = len(column.categories) + 1
+    bought = np.bincount(column.codes + 1, weights=quantity, minlength=size)[1:]
+    paid = np.bincount(column.codes + 1, weights=value, minlength=size)[1:]
+    return {item: paid[i] / bought[i] for i, item in enumerate(column.categories) if bought[i] > 0}
+
+
+def margins(sales: TransactionFrame, purchases: TransactionFrame, by: str = "margin", order: str = "bottom",
+            n: int = 20, losses_only: bool = False) -> Dict[str, Any]:
+    """
+    Per-item quantity, revenue, cost (quantity sold * purchase_costs unit cost) and
+    margin. Sales are summed per Shifra in one pass over the rows and each item then
+    probes the cost index once, so the join is linear in sales + purchases. Items sold
+    without a purchase in the window have no cost and are reported apart, not ranked.
+    """
+    costs = purchase_costs(purchases)
+    column: Categorical = sales["Shifra"]
+    quantity, value = amounts(sales)
+    size = len(column.categories) + 1
+    lines = np.bincount(column.codes + 1, minlength=size)[1:]
+    sold = np.bincount(column.codes + 1, weights=quantity, minlength=size)[1:]
+    revenue = np.bincount(column.codes + 1, weights=value, minlength=size)[1:]
+    unit_cost = np.array([costs.get(item, np.nan) for item in column.categories], dtype=np.float64)
+
+    cost = sold * unit_cost
+    margin = revenue - cost
+    with np.errstate(invalid="ignore", divide="ignore"):
+        margin_pct = np.where(revenue != 0, margin / revenue * 100, np.nan)
+    table = {"quantity": sold, "revenue": revenue, "unit_cost": unit_cost, "cost": cost,
+             "margin": margin, "margin_pct": margin_pct}
+
+    sold_items = lines > 0
+    costed = sold_items & ~np.isnan(unit_cost)
+    candidates = costed & (margin < 0) if losses_only else costed
+    score = np.where(candidates, table[by] if order == "top" else -table[by], np.nan)
+    picked = select(score, max(1, n))
+    picked = picked[~np.isnan(score[picked])]
+    names = sales["Emertimi"].take(_first_rows(column.codes, picked)).decode() if len(picked) else []
+
+    columns = ["Shifra", "Emertimi", "quantity", "revenue", "unit_cost", "cost", "margin", "margin_pct"]
+    rows = [
+        [column.categories[g], names[i]] + [_cell(m, table[m][g]) for m in columns[2:]]
+        for i, g in enumerate(picked)
+    ]
+    total_revenue, total_cost = revenue[costed].sum(), cost[costed].sum()
+    uncosted = sold_items & ~costed
+    return {
+        "by": by,
+        "order": order,
+        "columns": columns,
+        "rows": rows,
+        "items": int(candidates.sum()),
+        "truncated": int(candidates.sum()) > len(picked),
+        "totals": {
+            "revenue": _cell("revenue", total_revenue),
+            "cost": _cell("cost", total_cost),
+            "margin": _cell("margin", total_revenue - total_cost),
+            "margin_pct": _cell("margin_pct", (total_revenue - total_cost) / total_revenue * 100) if total_revenue else None,
+            "loss_items": int((costed & (margin < 0)).sum()),
+        },
+        "uncosted": {
+            "items": int(uncosted.sum()),
+            "quantity": _cell("quantity", sold[uncosted].sum()),
+            "revenue": _cell("revenue", revenue[uncosted].sum()),
+        },
+    }
+
+
+async def margin_report(
+    from_date: str,
+    to_date: str,
+    by: str = "margin",
+    order: str = "bottom",
+    n: int = 20,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None,
+    losses_only: bool = False
+) -> Dict[str, Any]:
+    """
+    Sales and purchases of the window are loaded concurrently; partner_name filters the
+    sales only, since purchase partners are suppliers.
+    """
+    by = _check("by", by.strip().lower(), MARGIN_METRICS)
+    order = _check("order", order.strip().lower(), ("top", "bottom"))
+    sales, purchases = await asyncio.gather(
+        load_frame("sales", from_date, to_date, None, item_id, item_name, partner_name),
+        load_frame("purchases", from_date, to_date, None, item_id, item_name),
+    )
+    report = await asyncio.to_thread(margins, sales, purchases, by, order, n, losses_only)
+    return {
+        "from_date": from_date,
+        "to_date": to_date,
+        "sales_rows": len(sales),
+        "purchase_rows": len(purchases),
+        **report,
+    }
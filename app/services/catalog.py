@@ -0,0 +1,225 @@
+# app/services/catalog.py
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.Item import Item
+from app.services.items import get_all_items_async
+from app.utils.trigram import TrigramIndex
+
+log = logging.getLogger("finabit-mcp")
+
+FIELDS: Tuple[str, ...] = tuple(Item.model_fields)
+INDEXED: Tuple[str, ...] = ("ItemID", "PLU", "Barcode3", "ShifraProdhuesit", "ItemGroupID")
+SEARCHED: Tuple[str, ...] = ("ItemName", "PDAItemName", "Prodhuesi", "ShifraProdhuesit")
+
+_POS = {name: i for i, name in enumerate(FIELDS)}
+
+
+def index_key(value: Any) -> Optional[str]:
+    """Lookups arrive as strings from tools, so every index is keyed on the stripped text."""
+    if value is None:
+        return None
+    key = str(value).strip()
+    return key or None
+
+
+def _compact(item: Dict[str, Any]) -> tuple:
+    # One tuple per item in Item field order; repeated strings (units, groups,
+    # producers...) are interned so the snapshot holds a single copy of each.
+    return tuple(sys.intern(v) if isinstance(v, str) and len(v) <= 64 else v for v in (item.get(f) for f in FIELDS))
+
+
+class CatalogSnapshot:
+    """
+    Immutable catalog snapshot: items as tuples (no per-row dict with 38 keys) plus hash
+    indexes from each INDEXED field to row positions. Swapped in whole on refresh.
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]], complete: bool = True):
+        self.rows: List[tuple] = [_compact(i) for i in items]
+        self.loaded_at = time.time()
+        self.complete = complete
+        self.indexes: Dict[str, Dict[str, Any]] = {}
+        for field in INDEXED:
+            pos = _POS[field]
+            index: Dict[str, Any] = {}
+            for row_id, row in enumerate(self.rows):
+                key = index_key(row[pos])
+                if key is None:
+                    continue
+                hit = index.get(key)
+                if hit is None:
+                    index[key] = row_id
+                elif isinstance(hit, list):
+                    hit.append(row_id)
+                else:
+                    index[key] = [hit, row_id]
+            self.indexes[field] = index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def row_ids(self, field: str, key: Any) -> List[int]:
+        hit = self.indexes[field].get(index_key(key))
+        if hit is None:
+            return []
+        return hit if isinstance(hit, list) else [hit]
+
+    def item(self, row_id: int) -> Dict[str, Any]:
+        return dict(zip(FIELDS, self.rows[row_id]))
+
+    def find(self, field: str, key: Any) -> List[Dict[str, Any]]:
+        return [self.item(r) for r in self.row_ids(field, key)]
+
+    def search_texts(self) -> Dict[str, tuple]:
+        """ItemID -> the SEARCHED values, for diffing one snapshot against the next."""
+        key_pos = _POS["ItemID"]
+        positions = [_POS[f] for f in SEARCHED]
+        texts = {}
+        for row in self.rows:
+            key = index_key(row[key_pos])
+            if key is not None:
+                texts[key] = tuple(row[p] for p in positions)
+        return texts
+
+
+def _update_search(index: TrigramIndex, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> int:
+    """Apply only what changed between two snapshots to the search index."""
+    before = old.search_texts() if old is not None else {}
+    after = new.search_texts()
+    changed = 0
+    for key in before.keys() - after.keys():
+        index.remove(key)
+        changed += 1
+    for key, texts in after.items():
+        if before.get(key) != texts:
+            index.upsert(key, texts)
+            changed += 1
+    return changed
+
+
+class ItemCatalog:
+    """Holds the current snapshot and refreshes it from GetAllItems in the background."""
+
+    def __init__(self):
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.search_index = TrigramIndex()
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+
+    async def refresh(self) -> CatalogSnapshot:
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        seen = self.refreshes
+        async with self._refresh_lock:
+            if self.refreshes != seen and self.snapshot is not None:
+                # someone refreshed while we waited for the lock
+                return self.snapshot
+            result = await get_all_items_async()
+            complete = not result["failed_pages"]
+            if not complete and self.snapshot is not None and self.snapshot.complete:
+                # keep serving the last complete catalog rather than a partial one
+                self.last_error = f"pages {result['failed_pages']} failed; kept previous snapshot"
+                log.warning(f"Item catalog refresh: {self.last_error}")
+                return self.snapshot
+            snapshot = await asyncio.to_thread(CatalogSnapshot, result["items"], complete)
+            await asyncio.to_thread(_update_search, self.search_index, self.snapshot, snapshot)
+            self.snapshot = snapshot
+            self.refreshes += 1
+            self.last_error = None if complete else f"pages {result['failed_pages']} failed"
+            return snapshot
+
+    async def get(self) -> CatalogSnapshot:
+        self.ensure_started()
+        if self.snapshot is None:
+            return await self.refresh()
+        return self.snapshot
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                log.warning(f"Item catalog refresh failed: {e}")
+            await asyncio.sleep(settings.catalog_refresh_interval)
+
+    def ensure_started(self):
+        if settings.catalog_refresh_interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._loop())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self.snapshot
+        return {
+            "items": len(snap) if snap else 0,
+            "complete": snap.complete if snap else False,
+            "loaded_at": snap.loaded_at if snap else None,
+            "search_index": self.search_index.stats(),
+            "refreshes": self.refreshes,
+            "last_error": self.last_error,
+        }
+
+
+item_catalog = ItemCatalog()
+
+
+async def find_items(keys: List[str], by: str = "ItemID") -> Dict[str, Any]:
+    """
+    Resolve many keys in one call, O(1) per key. `by` is one of INDEXED, or "any" to
+    try ItemID, PLU, Barcode3 and ShifraProdhuesit in that order.
+    """
+    snapshot = await item_catalog.get()
+    fields = [f for f in INDEXED if f != "ItemGroupID"] if by == "any" else [by]
+    for field in fields:
+        if field not in INDEXED:
+            raise ValueError(f"Unknown lookup field {field!r}; use one of {', '.join(INDEXED)} or 'any'.")
+
+    found: Dict[str, List[Dict[str, Any]]] = {}
+    missing: List[str] = []
+    for key in keys:
+        for field in fields:
+            row_ids = snapshot.row_ids(field, key)
+            if row_ids:
+                found[key] = [snapshot.item(r) for r in row_ids]
+                break
+        else:
+            missing.append(key)
+
+    return {
+        "found": found,
+        "missing": missing,
+        "catalog_size": len(snapshot),
+        "catalog_complete": snapshot.complete,
+    }
+
+
+async def search_items(query: str, limit: int = 20) -> Dict[str, Any]:
+    """Typo- and diacritic-tolerant search over item names and producer fields, best match first."""
+    snapshot = await item_catalog.get()
+    limit = max(1, min(limit, 200))
+    hits = await asyncio.to_thread(item_catalog.search_index.search, query, limit)
+    items = []
+    for key, score in hits:
+        for row_id in snapshot.row_ids("ItemID", key):
+            items.append({**snapshot.item(row_id), "score": score})
+    return {"query": query, "items": items, "catalog_complete": snapshot.complete}
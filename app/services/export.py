@@ -0,0 +1,235 @@
+# app/services/export.py
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, get_args
+
+import httpx
+
+from app.core.config import settings
+from app.core.paths import appdata_path
+from app.core.resilience import UpstreamError
+from app.models.frame import CATEGORICAL
+from app.models.Item import Item
+from app.models.Sales import Sales
+from app.services.catalog import FIELDS, item_catalog
+from app.services.purchases import aiter_purchases
+from app.services.sales import aiter_sales
+
+log = logging.getLogger("finabit-mcp")
+
+try:
+    import pyarrow as pa  # optional: pip install pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+KINDS = ("sales", "purchases", "items")
+
+
+def _arrow_type(annotation: Any) -> "pa.DataType":
+    base = next((a for a in get_args(annotation) if a is not type(None)), annotation)  # Optional[X] -> X
+    return {
+        str: pa.string(),
+        int: pa.int64(),
+        float: pa.float64(),
+        bool: pa.bool_(),
+        datetime: pa.timestamp("us"),
+    }[base]
+
+
+def transaction_schema() -> "pa.Schema":
+    """Sales/Purchases rows; the repeated text columns of TransactionFrame are dictionary-encoded."""
+    return pa.schema([
+        (name, pa.dictionary(pa.int32(), pa.string()) if name in CATEGORICAL else _arrow_type(info.annotation))
+        for name, info in Sales.model_fields.items()
+    ])
+
+
+def item_schema() -> "pa.Schema":
+    return pa.schema([(name, _arrow_type(info.annotation)) for name, info in Item.model_fields.items()])
+
+
+class _Batches:
+    """
+    Column lists -> RecordBatches of `schema`. Each dictionary column keeps one growing
+    dictionary for the whole file, so a batch only ever adds to it: the Arrow file format
+    accepts that as a delta, where it would reject a replaced dictionary.
+    """
+
+    def __init__(self, schema: "pa.Schema"):
+        self.schema = schema
+        self.positions: Dict[str, Dict[str, int]] = {
+            field.name: {} for field in schema if pa.types.is_dictionary(field.type)
+        }
+
+    def convert(self, columns: Dict[str, List[Any]]) -> "pa.RecordBatch":
+        arrays = []
+        for field in self.schema:
+            values = columns[field.name]
+            positions = self.positions.get(field.name)
+            if positions is None:
+                arrays.append(pa.array(values, type=field.type))
+                continue
+            assign = positions.setdefault
+            codes = [None if v is None else assign(v, len(positions)) for v in values]
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(codes, type=pa.int32()), pa.array(list(positions), type=pa.string())
+            ))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class _Writer:
+    def __init__(self, path: Path, schema: "pa.Schema", format: str):
+        if format == "parquet":
+            self._sink = None
+            self._writer = pq.ParquetWriter(str(path), schema, compression=settings.export_compression)
+        else:  # uncompressed Arrow IPC file: readers can memory-map it without copying
+            self._sink = pa.OSFile(str(path), "wb")
+            self._writer = pa.ipc.new_file(
+                self._sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            )
+
+    def write(self, batch: "pa.RecordBatch"):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def export_dir() -> Path:
+    if settings.export_dir:
+        path = Path(settings.export_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+    path = appdata_path("exports")
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def _target(kind: str, format: str, from_date: Optional[str], to_date: Optional[str],
+            file_name: Optional[str]) -> Path:
+    suffix = FORMATS[format]
+    if file_name:
+        name = Path(file_name).name  # never outside the export directory
+        if not name or name in (".", ".."):
+            raise ValueError(f"Invalid file_name {file_name!r}.")
+        if not name.endswith(suffix):
+            name += suffix
+    else:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        span = "" if kind == "items" else f"_{from_date}_{to_date}"
+        name = f"{kind}{span}_{stamp}{suffix}"
+    return export_dir() / name
+
+
+async def _transaction_columns(
+    kind: str,
+    from_date: str,
+    to_date: str,
+    transaction_type_id: Optional[int],
+    item_id: Optional[str],
+    item_name: Optional[str],
+    partner_name: Optional[str]
+) -> AsyncIterator[Dict[str, List[Any]]]:
+    stream, default_type = (aiter_sales, 2) if kind == "sales" else (aiter_purchases, 1)
+    names = tuple(Sales.model_fields)
+    try:
+        async for rows in stream(
+            from_date,
+            to_date,
+            transaction_type_id if transaction_type_id is not None else default_type,
+            item_id=item_id,
+            item_name=item_name,
+            partner_name=partner_name
+        ):
+            yield {name: [r.get(name) for r in rows] for name in names}
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        log.warning(f"Error calling TransactionsList API: {e}")
+        raise UpstreamError(f"TransactionsList API request failed: {e}") from e
+
+
+async def _item_columns() -> AsyncIterator[Dict[str, List[Any]]]:
+    snapshot = await item_catalog.get()  # rows are tuples in FIELDS order
+    size = settings.stream_batch_size
+    for start in range(0, len(snapshot.rows), size):
+        yield dict(zip(FIELDS, map(list, zip(*snapshot.rows[start:start + size]))))
+
+
+async def export_dataset(
+    kind: str,
+    format: str = "parquet",
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    transaction_type_id: Optional[int] = None,
+    item_id: Optional[str] = None,
+    item_name: Optional[str] = None,
+    partner_name: Optional[str] = None,
+    file_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Write sales, purchases or the item catalog to a typed Parquet or Arrow file in
+    export_dir(), one record batch per streamed row batch, and describe the file. The
+    file appears under its final name only once it is complete.
+    """
+    if pa is None:
+        raise RuntimeError("Exports need pyarrow on the server: pip install pyarrow")
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind {kind!r}; use one of {', '.join(KINDS)}.")
+    format = format.strip().lower()
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}; use one of {', '.join(FORMATS)}.")
+    if kind == "items":
+        schema, source = item_schema(), _item_columns()
+    else:
+        if not (from_date and to_date):
+            raise ValueError(f"from_date and to_date are required to export {kind}.")
+        schema = transaction_schema()
+        source = _transaction_columns(
+            kind, from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+        )
+
+    path = _target(kind, format, from_date, to_date, file_name)
+    partial = path.with_name(path.name + ".part")
+    batches = _Batches(schema)
+    writer = await asyncio.to_thread(_Writer, partial, schema, format)
+    rows = written = 0
+
+    def write(columns: Dict[str, List[Any]]) -> int:
+        batch = batches.convert(columns)
+        writer.write(batch)
+        return batch.num_rows
+
+    try:
+        async for columns in source:
+            rows += await asyncio.to_thread(write, columns)
+            written += 1
+        await asyncio.to_thread(writer.close)
+        os.replace(partial, path)
+    except BaseException:
+        try:
+            writer.close()
+        except Exception:
+            pass
+        partial.unlink(missing_ok=True)
+        raise
+
+    result = {
+        "kind": kind,
+        "format": format,
+        "path": str(path),
+        "rows": rows,
+        "batches": written,
+        "bytes": path.stat().st_size,
+        "schema": [{"name": f.name, "type": str(f.type)} for f in schema],
+    }
+    if kind == "items":
+        result["complete"] = item_catalog.snapshot.complete
+    return result
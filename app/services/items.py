@@ -1,16 +1,114 @@
 # app/services/items.py
-from typing import Any, Dict
-from app.models.Item import Item
-from app.repositories.items_repository import fetch_items
+import logging
+import httpx
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.resilience import UpstreamError
+from app.core.singleflight import SingleFlight, make_key
+from app.models.batch import item_rows
+from app.repositories.items_repository import _fetch_items_page_async, fetch_items, iter_item_pages_async
 
-def get_items(page_number: int = 1, page_size: int = 20) -> Dict[str, Any]:
-    api_result = fetch_items(page_number, page_size)
+log = logging.getLogger("finabit-mcp")
+
+ITEMS_ENDPOINT = "/api/Items/GetAllItems"
 
-    items = [Item.model_validate(i).model_dump() for i in api_result.get("items", [])]
+_flight = SingleFlight("items")
 
+def _to_response(api_result: Dict[str, Any], page_number: int,
+                 fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
     return {
-        "items": items,
+        "items": item_rows.validate(api_result.get("items", []), fields),
         "total_count": api_result.get("total_count", 0),
         "total_pages": api_result.get("total_pages", 0),
         "current_page": api_result.get("current_page", page_number),
     }
+
+def _cache_page(key, page: Dict[str, Any]):
+    # an empty page is also what a swallowed upstream error looks like
+    if page["items"]:
+        response_cache.set(key, page, settings.cache_ttl_items)
+
+def get_items(page_number: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    key = make_key(ITEMS_ENDPOINT, {"pageNumber": page_number, "pageSize": page_size})
+    hit, page = response_cache.get(key)
+    if hit:
+        return page
+    page = _flight.do_sync(key, lambda: _to_response(fetch_items(page_number, page_size), page_number))
+    _cache_page(key, page)
+    return page
+
+async def get_items_async(page_number: int = 1, page_size: int = 20,
+                          fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Cached per page (and field set) for CACHE_TTL_ITEMS; identical concurrent misses
+    share one upstream call and one parsed page. With `fields` (names from
+    item_rows.field_names) only those columns are validated and kept.
+    """
+    scope = "items:" + ",".join(fields) if fields else None
+    key = make_key(ITEMS_ENDPOINT, {"pageNumber": page_number, "pageSize": page_size}, scope=scope)
+    hit, page = response_cache.get(key)
+    if hit:
+        return page
+    page = await _flight.do(key, lambda: _load_items_async(page_number, page_size, fields))
+    _cache_page(key, page)
+    return page
+
+async def _load_items_async(page_number: int, page_size: int,
+                            fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    try:
+        api_result = await _fetch_items_page_async(page_number, page_size)
+    except httpx.HTTPError as e:
+        log.warning(f"Error fetching items from API: {e}")
+        raise UpstreamError(f"GetAllItems API request failed: {e}") from e
+    return _to_response(api_result, page_number, fields)
+
+async def iter_all_items_async(
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Validated GetAllItems pages, streamed as they arrive from the concurrent crawl."""
+    try:
+        async for page in iter_item_pages_async(page_size, concurrency):
+            validated = _to_response(page, page["current_page"])
+            if "error" in page:
+                validated["error"] = page["error"]
+            yield validated
+    except httpx.HTTPError as e:
+        # only page 1 raises (later pages come back with "error"): nothing to crawl
+        raise UpstreamError(f"GetAllItems API request failed: {e}") from e
+
+async def get_all_items_async(
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Whole catalog in one result, de-duplicated on ItemID (Id when ItemID is missing).
+    Pages that could not be fetched are listed in failed_pages.
+    """
+    seen = set()
+    items: List[Dict[str, Any]] = []
+    failed_pages: List[int] = []
+    total_count = pages = 0
+
+    async for page in iter_all_items_async(page_size, concurrency):
+        pages += 1
+        if page["current_page"] == 1:
+            total_count = page["total_count"]
+        if "error" in page:
+            failed_pages.append(page["current_page"])
+            continue
+        for item in page["items"]:
+            key = item["ItemID"] if item["ItemID"] is not None else item["Id"]
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            items.append(item)
+
+    return {
+        "items": items,
+        "total_count": total_count,
+        "pages": pages,
+        "failed_pages": sorted(failed_pages),
+    }
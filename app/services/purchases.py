@@ -1,27 +1,289 @@
 # app/services/purchases.py
-from typing import List
-from app.models.Purchases import Purchases
-from app.repositories.purchases_repository import fetch_purchases
+import asyncio
+import json
+import logging
+from functools import partial
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+
+import httpx
+
+from app.core.cache import response_cache, transactions_ttl
+from app.core.config import settings
+from app.core.resilience import UpstreamError
+from app.core.singleflight import SingleFlight, make_key
+from app.models.batch import purchases_rows
+from app.models.frame import FrameBuilder, TransactionFrame
+from app.repositories.purchases_repository import aiter_purchases_rows, fetch_purchases_sharded_async, iter_purchases_rows
+from app.repositories.sharding import check_dates, should_shard
+from app.services.transactions_mirror import load_mirrored, mirror_applies, split_covered
+from app.utils.json_stream import abatched, batched
+
+log = logging.getLogger("finabit-mcp")
+
+TRANSACTIONS_ENDPOINT = "/api/Transactions/TransactionsList"
+
+_flight = SingleFlight("purchases")
+_frame_flight = SingleFlight("purchases-frame")
+
+def _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name, scope="purchases"):
+    return make_key(TRANSACTIONS_ENDPOINT, {
+        "FromDate": from_date,
+        "ToDate": to_date,
+        "TransactionTypeID": transaction_type_id,
+        "ItemID": item_id,
+        "ItemName": item_name,
+        "PartnerName": partner_name,
+    }, scope=scope)
+
+def iter_purchases(
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
+    partner_name=None,
+    batch_size: Optional[int] = None
+) -> Iterator[List[dict]]:
+    """
+    Validated purchases in batches of `batch_size` rows, parsed and validated from the body
+    bytes while it is still streaming in. Peak memory follows the batch size, not the
+    response size.
+    """
+    check_dates(from_date=from_date, to_date=to_date)
+    rows = iter_purchases_rows(
+        from_date,
+        to_date,
+        transaction_type_id,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        decode=purchases_rows.validate_json
+    )
+    yield from batched(rows, batch_size or settings.stream_batch_size)
+
+async def aiter_purchases(
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
+    partner_name=None,
+    batch_size: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+) -> AsyncIterator[List[dict]]:
+    """Like iter_purchases, on the shared async client; with `fields` only those columns are validated."""
+    check_dates(from_date=from_date, to_date=to_date)
+    rows = aiter_purchases_rows(
+        from_date,
+        to_date,
+        transaction_type_id,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        decode=partial(purchases_rows.validate_json, fields=fields)
+    )
+    async for batch in abatched(rows, batch_size or settings.stream_batch_size):
+        yield batch
 
 def get_purchases(
-    from_date, 
-    to_date, 
-    transaction_type_id=2, 
-    item_id=None, 
-    item_name=None, 
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
     partner_name=None
 ) -> List[dict]:
-    api_result = fetch_purchases(
-        from_date, 
-        to_date, 
-        transaction_type_id, 
-        item_id=item_id, 
-        item_name=item_name, 
-        partner_name=partner_name
-    )
+    """
+    Served from the response cache when possible; identical concurrent misses share
+    one upstream request (see SingleFlight).
+    """
+    check_dates(from_date=from_date, to_date=to_date)
+    key = _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name)
+    hit, purchases = response_cache.get(key)
+    if hit:
+        return purchases
+    purchases = _flight.do_sync(key, lambda: _load_purchases(
+        from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+    ))
+    response_cache.set(key, purchases, transactions_ttl(to_date))
+    return purchases
 
-    # API returns a list, not a paginated dict
-    raw_list = api_result if isinstance(api_result, list) else api_result.get("items", [])
+def _load_purchases(
+    from_date,
+    to_date,
+    transaction_type_id,
+    item_id,
+    item_name,
+    partner_name
+) -> List[dict]:
+    try:
+        return [
+            row
+            for batch in iter_purchases(
+                from_date,
+                to_date,
+                transaction_type_id,
+                item_id=item_id,
+                item_name=item_name,
+                partner_name=partner_name
+            )
+            for row in batch
+        ]
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        log.warning(f"Error calling PurchasesList API: {e}")
+        raise UpstreamError(f"PurchasesList API request failed: {e}") from e
 
-    purchases = [Purchases.model_validate(p).model_dump() for p in raw_list]
+async def get_purchases_async(
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
+    partner_name=None,
+    sharded=None,
+    fields: Optional[Sequence[str]] = None
+) -> List[dict]:
+    """
+    sharded=None shards automatically when the range is longer than
+    settings.transactions_shard_threshold_days.
+    Results are cached (TTL by whether the range is closed) and identical concurrent
+    misses share one upstream request and one parsed result. With `fields` (names from
+    purchases_rows.field_names) only those columns are validated and kept, cached per field set.
+    """
+    check_dates(from_date=from_date, to_date=to_date)
+    scope = "purchases:" + ",".join(fields) if fields else "purchases"
+    key = _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name, scope=scope)
+    hit, purchases = response_cache.get(key)
+    if hit:
+        return purchases
+    purchases = await _flight.do(key, lambda: _load_purchases_async(
+        from_date, to_date, transaction_type_id, item_id, item_name, partner_name, sharded, fields
+    ))
+    response_cache.set(key, purchases, transactions_ttl(to_date))
+    return purchases
+
+async def _load_purchases_async(
+    from_date,
+    to_date,
+    transaction_type_id,
+    item_id,
+    item_name,
+    partner_name,
+    sharded,
+    fields=None
+) -> List[dict]:
+    mirrored = mirror_applies(transaction_type_id, from_date, to_date, item_id, item_name, partner_name)
+
+    async def fetch_range(range_from, range_to) -> List[dict]:
+        # the mirror stores whole rows, so only a plain upstream fetch validates just `fields`
+        return await _fetch_purchases_range_async(
+            range_from, range_to, transaction_type_id, item_id, item_name, partner_name, sharded,
+            None if mirrored else fields
+        )
+
+    try:
+        if mirrored:
+            return await load_mirrored(transaction_type_id, from_date, to_date, fetch_range, fields)
+        return await fetch_range(from_date, to_date)
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        log.warning(f"Error calling PurchasesList API: {e}")
+        raise UpstreamError(f"PurchasesList API request failed: {e}") from e
+
+async def _fetch_purchases_range_async(
+    from_date,
+    to_date,
+    transaction_type_id,
+    item_id,
+    item_name,
+    partner_name,
+    sharded,
+    fields=None
+) -> List[dict]:
+    """Validated rows (only `fields` when given) straight from upstream; raises on failure."""
+    if sharded is None:
+        sharded = should_shard(from_date, to_date)
+    if sharded:
+        return await fetch_purchases_sharded_async(
+            from_date,
+            to_date,
+            transaction_type_id,
+            item_id=item_id,
+            item_name=item_name,
+            partner_name=partner_name,
+            decode=partial(purchases_rows.validate_json, fields=fields)
+        )
+
+    purchases: List[dict] = []
+    async for batch in aiter_purchases(
+        from_date,
+        to_date,
+        transaction_type_id,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        fields=fields
+    ):
+        purchases.extend(batch)
     return purchases
+
+async def get_purchases_frame_async(
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
+    partner_name=None
+) -> TransactionFrame:
+    """
+    The same rows as get_purchases_async in columnar form, for computations over long
+    ranges. The frame is cached on its own; the row dicts are not kept. A plain
+    streamed fetch is converted batch by batch, so they never all exist at once.
+    """
+    check_dates(from_date=from_date, to_date=to_date)
+    key = _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name, scope="purchases-frame")
+    hit, frame = response_cache.get(key)
+    if hit:
+        return frame
+    rows_key = _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name)
+    hit, purchases = response_cache.get(rows_key)
+    if hit:
+        frame = await asyncio.to_thread(TransactionFrame.from_rows, purchases)
+    else:
+        frame = await _frame_flight.do(key, lambda: _load_purchases_frame_async(
+            from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+        ))
+    response_cache.set(key, frame, transactions_ttl(to_date))
+    return frame
+
+async def _load_purchases_frame_async(
+    from_date,
+    to_date,
+    transaction_type_id,
+    item_id,
+    item_name,
+    partner_name
+) -> TransactionFrame:
+    # A short range with no mirrored day is streamed into the frame like any other.
+    if should_shard(from_date, to_date) or (
+        mirror_applies(transaction_type_id, from_date, to_date, item_id, item_name, partner_name)
+        and (await split_covered(transaction_type_id, from_date, to_date))[0]
+    ):
+        purchases = await _load_purchases_async(
+            from_date, to_date, transaction_type_id, item_id, item_name, partner_name, None
+        )
+        return await asyncio.to_thread(TransactionFrame.from_rows, purchases)
+    builder = FrameBuilder()
+    try:
+        async for batch in aiter_purchases(
+            from_date,
+            to_date,
+            transaction_type_id,
+            item_id=item_id,
+            item_name=item_name,
+            partner_name=partner_name
+        ):
+            builder.add(batch)
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        log.warning(f"Error calling PurchasesList API: {e}")
+        raise UpstreamError(f"PurchasesList API request failed: {e}") from e
+    return builder.build()
@@ -1,7 +1,89 @@
 # app/services/sales.py
-from typing import List, Any
-from app.models.Sales import Sales
-from app.repositories.sales_repository import fetch_sales
+import asyncio
+import json
+import logging
+from functools import partial
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+
+import httpx
+
+from app.core.cache import response_cache, transactions_ttl
+from app.core.config import settings
+from app.core.resilience import UpstreamError
+from app.core.singleflight import SingleFlight, make_key
+from app.models.batch import sales_rows
+from app.models.frame import FrameBuilder, TransactionFrame
+from app.repositories.sales_repository import aiter_sales_rows, fetch_sales_sharded_async, iter_sales_rows
+from app.repositories.sharding import check_dates, should_shard
+from app.services.transactions_mirror import load_mirrored, mirror_applies, split_covered
+from app.utils.json_stream import abatched, batched
+
+log = logging.getLogger("finabit-mcp")
+
+TRANSACTIONS_ENDPOINT = "/api/Transactions/TransactionsList"
+
+_flight = SingleFlight("sales")
+_frame_flight = SingleFlight("sales-frame")
+
+def _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name, scope="sales"):
+    return make_key(TRANSACTIONS_ENDPOINT, {
+        "FromDate": from_date,
+        "ToDate": to_date,
+        "TransactionTypeID": transaction_type_id,
+        "ItemID": item_id,
+        "ItemName": item_name,
+        "PartnerName": partner_name,
+    }, scope=scope)
+
+def iter_sales(
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
+    partner_name=None,
+    batch_size: Optional[int] = None
+) -> Iterator[List[dict]]:
+    """
+    Validated sales in batches of `batch_size` rows, parsed and validated from the body
+    bytes while it is still streaming in. Peak memory follows the batch size, not the
+    response size.
+    """
+    check_dates(from_date=from_date, to_date=to_date)
+    rows = iter_sales_rows(
+        from_date,
+        to_date,
+        transaction_type_id,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        decode=sales_rows.validate_json
+    )
+    yield from batched(rows, batch_size or settings.stream_batch_size)
+
+async def aiter_sales(
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
+    partner_name=None,
+    batch_size: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None
+) -> AsyncIterator[List[dict]]:
+    """Like iter_sales, on the shared async client; with `fields` only those columns are validated."""
+    check_dates(from_date=from_date, to_date=to_date)
+    rows = aiter_sales_rows(
+        from_date,
+        to_date,
+        transaction_type_id,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        decode=partial(sales_rows.validate_json, fields=fields)
+    )
+    async for batch in abatched(rows, batch_size or settings.stream_batch_size):
+        yield batch
 
 def get_sales(
     from_date,
@@ -11,16 +93,197 @@ def get_sales(
     item_name=None,
     partner_name=None
 ) -> List[dict]:
-    api_result = fetch_sales(
+    """
+    Served from the response cache when possible; identical concurrent misses share
+    one upstream request (see SingleFlight).
+    """
+    check_dates(from_date=from_date, to_date=to_date)
+    key = _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name)
+    hit, sales = response_cache.get(key)
+    if hit:
+        return sales
+    sales = _flight.do_sync(key, lambda: _load_sales(
+        from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+    ))
+    response_cache.set(key, sales, transactions_ttl(to_date))
+    return sales
+
+def _load_sales(
+    from_date,
+    to_date,
+    transaction_type_id,
+    item_id,
+    item_name,
+    partner_name
+) -> List[dict]:
+    try:
+        return [
+            row
+            for batch in iter_sales(
+                from_date,
+                to_date,
+                transaction_type_id,
+                item_id=item_id,
+                item_name=item_name,
+                partner_name=partner_name
+            )
+            for row in batch
+        ]
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        log.warning(f"Error calling TransactionsList API: {e}")
+        raise UpstreamError(f"TransactionsList API request failed: {e}") from e
+
+async def get_sales_async(
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
+    partner_name=None,
+    sharded=None,
+    fields: Optional[Sequence[str]] = None
+) -> List[dict]:
+    """
+    sharded=None shards automatically when the range is longer than
+    settings.transactions_shard_threshold_days.
+    Results are cached (TTL by whether the range is closed) and identical concurrent
+    misses share one upstream request and one parsed result. With `fields` (names from
+    sales_rows.field_names) only those columns are validated and kept, cached per field set.
+    """
+    check_dates(from_date=from_date, to_date=to_date)
+    scope = "sales:" + ",".join(fields) if fields else "sales"
+    key = _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name, scope=scope)
+    hit, sales = response_cache.get(key)
+    if hit:
+        return sales
+    sales = await _flight.do(key, lambda: _load_sales_async(
+        from_date, to_date, transaction_type_id, item_id, item_name, partner_name, sharded, fields
+    ))
+    response_cache.set(key, sales, transactions_ttl(to_date))
+    return sales
+
+async def _load_sales_async(
+    from_date,
+    to_date,
+    transaction_type_id,
+    item_id,
+    item_name,
+    partner_name,
+    sharded,
+    fields=None
+) -> List[dict]:
+    mirrored = mirror_applies(transaction_type_id, from_date, to_date, item_id, item_name, partner_name)
+
+    async def fetch_range(range_from, range_to) -> List[dict]:
+        # the mirror stores whole rows, so only a plain upstream fetch validates just `fields`
+        return await _fetch_sales_range_async(
+            range_from, range_to, transaction_type_id, item_id, item_name, partner_name, sharded,
+            None if mirrored else fields
+        )
+
+    try:
+        if mirrored:
+            return await load_mirrored(transaction_type_id, from_date, to_date, fetch_range, fields)
+        return await fetch_range(from_date, to_date)
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        log.warning(f"Error calling TransactionsList API: {e}")
+        raise UpstreamError(f"TransactionsList API request failed: {e}") from e
+
+async def _fetch_sales_range_async(
+    from_date,
+    to_date,
+    transaction_type_id,
+    item_id,
+    item_name,
+    partner_name,
+    sharded,
+    fields=None
+) -> List[dict]:
+    """Validated rows (only `fields` when given) straight from upstream; raises on failure."""
+    if sharded is None:
+        sharded = should_shard(from_date, to_date)
+    if sharded:
+        return await fetch_sales_sharded_async(
+            from_date,
+            to_date,
+            transaction_type_id,
+            item_id=item_id,
+            item_name=item_name,
+            partner_name=partner_name,
+            decode=partial(sales_rows.validate_json, fields=fields)
+        )
+
+    sales: List[dict] = []
+    async for batch in aiter_sales(
         from_date,
         to_date,
         transaction_type_id,
         item_id=item_id,
         item_name=item_name,
-        partner_name=partner_name
-    )
+        partner_name=partner_name,
+        fields=fields
+    ):
+        sales.extend(batch)
+    return sales
 
-    raw_list = api_result if isinstance(api_result, list) else api_result.get("items", [])
+async def get_sales_frame_async(
+    from_date,
+    to_date,
+    transaction_type_id=2,
+    item_id=None,
+    item_name=None,
+    partner_name=None
+) -> TransactionFrame:
+    """
+    The same rows as get_sales_async in columnar form, for computations over long
+    ranges. The frame is cached on its own; the row dicts are not kept. A plain
+    streamed fetch is converted batch by batch, so they never all exist at once.
+    """
+    check_dates(from_date=from_date, to_date=to_date)
+    key = _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name, scope="sales-frame")
+    hit, frame = response_cache.get(key)
+    if hit:
+        return frame
+    rows_key = _flight_key(from_date, to_date, transaction_type_id, item_id, item_name, partner_name)
+    hit, sales = response_cache.get(rows_key)
+    if hit:
+        frame = await asyncio.to_thread(TransactionFrame.from_rows, sales)
+    else:
+        frame = await _frame_flight.do(key, lambda: _load_sales_frame_async(
+            from_date, to_date, transaction_type_id, item_id, item_name, partner_name
+        ))
+    response_cache.set(key, frame, transactions_ttl(to_date))
+    return frame
 
-    sales = [Sales.model_validate(s).model_dump() for s in raw_list]
-    return sales
+async def _load_sales_frame_async(
+    from_date,
+    to_date,
+    transaction_type_id,
+    item_id,
+    item_name,
+    partner_name
+) -> TransactionFrame:
+    # A short range with no mirrored day is streamed into the frame like any other.
+    if should_shard(from_date, to_date) or (
+        mirror_applies(transaction_type_id, from_date, to_date, item_id, item_name, partner_name)
+        and (await split_covered(transaction_type_id, from_date, to_date))[0]
+    ):
+        sales = await _load_sales_async(
+            from_date, to_date, transaction_type_id, item_id, item_name, partner_name, None
+        )
+        return await asyncio.to_thread(TransactionFrame.from_rows, sales)
+    builder = FrameBuilder()
+    try:
+        async for batch in aiter_sales(
+            from_date,
+            to_date,
+            transaction_type_id,
+            item_id=item_id,
+            item_name=item_name,
+            partner_name=partner_name
+        ):
+            builder.add(batch)
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        log.warning(f"Error calling TransactionsList API: {e}")
+        raise UpstreamError(f"TransactionsList API request failed: {e}") from e
+    return builder.build()
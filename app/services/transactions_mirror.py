@@ -0,0 +1,193 @@
+# app/services/transactions_mirror.py
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.core.config import settings
+from app.models.batch import sales_rows
+from app.repositories.sales_repository import fetch_sales_sharded_async
+from app.repositories.sharding import parse_day
+from app.repositories.transactions_store import get_transaction_store
+
+log = logging.getLogger("finabit-mcp")
+
+# fetch(from_date, to_date) -> validated, unfiltered rows; raises on failure
+RangeFetch = Callable[[str, str], Awaitable[List[dict]]]
+
+Run = Tuple[date, date]
+
+_sync_task: Optional[asyncio.Task] = None
+
+
+def last_closed_day() -> date:
+    """Newest day that may be stored; more recent days can still receive back-dated edits."""
+    return date.today() - timedelta(days=max(1, settings.mirror_settle_days))
+
+
+def mirrored_types() -> List[int]:
+    return [int(t) for t in settings.mirror_transaction_types.split(",") if t.strip()]
+
+
+def mirror_applies(type_id: int, from_date: str, to_date: str, item_id: Optional[str] = None,
+                   item_name: Optional[str] = None, partner_name: Optional[str] = None) -> bool:
+    """
+    Only unfiltered queries for one of MIRROR_TRANSACTION_TYPES use the mirror: the
+    ERP's item/partner filters are not reproduced locally, so a filtered call always
+    goes upstream and returns exactly what the ERP returns, and other types are never
+    written to the store.
+    """
+    if not settings.mirror_enabled or item_id or item_name or partner_name:
+        return False
+    if type_id not in mirrored_types():
+        return False
+    try:
+        return parse_day(from_date) <= parse_day(to_date)
+    except ValueError:
+        return False
+
+
+def _runs(start: date, end: date, covered: Set[date], want_covered: bool) -> List[Run]:
+    runs: List[Run] = []
+    run_start = None
+    d = start
+    while d <= end + timedelta(days=1):
+        inside = d <= end and ((d in covered) == want_covered)
+        if inside and run_start is None:
+            run_start = d
+        elif not inside and run_start is not None:
+            runs.append((run_start, d - timedelta(days=1)))
+            run_start = None
+        d += timedelta(days=1)
+    return runs
+
+
+async def split_covered(type_id: int, from_date: str, to_date: str) -> Tuple[List[Run], List[Run]]:
+    """(mirrored runs, runs still to fetch) of [from_date, to_date]."""
+    store = get_transaction_store()
+    start, end = parse_day(from_date), parse_day(to_date)
+    covered = await asyncio.to_thread(store.covered_days, type_id, start, end)
+    return _runs(start, end, covered, want_covered=True), _runs(start, end, covered, want_covered=False)
+
+
+def _save_closed(store, type_id: int, run: Run, rows: List[dict]):
+    closed_end = min(run[1], last_closed_day())
+    if closed_end >= run[0]:
+        store.save_days(type_id, run[0], closed_end, rows)
+
+
+async def load_mirrored(
+    type_id: int,
+    from_date: str,
+    to_date: str,
+    fetch: RangeFetch,
+    fields: Optional[Sequence[str]] = None,
+) -> List[dict]:
+    """
+    Answer an unfiltered TransactionsList query from the local mirror where every day
+    is covered, and from upstream (concurrently) only for the uncovered sub-ranges.
+    Upstream results for closed days are written back so the next call is local.
+    The sub-ranges never overlap, so their rows are concatenated in date order as
+    returned: a range with nothing mirrored comes back exactly as the ERP sent it.
+
+    `fetch` must return whole rows, since those are what gets stored; with `fields`
+    the mirror reads only those columns and fetched rows are cut down to them.
+    """
+    ensure_sync_started()
+    store = get_transaction_store()
+    start, end = parse_day(from_date), parse_day(to_date)
+    covered = await asyncio.to_thread(store.covered_days, type_id, start, end)
+
+    local_runs = _runs(start, end, covered, want_covered=True)
+    remote_runs = _runs(start, end, covered, want_covered=False)
+
+    async def remote(run: Run) -> List[dict]:
+        rows = await fetch(run[0].isoformat(), run[1].isoformat())
+        await asyncio.to_thread(_save_closed, store, type_id, run, rows)
+        if fields:
+            return [{k: row.get(k) for k in fields} for row in rows]
+        return rows
+
+    def local() -> List[List[dict]]:
+        return [store.query(type_id, a, b, fields) for a, b in local_runs]
+
+    local_chunks, *remote_chunks = await asyncio.gather(
+        asyncio.to_thread(local),
+        *(remote(run) for run in remote_runs),
+    )
+    chunks = sorted(zip(local_runs + remote_runs, local_chunks + remote_chunks), key=lambda c: c[0][0])
+    return [row for _, rows in chunks for row in rows]
+
+
+async def _fetch_for_sync(type_id: int, start: date, end: date) -> List[dict]:
+    # Sales and Purchases validate the same TransactionsList row shape.
+    return await fetch_sales_sharded_async(
+        start.isoformat(), end.isoformat(), type_id, decode=sales_rows.validate_json
+    )
+
+
+async def sync_once() -> Dict[int, Any]:
+    """
+    Bring the mirror up to date: days inside the backfill window that are missing,
+    plus any day anywhere that was marked dirty. Nothing else is downloaded again.
+    """
+    store = get_transaction_store()
+    window_end = last_closed_day()
+    window_start = window_end - timedelta(days=settings.mirror_backfill_days - 1)
+    report: Dict[int, Any] = {}
+
+    for type_id in mirrored_types():
+        covered = await asyncio.to_thread(store.covered_days, type_id, window_start, window_end)
+        runs = _runs(window_start, window_end, covered, want_covered=False)
+        dirty = [d for d in await asyncio.to_thread(store.dirty_days, type_id) if d < window_start]
+        if dirty:
+            runs += _runs(dirty[0], dirty[-1], set(dirty), want_covered=True)
+
+        synced_days = 0
+        for run in runs:
+            rows = await _fetch_for_sync(type_id, *run)
+            await asyncio.to_thread(store.save_days, type_id, run[0], run[1], rows)
+            synced_days += (run[1] - run[0]).days + 1
+        report[type_id] = {"ranges": [(a.isoformat(), b.isoformat()) for a, b in runs], "days": synced_days}
+
+    return report
+
+
+async def _sync_loop():
+    while True:
+        try:
+            report = await sync_once()
+            log.info(f"Transaction mirror sync: {report}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"Transaction mirror sync failed: {e}")
+        await asyncio.sleep(settings.mirror_sync_interval)
+
+
+def ensure_sync_started():
+    """
+    Start the background sync on the running loop (HTTP server or stdio) once, if
+    MIRROR_SYNC asks for it; otherwise nothing is downloaded beyond what queries fetch.
+    """
+    global _sync_task
+    if not settings.mirror_enabled or not settings.mirror_sync or settings.mirror_sync_interval <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    if _sync_task is None or _sync_task.done() or _sync_task.get_loop() is not loop:
+        log.info(
+            f"Transaction mirror sync started: last {settings.mirror_backfill_days} days of "
+            f"types {settings.mirror_transaction_types}, every {settings.mirror_sync_interval} s"
+        )
+        _sync_task = loop.create_task(_sync_loop())
+
+
+async def stop_sync():
+    global _sync_task
+    task, _sync_task = _sync_task, None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
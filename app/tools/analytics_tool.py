@@ -0,0 +1,125 @@
+# app/tools/analytics_tool.py
+from typing import List, Optional, Union
+
+from app.main_ref import mcp
+from app.services.analytics import margin_report, rank_transactions, summarize_transactions
+from app.tools.results import json_result
+
+@mcp.tool(
+    name="summarize_transactions",
+    description=(
+        "Totals of sales or purchases computed on the server, instead of downloading rows with "
+        "get_sales/get_purchases and adding them up. Takes the same filters plus `kind` "
+        "(\"sales\" or \"purchases\"), `group_by` (one or more of day, week, month, quarter, year, "
+        "Shifra, Konsumatori, Komercialisti, Statusi_Faturimit; [] for grand totals only) and `metrics` "
+        "(count, quantity = sum of Sasia, revenue = sum of Sasia * Cmimi, avg_price = revenue / quantity; "
+        "default all). Returns a table {columns, rows, totals}; `order_by` is \"key\" or a metric and "
+        "at most `limit` groups are listed. Without item/partner filters, mirrored days grouped by "
+        "periods, Shifra or Konsumatori are summed from pre-aggregated daily cubes, so long ranges stay fast."
+    )
+)
+async def tool_summarize_transactions(
+    from_date: str,
+    to_date: str,
+    kind: str = "sales",
+    group_by: Union[str, List[str]] = "month",
+    metrics: Optional[List[str]] = None,
+    transaction_type_id: Optional[int] = None,
+    item_id: str = None,
+    item_name: str = None,
+    partner_name: str = None,
+    order_by: Optional[str] = None,
+    limit: int = 100
+):
+    return json_result(await summarize_transactions(
+        kind,
+        from_date,
+        to_date,
+        group_by=[group_by] if isinstance(group_by, str) else group_by,
+        metrics=metrics,
+        transaction_type_id=transaction_type_id,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        order_by=order_by,
+        limit=limit
+    ))
+
+@mcp.tool(
+    name="rank_transactions",
+    description=(
+        "Top or bottom N of sales or purchases grouped by `by` (Shifra, Konsumatori, Komercialisti, "
+        "Statusi_Faturimit, day, week, month, quarter or year), e.g. the 20 best customers by revenue last quarter or "
+        "the best-selling items this month. `metric` is count, quantity, revenue or avg_price and "
+        "`order` is \"top\" or \"bottom\". Ties at the cut-off are included and share a rank; "
+        "`others` totals every group not listed. Takes the same filters as get_sales/get_purchases."
+    )
+)
+async def tool_rank_transactions(
+    from_date: str,
+    to_date: str,
+    by: str = "Shifra",
+    metric: str = "revenue",
+    n: int = 10,
+    order: str = "top",
+    kind: str = "sales",
+    metrics: Optional[List[str]] = None,
+    transaction_type_id: Optional[int] = None,
+    item_id: str = None,
+    item_name: str = None,
+    partner_name: str = None,
+    include_ties: bool = True,
+    include_others: bool = True
+):
+    return json_result(await rank_transactions(
+        kind,
+        from_date,
+        to_date,
+        by=by,
+        metric=metric,
+        n=n,
+        order=order,
+        metrics=metrics,
+        transaction_type_id=transaction_type_id,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        ties=include_ties,
+        others=include_others
+    ))
+
+@mcp.tool(
+    name="margin_report",
+    description=(
+        "Per-item margin over a period, joining sales and purchases by Shifra on the server instead "
+        "of matching get_sales and get_purchases output by hand. Cost is the quantity sold times the "
+        "weighted average purchase price of the item in the same window. Returns Shifra, Emertimi, "
+        "quantity, revenue, unit_cost, cost, margin and margin_pct per item, the `n` items with the "
+        "lowest (`order` \"bottom\", default) or highest (\"top\") `by` (margin, margin_pct, revenue, "
+        "cost or quantity), plus totals. `losses_only` keeps items sold below cost, e.g. \"which items "
+        "lost money this month\". Items without purchases in the window are counted under `uncosted`. "
+        "item_id and item_name filter both sides; partner_name filters the sales customers."
+    )
+)
+async def tool_margin_report(
+    from_date: str,
+    to_date: str,
+    by: str = "margin",
+    order: str = "bottom",
+    n: int = 20,
+    item_id: str = None,
+    item_name: str = None,
+    partner_name: str = None,
+    losses_only: bool = False
+):
+    return json_result(await margin_report(
+        from_date,
+        to_date,
+        by=by,
+        order=order,
+        n=n,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        losses_only=losses_only
+    ))
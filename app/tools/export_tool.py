@@ -0,0 +1,38 @@
+# app/tools/export_tool.py
+from app.main_ref import mcp
+from app.services.export import export_dataset
+from app.tools.results import json_result
+
+@mcp.tool(
+    name="export_dataset",
+    description=(
+        "Write sales, purchases or the whole item catalog (`kind` \"sales\", \"purchases\" or \"items\") "
+        "to a typed file on the server for BI tools, instead of returning rows. `format` is \"parquet\" "
+        "(compressed, default) or \"arrow\" (Arrow IPC file, memory-mappable without copying). Sales and "
+        "purchases need from_date and to_date and take the same filters as get_sales/get_purchases. "
+        "Returns the file path, row count, size and column schema; `file_name` optionally names the "
+        "file inside the server's export directory."
+    )
+)
+async def tool_export_dataset(
+    kind: str,
+    format: str = "parquet",
+    from_date: str = None,
+    to_date: str = None,
+    transaction_type_id: int = None,
+    item_id: str = None,
+    item_name: str = None,
+    partner_name: str = None,
+    file_name: str = None
+):
+    return json_result(await export_dataset(
+        kind,
+        format,
+        from_date=from_date,
+        to_date=to_date,
+        transaction_type_id=transaction_type_id,
+        item_id=item_id,
+        item_name=item_name,
+        partner_name=partner_name,
+        file_name=file_name
+    ))
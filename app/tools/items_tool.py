@@ -1,12 +1,66 @@
 # app/tools/items_tool.py
+from typing import List, Optional
+
 from app.main_ref import mcp
-from app.models.ItemsResponse import ItemsResponse
-from app.services.items import get_items
+from app.models.batch import item_rows
+from app.services.catalog import find_items, search_items
+from app.services.items import get_items_async, get_all_items_async
+from app.tools.results import ToolResult, json_result
 
 @mcp.tool(
     name="get_items",
-    description="Retrieve a paginated list of items plus pagination metadata (total_count, total_pages, current_page)."
+    description=(
+        "Retrieve a paginated list of items plus pagination metadata (total_count, total_pages, current_page). "
+        "`fields` limits each item to the listed columns (e.g. [\"ItemID\", \"ItemName\", \"SalesPrice2\"]) "
+        "and drop_nulls omits empty values; most of the 38 item fields are usually null."
+    )
+)
+async def tool_get_items(
+    page_number: int = 1,
+    page_size: int = 20,
+    fields: Optional[List[str]] = None,
+    drop_nulls: bool = False
+) -> ToolResult:
+    fields = item_rows.field_names(fields) if fields else None  # reject typos before fetching
+    page = await get_items_async(page_number, page_size, fields)
+    return json_result({**page, "items": item_rows.project(page["items"], drop_nulls)})
+
+@mcp.tool(
+    name="get_all_items",
+    description=(
+        "Retrieve the whole item catalog in one call (all pages fetched concurrently on the server, "
+        "de-duplicated by ItemID). Prefer this over paging through get_items."
+    )
+)
+async def tool_get_all_items():
+    return json_result(await get_all_items_async())
+
+@mcp.tool(
+    name="get_items_by_ids",
+    description=(
+        "Look up many items at once from the in-memory catalog. `by` selects the key: "
+        "ItemID (default), PLU, Barcode3, ShifraProdhuesit, ItemGroupID, or 'any' to try the "
+        "item codes and barcodes in turn. Returns {found: {key: [items]}, missing: [keys]}."
+    )
+)
+async def tool_get_items_by_ids(ids: List[str], by: str = "ItemID"):
+    return json_result(await find_items(ids, by))
+
+@mcp.tool(
+    name="find_item",
+    description="Find an item by ItemID, PLU, barcode or producer code using the in-memory catalog."
+)
+async def tool_find_item(code: str):
+    result = await find_items([code], "any")
+    return json_result({"items": result["found"].get(code, []), "catalog_complete": result["catalog_complete"]})
+
+@mcp.tool(
+    name="search_items",
+    description=(
+        "Search items by (partial or misspelled) name, PDA name, producer or producer code. "
+        "Accents are optional (\"cokollate\" finds \"çokollatë\"). Returns up to `limit` items "
+        "ranked by `score`."
+    )
 )
-def tool_get_items(page_number: int = 1, page_size: int = 20) -> ItemsResponse:
-    data = get_items(page_number, page_size)
-    return ItemsResponse.model_validate(data).model_dump()
+async def tool_search_items(query: str, limit: int = 20):
+    return json_result(await search_items(query, limit))
@@ -0,0 +1,22 @@
+# app/tools/pages_tool.py
+from typing import Optional
+
+from app.core.result_sets import result_sets
+from app.main_ref import mcp
+from app.tools.results import json_result
+
+@mcp.tool(
+    name="fetch_page",
+    description=(
+        "Next rows of a get_sales/get_purchases result that was called with `page_size`, served from "
+        "the server's copy without querying the ERP again. Pass the `cursor` it returned and an "
+        "`offset` (the `next_offset` of the previous page); `limit` defaults to that page size. "
+        "A cursor expires some minutes after the original query; then repeat that query."
+    )
+)
+async def tool_fetch_page(
+    cursor: str,
+    offset: int = 0,
+    limit: Optional[int] = None
+):
+    return json_result(result_sets.page(cursor, offset, limit))
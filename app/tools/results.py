@@ -0,0 +1,28 @@
+# app/tools/results.py
+from typing import Any
+
+from mcp.types import TextContent
+
+from app.core.json_codec import dumps, loads
+
+try:
+    from fastmcp.tools.tool import ToolResult
+except ImportError:  # fastmcp >= 3 moved it
+    from fastmcp.tools import ToolResult
+
+
+def json_result(value: Any) -> ToolResult:
+    """
+    Tool result serialized once with the fast codec. Returning plain dicts/lists makes
+    FastMCP serialize them itself (and again as structured content). A dict is still
+    sent as structured content too, as FastMCP does for untyped tools; that copy is
+    decoded from the same bytes, so it always matches the text and is plain JSON
+    already, which is why ToolResult's own conversion pass is skipped.
+    """
+    data = dumps(value)
+    return ToolResult.model_construct(
+        content=[TextContent(type="text", text=data.decode("utf-8"))],
+        structured_content=loads(data) if isinstance(value, dict) else None,
+        meta=None,
+        is_error=False,
+    )
@@ -1,26 +1,45 @@
-from app.services.sales import get_sales
+from typing import List, Optional
+
+from app.services.sales import get_sales_async
+from app.core.config import settings
+from app.core.result_sets import result_sets
 from app.main_ref import mcp
+from app.models.batch import sales_rows
+from app.tools.results import json_result
 
 @mcp.tool(
     name="get_sales",
     description=(
         "Retrieve sales (shitjet) records filtered by a date range, "
-        "with optional filters for transaction type, item ID, item name, and partner name."
+        "with optional filters for transaction type, item ID, item name, and partner name. "
+        "`fields` limits each row to the listed columns (e.g. [\"Data\", \"Shifra\", \"Sasia\", \"Cmimi\"]) "
+        "and drop_nulls omits empty values; both make the result much smaller. With `page_size` only "
+        "that many rows come back, with a `cursor` for fetch_page when more remain."
     )
 )
-def tool_get_sales(
+async def tool_get_sales(
     from_date: str,
     to_date: str,
     transaction_type_id: int = 2,
     item_id: str = None,
     item_name: str = None,
-    partner_name: str = None
+    partner_name: str = None,
+    fields: Optional[List[str]] = None,
+    drop_nulls: bool = False,
+    page_size: Optional[int] = None
 ):
-    return get_sales(
+    fields = sales_rows.field_names(fields) if fields else None  # reject typos before fetching
+    rows = await get_sales_async(
         from_date,
         to_date,
         transaction_type_id=transaction_type_id,
         item_id=item_id,
         item_name=item_name,
-        partner_name=partner_name
+        partner_name=partner_name,
+        fields=fields
     )
+    rows = sales_rows.project(rows, drop_nulls)
+    page_size = page_size if page_size is not None else settings.result_page_size
+    if page_size > 0:
+        return json_result(result_sets.first_page("sales", rows, page_size))
+    return json_result(rows)
@@ -1,10 +1,13 @@
 # app/util/auth.py
-import os, base64
-from typing import Dict
+import asyncio, os, base64, logging, threading
+from typing import AsyncGenerator, Dict, Generator, Optional, Tuple
 
-from app.utils.dpapi import dpapi_unprotect_b64
+import httpx
 
-_ENTROPY = b"FinabitMCP|v1"  
+log = logging.getLogger("finabit-mcp")
+
+_ENTROPY = b"FinabitMCP|v1"
+KR_SERVICE, KR_USERKEY = "finabit-api", "finabit-user"
 try:
     import keyring
 except Exception:
@@ -14,6 +17,8 @@ def _from_dpapi_env():
     u_b64 = os.getenv("BASIC_AUTH_USER_DPAPI")
     p_b64 = os.getenv("BASIC_AUTH_PASS_DPAPI")
     if u_b64 and p_b64:
+        # imported here: app.utils.dpapi binds ctypes.windll at import time
+        from app.utils.dpapi import dpapi_unprotect_b64
         user = dpapi_unprotect_b64(u_b64, _ENTROPY)
         pwd  = dpapi_unprotect_b64(p_b64, _ENTROPY)
         return user, pwd
@@ -22,7 +27,6 @@ def _from_dpapi_env():
 def _from_keyring():
     if not keyring:
         return None
-    KR_SERVICE, KR_USERKEY = "finabit-api", "finabit-user"
     u = keyring.get_password(KR_SERVICE, KR_USERKEY)
     if not u:
         return None
@@ -38,11 +42,118 @@ def _from_plain_env():
         return u, p
     return None
 
+def _basic_header(user: str, pwd: str) -> Dict[str, str]:
+    token = base64.b64encode(f"{user}:{pwd}".encode("utf-8")).decode("ascii")
+    return {"Authorization": f"Basic {token}"}
+
+
+class CredentialProvider:
+    """
+    Resolves the Basic credentials once (keyring, then DPAPI env, then plain env) and
+    keeps them with the prebuilt header in memory. The sources are only consulted
+    again after invalidate(), i.e. on an upstream 401, or replaced by set() when new
+    credentials are stored. The a* variants read the sources in a worker thread, so
+    keyring access and DPAPI decryption never block the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._creds: Optional[Tuple[str, str]] = None
+        self._header: Optional[Dict[str, str]] = None
+        self.resolutions = 0
+
+    def get(self) -> Tuple[Optional[str], Optional[str]]:
+        creds = self._creds
+        if creds is None:
+            with self._lock:
+                if self._creds is None:
+                    self._resolve()
+                creds = self._creds
+        return creds or (None, None)
+
+    async def aget(self) -> Tuple[Optional[str], Optional[str]]:
+        creds = self._creds
+        if creds is None:
+            return await asyncio.to_thread(self.get)
+        return creds
+
+    def header(self) -> Optional[Dict[str, str]]:
+        self.get()
+        return self._header
+
+    async def aheader(self) -> Optional[Dict[str, str]]:
+        await self.aget()
+        return self._header
+
+    def set(self, user: str, pwd: str):
+        with self._lock:
+            self._creds = (user, pwd)
+            self._header = _basic_header(user, pwd)
+
+    def invalidate(self):
+        with self._lock:
+            self._creds = None
+            self._header = None
+
+    def _resolve(self):
+        self.resolutions += 1
+        for source in (_from_keyring, _from_dpapi_env, _from_plain_env):
+            try:
+                up = source()
+            except Exception as e:
+                log.warning(f"Credential source {source.__name__} failed: {e}")
+                up = None
+            if up:
+                self._creds = up
+                self._header = _basic_header(*up)
+                return
+        # nothing found is not cached: credentials may be stored by another process
+
+
+credentials = CredentialProvider()
+
+
+class CachedBasicAuth(httpx.Auth):
+    """
+    httpx auth flow using the cached header. On a 401 the cache is dropped, the
+    sources are read again, and the request is retried once if that produced
+    different credentials.
+    """
+
+    def __init__(self, provider: CredentialProvider):
+        self.provider = provider
+
+    def auth_flow(self, request: httpx.Request) -> Generator[httpx.Request, httpx.Response, None]:
+        header = self.provider.header()
+        if header:
+            request.headers.update(header)
+        response = yield request
+        if response.status_code != 401:
+            return
+        self.provider.invalidate()
+        fresh = self.provider.header()
+        if fresh and fresh != header:
+            request.headers.update(fresh)
+            yield request
+
+    async def async_auth_flow(self, request: httpx.Request) -> AsyncGenerator[httpx.Request, httpx.Response]:
+        header = await self.provider.aheader()
+        if header:
+            request.headers.update(header)
+        response = yield request
+        if response.status_code != 401:
+            return
+        self.provider.invalidate()
+        fresh = await self.provider.aheader()
+        if fresh and fresh != header:
+            request.headers.update(fresh)
+            yield request
+
+
+upstream_auth = CachedBasicAuth(credentials)
+
 def get_basic_header_or_raise() -> Dict[str, str]:
-    for source in (_from_dpapi_env, _from_keyring, _from_plain_env):
-        up = source()
-        if up:
-            user, pwd = up
-            token = base64.b64encode(f"{user}:{pwd}".encode("utf-8")).decode("ascii")
-            return {"Authorization": f"Basic {token}"}
-    raise RuntimeError("No Basic credentials available (DPAPI env / keyring / plain env).")
\ No newline at end of file
+    header = credentials.header()
+    if header:
+        return dict(header)
+    raise RuntimeError("No Basic credentials available (keyring / DPAPI env / plain env).")
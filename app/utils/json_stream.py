@@ -0,0 +1,134 @@
+# app/utils/json_stream.py
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, List
+
+from app.core import json_codec
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_SEP = re.compile(rb"[ \t\n\r,]*")
+_CLOSERS = (b"}", b"]")
+_MAX_CUTS = 8  # closing brackets tried per feed before waiting for more bytes
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for a top-level JSON array: feed() raw body chunks as they
+    arrive and get back the elements completed so far. Only the unparsed tail of the
+    body is kept in memory, never the whole document.
+
+    Elements are decoded by `decode` (json_codec.loads, or e.g. RowValidator.validate_json
+    to validate straight from the bytes), all complete ones of a feed in one call: the
+    buffer is cut after its last closing bracket and the run before it is decoded as an
+    array. A cut inside a string or a nested value leaves something open, so the decoder
+    rejects it with json.JSONDecodeError and the previous closing bracket is tried instead.
+
+    A top-level object (e.g. {"items": [...]}) cannot be streamed; it is buffered and
+    its "items" list is returned by close().
+    """
+
+    def __init__(self, decode: Callable[[bytes], Any] = json_codec.loads):
+        self._decode = decode
+        self._buf = b""
+        self._state = "start"  # start -> array -> done, or start -> document
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._buf += chunk
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        values = self._drain(final=True)
+        if self._state == "document":
+            document = self._decode(self._buf)
+            self._buf = b""
+            self._state = "done"
+            if isinstance(document, dict):
+                return values + list(document.get("items", []))
+            return values + (document if isinstance(document, list) else [document])
+        if self._state != "done":
+            raise json.JSONDecodeError("Truncated JSON array in response body", self._buf.decode("utf-8", "replace"), len(self._buf))
+        return values
+
+    def _drain(self, final: bool) -> List[Any]:
+        buf, pos = self._buf, 0
+
+        if self._state == "start":
+            pos = _WS.match(buf, pos).end()
+            if pos == len(buf):
+                self._buf = b""
+                return []
+            if buf[pos:pos + 1] != b"[":
+                self._state = "document"
+                self._buf = buf[pos:]
+                return []
+            self._state = "array"
+            pos += 1
+
+        if self._state != "array":
+            return []
+
+        pos = _SEP.match(buf, pos).end()
+        rest = buf[pos:]
+        if final or rest.rstrip().endswith(b"]"):
+            try:
+                values = self._decode(b"[" + rest)  # the rest of the array, closing bracket included
+            except json.JSONDecodeError:
+                if final:
+                    raise
+            else:
+                self._buf = b""
+                self._state = "done"
+                return values
+
+        cut = len(rest)
+        for _ in range(_MAX_CUTS):
+            cut = max(rest.rfind(closer, 0, cut) for closer in _CLOSERS)
+            if cut < 0:
+                break
+            try:
+                values = self._decode(b"[" + rest[:cut + 1] + b"]")
+            except json.JSONDecodeError:
+                continue  # inside a string or a nested value; try an earlier bracket
+            self._buf = rest[cut + 1:]
+            return values
+        self._buf = rest
+        return []
+
+
+def iter_json_array(chunks: Iterable[bytes], decode: Callable[[bytes], Any] = json_codec.loads) -> Iterator[Any]:
+    parser = JsonArrayStream(decode)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_json_array(chunks: AsyncIterable[bytes],
+                           decode: Callable[[bytes], Any] = json_codec.loads) -> AsyncIterator[Any]:
+    parser = JsonArrayStream(decode)
+    async for chunk in chunks:
+        for value in parser.feed(chunk):
+            yield value
+    for value in parser.close():
+        yield value
+
+
+def batched(values: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for value in values:
+        batch.append(value)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def abatched(values: AsyncIterable[Any], size: int) -> AsyncIterator[List[Any]]:
+    batch = []
+    async for value in values:
+        batch.append(value)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
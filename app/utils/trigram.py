@@ -0,0 +1,120 @@
+# app/utils/trigram.py
+import heapq
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_EMPTY: frozenset = frozenset()
+
+
+def normalize(text: Optional[str]) -> str:
+    """Casefold and strip diacritics (ë -> e, ç -> c) so "cokollate" finds "çokollatë"."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    plain = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", plain).strip()
+
+
+def trigrams(normalized: str) -> Set[str]:
+    grams: Set[str] = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to documents, for typo-tolerant substring
+    search. Documents are keyed by the caller (e.g. ItemID) and can be added, replaced
+    or removed one at a time, so a changed catalog only touches the changed items.
+
+    A document matches when it shares at least `min_coverage` of the query's trigrams;
+    results are ranked by that coverage, then by an exact-substring bonus, then by the
+    shorter text.
+    """
+
+    def __init__(self, min_coverage: float = 0.4):
+        self.min_coverage = min_coverage
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._docs: Dict[int, Tuple[Hashable, str, int]] = {}  # doc id -> (key, text, gram count)
+        self._ids: Dict[Hashable, int] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def upsert(self, key: Hashable, texts: Iterable[Optional[str]]):
+        text = " ".join(t for t in (normalize(t) for t in texts) if t)
+        with self._lock:
+            self._remove(key)
+            if not text:
+                return
+            grams = trigrams(text)
+            doc_id = self._next_id
+            self._next_id += 1
+            self._ids[key] = doc_id
+            self._docs[doc_id] = (key, text, len(grams))
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting is None:
+                    self._postings[gram] = {doc_id}
+                else:
+                    posting.add(doc_id)
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable):
+        doc_id = self._ids.pop(key, None)
+        if doc_id is None:
+            return
+        _, text, _ = self._docs.pop(doc_id)
+        for gram in trigrams(text):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[Hashable, float]]:
+        """[(key, score)] best first; score is 0..1 (1.5 with the substring bonus)."""
+        q = normalize(query)
+        q_grams = trigrams(q)
+        if not q_grams:
+            return []
+        needed = max(1, int(len(q_grams) * self.min_coverage + 0.999))
+
+        with self._lock:
+            # A match shares >= `needed` grams with the query, so it must appear in one of
+            # the (len - needed + 1) rarest postings; only those seed the candidates and
+            # the common grams are counted by set intersection against them.
+            postings = sorted((self._postings.get(g, _EMPTY) for g in q_grams), key=len)
+            slack = len(postings) - needed + 1
+            hits: Counter = Counter()
+            for posting in postings[:slack]:
+                hits.update(posting)
+            if not hits:
+                return []
+            for posting in postings[slack:]:
+                hits.update(hits.keys() & posting)  # iterates the smaller side
+
+            docs = self._docs
+            total = len(q_grams)
+            candidates = []
+            for doc_id in [d for d, common in hits.items() if common >= needed]:
+                key, text, size = docs[doc_id]
+                score = hits[doc_id] / total + (0.5 if q in text else 0.0)
+                candidates.append((score, -size, key))
+
+        best = heapq.nlargest(limit, candidates, key=lambda c: (c[0], c[1]))
+        return [(key, round(score, 3)) for score, _, key in best]
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self._docs), "trigrams": len(self._postings)}
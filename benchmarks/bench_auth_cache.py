@@ -0,0 +1,74 @@
+# benchmarks/bench_auth_cache.py
+"""
+Per-request bearer verification cost on /mcp: the plain RS256 JWTVerifier against
+CachedJWTVerifier (app/main_ref.py), for sessions that repeat one token, and for a
+client retrying a forged token.
+
+    python benchmarks/bench_auth_cache.py --requests 2000 --sessions 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.main_ref import AuthProvider, CachedJWTVerifier  # noqa: E402
+
+
+def key_pair():
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public = private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return pem, public
+
+
+async def timed(verifier, tokens, expect_valid: bool) -> float:
+    started = time.perf_counter()
+    for token in tokens:
+        access = await verifier.verify_token(token)
+        assert (access is not None) == expect_valid
+    return (time.perf_counter() - started) / len(tokens)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=20, help="distinct tokens in use")
+    args = parser.parse_args()
+
+    private, public = key_pair()
+    exp = int(time.time()) + 3600
+    session_tokens = [
+        jwt.encode({"sub": str(i), "scopes": ["claudeai"], "exp": exp}, private, algorithm="RS256")
+        for i in range(args.sessions)
+    ]
+    requests = [session_tokens[i % args.sessions] for i in range(args.requests)]
+    forged = session_tokens[0][:-4] + ("AAAA" if not session_tokens[0].endswith("AAAA") else "BBBB")
+
+    plain = AuthProvider(public_key=public)
+    cached = CachedJWTVerifier(public_key=public)
+    cases = [
+        ("valid   JWTVerifier (before)", plain, requests, True),
+        ("valid   CachedJWTVerifier", cached, requests, True),
+        ("forged  JWTVerifier (before)", plain, [forged] * args.requests, False),
+        ("forged  CachedJWTVerifier", cached, [forged] * args.requests, False),
+    ]
+    print(f"requests {args.requests}, distinct tokens {args.sessions}")
+    for label, verifier, tokens, valid in cases:
+        seconds = await timed(verifier, tokens, valid)
+        print(f"{label:<30} {seconds * 1e6:9.1f} us/request")
+    print(f"cache    {cached.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+# benchmarks/bench_item_search.py
+"""
+Build time and query latency of the item-name trigram index (app/utils/trigram.py)
+on a synthetic catalog.
+
+    python benchmarks/bench_item_search.py --items 100000 --queries 500
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.trigram import TrigramIndex  # noqa: E402
+
+WORDS = [
+    "çokollatë", "qumësht", "lëng", "molle", "portokall", "djathë", "bukë", "kafe", "çaj",
+    "sheqer", "kripë", "vaj", "ulliri", "miell", "oriz", "makarona", "kos", "gjalpë", "mjaltë",
+    "biskota", "ujë", "mineral", "birrë", "verë", "sallam", "pulë", "peshk", "domate", "speca",
+]
+CONSONANTS = ["b", "c", "ç", "d", "dh", "f", "g", "gj", "h", "j", "k", "l", "ll", "m", "n", "nj", "p",
+              "q", "r", "rr", "s", "sh", "t", "th", "v", "x", "xh", "z", "zh"]
+VOWELS = ["a", "e", "ë", "i", "o", "u", "y"]
+PRODUCERS = ["Rugove", "Bylmeti", "Vita", "Devolli", "Frutomania", "Elkos", "Meridian", "Koral"]
+
+
+def vocabulary(size: int, rng: random.Random):
+    """The real-looking words plus generated ones, so postings are as spread as in a real catalog."""
+    words = set(WORDS)
+    while len(words) < size:
+        words.add("".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_items(n: int, words, rng: random.Random):
+    for i in range(n):
+        name = " ".join(rng.sample(words, 3)) + f" {rng.choice([250, 500, 750, 1000])}g"
+        yield f"A{i:06d}", (name, name.upper()[:20], rng.choice(PRODUCERS), f"P{i % 997}")
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    word = word.replace("ë", "e").replace("ç", "c")
+    if len(word) > 4:
+        i = rng.randrange(1, len(word) - 1)
+        word = word[:i] + word[i + 1:]
+    return word
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    index = TrigramIndex()
+    words = vocabulary(args.vocabulary, rng)
+    items = list(make_items(args.items, words, rng))
+    t0 = time.perf_counter()
+    for key, texts in items:
+        index.upsert(key, texts)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for key, texts in items[:1000]:
+        index.upsert(key, (texts[0] + " extra",) + texts[1:])
+    update = (time.perf_counter() - t0) / 1000
+
+    queries = [
+        " ".join(misspell(w, rng) for w in rng.sample(words, rng.choice([1, 2])))
+        for _ in range(args.queries)
+    ]
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, args.limit)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+
+    print(f"items            {args.items} ({len(words)} distinct words)")
+    print(f"index            {index.stats()}")
+    print(f"build            {build:.2f} s ({build / args.items * 1e6:.1f} us/item)")
+    print(f"incremental      {update * 1e6:.1f} us/upsert")
+    print(f"query p50        {statistics.median(latencies):.2f} ms")
+    print(f"query p95        {latencies[int(len(latencies) * 0.95)]:.2f} ms")
+    print(f"query max        {latencies[-1]:.2f} ms")
+    print(f"example          {queries[0]!r} -> {index.search(queries[0], 3)}")
+
+
+if __name__ == "__main__":
+    main()
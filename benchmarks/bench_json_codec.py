@@ -0,0 +1,123 @@
+# benchmarks/bench_json_codec.py
+"""
+Decode and encode cost of a large sales list: the stdlib/pydantic path the repositories
+and FastMCP used before against app/core/json_codec.py, including the streamed
+TransactionsList path (app/utils/json_stream.py, fed STREAM_CHUNK_SIZE chunks).
+
+    python benchmarks/bench_json_codec.py --rows 100000 --rounds 5
+
+JSON_CODEC=json|orjson|msgspec forces a codec (default: the best one installed).
+"""
+import argparse
+import codecs
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core import json_codec  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.tools.results import json_result  # noqa: E402
+from app.utils.json_stream import iter_json_array  # noqa: E402
+
+_WS = re.compile(r"[ \t\n,]*")
+
+
+def make_rows(n: int, rng: random.Random):
+    start = datetime(2025, 1, 1, 8)
+    return [
+        {
+            "id": i,
+            "data": start + timedelta(minutes=i),
+            "numri": f"F{i}",
+            "id_Konsumatorit": rng.randint(1, 500),
+            "konsumatori": f"Klienti {rng.randint(1, 500)}",
+            "komercialisti": f"Agjent {rng.randint(1, 20)}",
+            "statusi_Faturimit": rng.choice(["Faturuar", "Pa faturuar"]),
+            "shifra": f"A{rng.randint(0, 20000):06d}",
+            "emertimi": "Çokollatë me qumësht 100g",
+            "njesia_Artik": "copë",
+            "sasia": rng.randint(1, 24),
+            "cmimi": round(rng.uniform(0.1, 80), 2),
+            "vlera_Pa_TVSH": round(rng.uniform(1, 500), 4),
+            "rabati": None,
+        }
+        for i in range(n)
+    ]
+
+
+def raw_decode_stream(chunks):
+    """The element loop JsonArrayStream used before: stdlib raw_decode over decoded text."""
+    text, decoder, buf, values = codecs.getincrementaldecoder("utf-8")(), json.JSONDecoder(), "", []
+    for chunk in chunks:
+        buf += text.decode(chunk)
+        pos = _WS.match(buf, 1 if buf.startswith("[") else 0).end()
+        while pos < len(buf) and buf[pos] != "]":
+            try:
+                value, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break
+            values.append(value)
+            pos = _WS.match(buf, pos).end()
+        buf = buf[pos:]
+    return values
+
+
+def timed(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, random.Random(3))
+    body = json.dumps(rows, default=str).encode("utf-8")  # what the ERP sends
+    decoded = json.loads(body)
+    jsonable = TypeAdapter(Any)
+
+    def fastmcp_default():
+        # FastMCP without a pre-serialized result: to JSON-able python, then to text
+        structured = jsonable.dump_python(decoded, mode="json")
+        return jsonable.dump_json(structured, fallback=str).decode()
+
+    size = settings.stream_chunk_size
+    chunks = [body[i:i + size] for i in range(0, len(body), size)]
+    assert len(list(iter_json_array(chunks))) == len(raw_decode_stream(chunks)) == args.rows
+
+    results = [
+        ("stream  stdlib raw_decode (before)", timed(lambda: raw_decode_stream(chunks), args.rounds)),
+        (f"stream  JsonArrayStream/{json_codec.CODEC}", timed(lambda: list(iter_json_array(chunks)), args.rounds)),
+        ("decode  stdlib json.loads(text)", timed(lambda: json.loads(body.decode("utf-8")), args.rounds)),
+        (f"decode  {json_codec.CODEC}.loads(bytes)", timed(lambda: json_codec.loads(body), args.rounds)),
+        ("encode  fastmcp/pydantic result", timed(fastmcp_default, args.rounds)),
+        ("encode  stdlib json.dumps", timed(lambda: json.dumps(decoded, default=str), args.rounds)),
+        (f"encode  {json_codec.CODEC}.dumps_str", timed(lambda: json_codec.dumps_str(decoded), args.rounds)),
+        (f"encode  {json_codec.CODEC}.dumps (datetimes)", timed(lambda: json_codec.dumps(rows), args.rounds)),
+        ("encode  json_result, text + structured", timed(lambda: json_result({"rows": rows}), args.rounds)),
+    ]
+    print(f"rows             {args.rows} ({len(body) / 1e6:.1f} MB of JSON)")
+    print(f"codec            {json_codec.CODEC}")
+    print(f"stream chunks    {len(chunks)} x {size // 1024} KiB")
+    for label, ms in results:
+        print(f"{label:<40} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
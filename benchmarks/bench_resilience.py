@@ -0,0 +1,88 @@
+# benchmarks/bench_resilience.py
+"""
+Drive the repository layer against benchmarks/stub_finabit.py through healthy, overloaded,
+flaky, down and recovered phases, printing what the resilience guard did in each.
+
+    python benchmarks/stub_finabit.py --port 5001 &
+    python benchmarks/bench_resilience.py --url http://127.0.0.1:5001
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def run_phase(name, control, url, requests, concurrency, fetch, guard_stats):
+    import httpx
+
+    async with httpx.AsyncClient() as admin:
+        await admin.post(f"{url}/_control", json=control)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], {}
+
+    async def one(n):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await fetch("2025-01-01", "2025-01-01")
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(requests)))
+    elapsed = time.perf_counter() - started
+    stats = guard_stats()
+    print(f"\n== {name}: {requests} calls in {elapsed:.2f}s, errors {errors or 0}")
+    print(f"   latency p50 {statistics.median(latencies) * 1000:.0f} ms, max {max(latencies) * 1000:.0f} ms")
+    print(f"   breaker {stats['breaker']['state']} (trips {stats['breaker']['trips']}, "
+          f"short-circuited {stats['breaker']['short_circuited']}), retries {stats['retries']}")
+    print(f"   limiter {stats['limiter']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:5001")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SERVER_API_URL", args.url)
+    os.environ.setdefault("FAQ_API_URL", args.url)
+    os.environ.setdefault("BASIC_AUTH_USER", "bench")
+    os.environ.setdefault("BASIC_AUTH_PASS", "bench")
+    os.environ.setdefault("UPSTREAM_BREAKER_RESET", "2")
+    os.environ.setdefault("HTTP_TIMEOUT", "2")
+
+    from app.core.resilience import resilience_stats
+    from app.repositories.sales_repository import _fetch_sales_raw_async
+
+    async def fetch(from_date, to_date):
+        return await _fetch_sales_raw_async(from_date, to_date, 2)
+
+    def guard_stats():
+        return next(iter(resilience_stats().values()))
+
+    base = {"latency": 0.05, "error_rate": 0.0, "down": False, "max_concurrency": 0}
+    phases = [
+        ("healthy", base),
+        ("overloaded (latency grows past 6 concurrent)", {**base, "max_concurrency": 6}),
+        ("flaky (20% 503)", {**base, "error_rate": 0.2}),
+        ("down", {**base, "down": True}),
+    ]
+    for name, control in phases:
+        await run_phase(name, control, args.url, args.requests, args.concurrency, fetch, guard_stats)
+
+    await asyncio.sleep(float(os.environ["UPSTREAM_BREAKER_RESET"]) + 0.1)
+    # the first phase after the reset timeout lets one probe through, the next runs normally
+    await run_phase("recovering (half-open probe)", base, args.url, args.requests, args.concurrency, fetch, guard_stats)
+    await run_phase("recovered", base, args.url, args.requests, args.concurrency, fetch, guard_stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+# benchmarks/bench_row_validation.py
+"""
+Per-row validation cost of TransactionsList and GetAllItems responses: the former
+model_validate(...).model_dump() loop (with its Python float validators, and the second
+ItemsResponse pass get_items used to make) against app/models/batch.py.
+
+    python benchmarks/bench_row_validation.py --rows 100000 --rounds 3
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, field_validator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import json_codec  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.models.batch import item_rows, sales_rows  # noqa: E402
+from app.models.Item import Item  # noqa: E402
+from app.models.Sales import Sales  # noqa: E402
+
+
+class LegacySales(Sales):
+    """Sales as it was validated before: a Python field_validator per numeric field."""
+
+    @field_validator("Sasia", "Cmimi", mode="before")
+    def parse_numeric(cls, v):
+        if v is None:
+            return None
+        try:
+            return float(v)
+        except (ValueError, TypeError):
+            return None
+
+
+class LegacyItem(Item):
+    @field_validator(
+        "VATValue", "AkcizaValue", "MaximumQuantity", "Coefficient", "SalesPrice2", "SalesPrice3",
+        "Weight", "NettoBruttoWeight", "BrutoWeight", "MaxDiscount", mode="before"
+    )
+    def parse_optional_float(cls, v):
+        if v is None:
+            return None
+        try:
+            return float(v)
+        except (ValueError, TypeError):
+            return None
+
+
+class LegacyItemsResponse(BaseModel):
+    items: List[LegacyItem]
+    total_count: int
+    total_pages: int
+    current_page: int
+
+    model_config = ConfigDict(extra="ignore")
+
+
+def make_sales(n: int, rng: random.Random):
+    start = datetime(2025, 1, 1, 8)
+    return [
+        {
+            "id": i,
+            "data": (start + timedelta(minutes=i)).isoformat(),
+            "numri": f"F{i}",
+            "id_Konsumatorit": rng.randint(1, 500),
+            "konsumatori": f"Klienti {rng.randint(1, 500)}",
+            "komercialisti": f"Agjent {rng.randint(1, 20)}",
+            "statusi_Faturimit": rng.choice(["Faturuar", "Pa faturuar"]),
+            "shifra": f"A{rng.randint(0, 20000):06d}",
+            "emertimi": "Çokollatë me qumësht 100g",
+            "njesia_Artik": "copë",
+            "sasia": str(rng.randint(1, 24)),
+            "cmimi": round(rng.uniform(0.1, 80), 2),
+        }
+        for i in range(n)
+    ]
+
+
+def make_items(n: int, rng: random.Random):
+    return [
+        {
+            "itemID": f"A{i:06d}",
+            "itemName": f"Artikulli {i}",
+            "unitName": "copë",
+            "itemGroupID": i % 17,
+            "plu": str(1000 + i),
+            "barcode3": f"38{i:010d}",
+            "prodhuesi": rng.choice(["Rugove", "Vita", "Devolli"]),
+            "vatValue": "18",
+            "salesPrice2": round(rng.uniform(0.1, 80), 2),
+            "weight": "",
+            "id": i,
+        }
+        for i in range(n)
+    ]
+
+
+def timed(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(5)
+
+    sales = make_sales(args.rows, rng)
+    sales_body = json.dumps(sales).encode("utf-8")
+    items = make_items(args.rows, rng)
+    page = {"items": items, "total_count": len(items), "total_pages": 1, "current_page": 1}
+
+    def legacy_items():
+        validated = [LegacyItem.model_validate(i).model_dump() for i in items]
+        return LegacyItemsResponse.model_validate({**page, "items": validated}).model_dump()
+
+    def trusted(fn):
+        def run():
+            settings.upstream_trusted = True
+            try:
+                return fn()
+            finally:
+                settings.upstream_trusted = False
+        return run
+
+    cases = [
+        ("sales   per-row model (before)", lambda: [LegacySales.model_validate(r).model_dump() for r in sales]),
+        ("sales   batch", lambda: sales_rows.validate(sales)),
+        ("sales   batch, trusted", trusted(lambda: sales_rows.validate(sales))),
+        ("sales   codec decode + per-row (before)",
+         lambda: [LegacySales.model_validate(r).model_dump() for r in json_codec.loads(sales_body)]),
+        ("sales   validate_json(bytes)", lambda: sales_rows.validate_json(sales_body)),
+        ("items   per-row + ItemsResponse (before)", legacy_items),
+        ("items   batch", lambda: item_rows.validate(items)),
+        ("items   batch, trusted", trusted(lambda: item_rows.validate(items))),
+    ]
+    print(f"rows             {args.rows}")
+    for label, fn in cases:
+        seconds = timed(fn, args.rounds)
+        print(f"{label:<42} {seconds * 1000:8.1f} ms {seconds / args.rows * 1e6:6.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
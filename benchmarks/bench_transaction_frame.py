@@ -0,0 +1,73 @@
+# benchmarks/bench_transaction_frame.py
+"""
+Memory and filter speed of validated sales rows as a list of dicts against the
+columnar TransactionFrame (app/models/frame.py).
+
+    python benchmarks/bench_transaction_frame.py --rows 500000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_row_validation import make_sales  # noqa: E402
+
+from app.models.batch import sales_rows  # noqa: E402
+from app.models.frame import TransactionFrame  # noqa: E402
+
+
+def traced(build, *args):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    value = build(*args)
+    seconds = time.perf_counter() - t0
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    raw = make_sales(args.rows, random.Random(11))
+    rows, rows_bytes, _ = traced(sales_rows.validate, raw)
+    del raw
+    frame, frame_bytes, build = traced(TransactionFrame.from_batches, (
+        rows[i:i + args.batch] for i in range(0, len(rows), args.batch)
+    ))
+
+    start, end, agents = datetime(2025, 3, 1), datetime(2025, 4, 1), {"Agjent 3", "Agjent 4"}
+    t0 = time.perf_counter()
+    picked = [r for r in rows if start <= r["Data"] < end and r["Komercialisti"] in agents and r["Cmimi"] > 10]
+    rows_filter = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    mask = frame.between(start, end) & frame.isin("Komercialisti", agents) & (frame["Cmimi"] > 10)
+    subset = frame.filter(mask)
+    frame_filter = time.perf_counter() - t0
+    assert subset.to_records() == picked
+
+    t0 = time.perf_counter()
+    frame.to_records()
+    records = time.perf_counter() - t0
+
+    print(f"rows             {args.rows}")
+    print(f"list of dicts    {rows_bytes / 1e6:8.1f} MB")
+    print(f"TransactionFrame {frame_bytes / 1e6:8.1f} MB (nbytes {frame.nbytes / 1e6:.1f} MB), built in {build:.2f} s")
+    print(f"filter rows      {rows_filter * 1000:8.1f} ms")
+    print(f"filter frame     {frame_filter * 1000:8.1f} ms ({len(subset)} rows)")
+    print(f"to_records       {records * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# benchmarks/stub_finabit.py
+"""
+Local stand-in for the Finabit API: GetAllItems, TransactionsList and userinfo with
+deterministic synthetic data, plus knobs to make it slow, flaky or down at runtime.
+
+    python benchmarks/stub_finabit.py --port 5001 --items 5000 --latency 0.05 [--gzip]
+
+Point the server at it with SERVER_API_URL=http://127.0.0.1:5001 and any Basic
+credentials. Behaviour can be changed while it runs:
+
+    POST /_control {"latency": 2.0, "error_rate": 0.3, "status": 503, "down": false,
+                    "max_concurrency": 4}
+    GET  /_stats   -> request counts, errors, peak concurrency
+"""
+import argparse
+import asyncio
+import random
+from datetime import date, timedelta
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+STATE = {
+    "latency": 0.05,        # seconds per request
+    "latency_per_day": 0.0,  # extra seconds per day in a TransactionsList range
+    "error_rate": 0.0,      # share of requests answered with `status`
+    "status": 503,
+    "down": False,          # every request fails with `status` immediately
+    "max_concurrency": 0,   # above this many concurrent requests latency grows linearly; 0 = off
+}
+STATS = {"requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+ITEMS = []
+
+
+def make_items(n: int):
+    rng = random.Random(7)
+    producers = ["Rugove", "Bylmeti", "Vita", "Devolli", "Frutomania"]
+    return [
+        {
+            "itemID": f"A{i:05d}",
+            "itemName": f"Artikulli numër {i} çokollatë" if i % 3 else f"Lëng molle {i}",
+            "unitName": "copë",
+            "itemGroupID": i % 17,
+            "plu": str(1000 + i),
+            "barcode3": f"38{i:010d}",
+            "shifraProdhuesit": f"P{i % 50}",
+            "prodhuesi": rng.choice(producers),
+            "vatValue": "18",
+            "salesPrice2": round(i * 0.5, 2),
+            "id": i,
+        }
+        for i in range(n)
+    ]
+
+
+def rows_for(day: date, type_id: int):
+    rng = random.Random(day.toordinal() * 10 + type_id)
+    return [
+        {
+            "id": day.toordinal() * 1000 + k,
+            "data": f"{day.isoformat()}T10:00:00",
+            "numri": f"F{k}",
+            "id_Konsumatorit": rng.randint(1, 30),
+            "konsumatori": f"Klienti {rng.randint(1, 30)}",
+            "komercialisti": f"Agjent {rng.randint(1, 5)}",
+            "statusi_Faturimit": rng.choice(["Faturuar", "Pa faturuar"]),
+            "shifra": f"A{rng.randint(0, 200):05d}",
+            "emertimi": "Artikull",
+            "njesia_Artik": "copë",
+            "sasia": str(rng.randint(1, 10)),
+            "cmimi": round(rng.uniform(1, 50), 2),
+        }
+        for k in range(rng.randint(20, 60))
+    ]
+
+
+async def _serve(extra_latency: float, build):
+    STATS["requests"] += 1
+    STATS["in_flight"] += 1
+    STATS["peak_in_flight"] = max(STATS["peak_in_flight"], STATS["in_flight"])
+    try:
+        if STATE["down"]:
+            STATS["errors"] += 1
+            return JSONResponse({"error": "down"}, status_code=STATE["status"])
+        latency = STATE["latency"] + extra_latency
+        if STATE["max_concurrency"] and STATS["in_flight"] > STATE["max_concurrency"]:
+            latency *= STATS["in_flight"] / STATE["max_concurrency"]
+        await asyncio.sleep(latency)
+        if random.random() < STATE["error_rate"]:
+            STATS["errors"] += 1
+            return JSONResponse({"error": "injected"}, status_code=STATE["status"])
+        return JSONResponse(build())
+    finally:
+        STATS["in_flight"] -= 1
+
+
+async def items(request: Request):
+    page = int(request.query_params.get("pageNumber", 1))
+    size = min(int(request.query_params.get("pageSize", 20)), 1000)
+    chunk = ITEMS[(page - 1) * size:page * size]
+    return await _serve(0.0, lambda: {
+        "items": chunk,
+        "total_count": len(ITEMS),
+        "total_pages": (len(ITEMS) + size - 1) // size,
+        "current_page": page,
+    })
+
+
+async def transactions(request: Request):
+    start = date.fromisoformat(request.query_params["FromDate"][:10])
+    end = date.fromisoformat(request.query_params["ToDate"][:10])
+    type_id = int(request.query_params.get("TransactionTypeID", 2))
+    days = (end - start).days + 1
+
+    def build():
+        rows = []
+        for n in range(days):
+            rows += rows_for(start + timedelta(days=n), type_id)
+        return rows
+
+    return await _serve(days * STATE["latency_per_day"], build)
+
+
+async def userinfo(request: Request):
+    return JSONResponse({"userId": 1, "username": "stub"})
+
+
+async def control(request: Request):
+    STATE.update(await request.json())
+    return JSONResponse(STATE)
+
+
+async def stats(request: Request):
+    return JSONResponse({**STATS, "state": STATE})
+
+
+app = Starlette(routes=[
+    Route("/api/Items/GetAllItems", items),
+    Route("/api/Transactions/TransactionsList", transactions),
+    Route("/api/Account/userinfo", userinfo),
+    Route("/_control", control, methods=["POST"]),
+    Route("/_stats", stats),
+])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--gzip", action="store_true", help="gzip responses when the client accepts it")
+    args = parser.parse_args()
+    ITEMS.extend(make_items(args.items))
+    STATE.update(latency=args.latency, error_rate=args.error_rate)
+    served = GZipMiddleware(app, minimum_size=500) if args.gzip else app
+    uvicorn.run(served, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
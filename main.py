@@ -1,5 +1,6 @@
 # main.py
 import os, sys, logging, uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
@@ -9,7 +10,13 @@ from fastapi.responses import FileResponse, JSONResponse
 import importlib.metadata
 
 from app.repositories.user_repository import _store_creds
-from app.utils.dpapi import dpapi_unprotect_b64
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.http_client import aclose_http_clients, close_http_client
+from app.core.paths import appdata_path
+from app.repositories.transactions_store import close_transaction_store
+from app.services.catalog import item_catalog
+from app.services.transactions_mirror import ensure_sync_started, stop_sync
 try:
     import fastmcp  
     try:
@@ -41,28 +48,16 @@ def resource_path(*parts: str) -> Path:
         base = Path(__file__).resolve().parent
     return base.joinpath(*parts)
 
-def appdata_path(*parts: str) -> Path:
-    """
-    Persistent, user-writable path (e.g., %APPDATA%/FinabitMCP on Windows).
-    Use for files you create/write at runtime (like install.key).
-    """
-    appdata_root = os.getenv("APPDATA")
-    if appdata_root:
-        root = Path(appdata_root)
-    else:
-        root = Path.home() / ".finabitmcp"
-    d = root / "FinabitMCP"
-    d.mkdir(parents=True, exist_ok=True)
-    return d.joinpath(*parts)
-
 API_URL = os.getenv("API_URL", "http://localhost:5001")
 PORT    = int(os.getenv("PORT", "10000"))
 SSL_CERTFILE = os.getenv("SSL_CERTFILE")  # optional
 SSL_KEYFILE  = os.getenv("SSL_KEYFILE")   # optional
 
 from app.auth import oauth
+from app.auth.state import oauth_store
+from app.admin import router as admin
 from app.main_ref import mcp
-from app.tools import sales_tool, purchases_tool, items_tool, help_tool
+from app.tools import sales_tool, purchases_tool, items_tool, analytics_tool, pages_tool, export_tool, help_tool
 
 BASE_DIR = resource_path()
 
@@ -71,13 +66,31 @@ if not KEY_PATH.exists():
     KEY_PATH.write_text(uuid.uuid4().hex, encoding="ascii")
 
 mcp_app = mcp.http_app(path="/")
-app = FastAPI(lifespan=mcp_app.lifespan)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # FastMCP's session manager first, then the shared upstream pool on the way out
+    async with mcp_app.lifespan(app):
+        ensure_sync_started()
+        item_catalog.ensure_started()
+        oauth_store.ensure_started()
+        try:
+            yield
+        finally:
+            await oauth_store.stop()
+            await item_catalog.stop()
+            await stop_sync()
+            await aclose_http_clients()
+            close_transaction_store()
+
+app = FastAPI(lifespan=lifespan)
 
 static_dir = resource_path("static")
 if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 app.include_router(oauth.router)
+app.include_router(admin.router)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("finabit-mcp")
@@ -96,6 +109,7 @@ def seed_keyring_from_env():
         pass_enc = os.getenv("BASIC_AUTH_PASS_DPAPI")
         if user_enc and pass_enc:
             try:
+                from app.utils.dpapi import dpapi_unprotect_b64  # Windows-only (ctypes.windll)
                 entropy = b"FinabitMCP|v1"
                 username = dpapi_unprotect_b64(user_enc, entropy)
                 password = dpapi_unprotect_b64(pass_enc, entropy)
@@ -113,7 +127,14 @@ async def favicon():
 def health():
     return {"status": "ok"}
 
-app.mount("/mcp", mcp_app)
+app.mount("/mcp", CompressionMiddleware(
+    mcp_app,
+    minimum_size=settings.mcp_compression_min_size,
+    gzip_level=settings.mcp_gzip_level,
+    brotli_quality=settings.mcp_brotli_quality,
+    zstd_level=settings.mcp_zstd_level,
+    event_stream=settings.mcp_compress_event_stream,
+) if settings.mcp_compression else mcp_app)
 
 if __name__ == "__main__":
     import uvicorn
@@ -123,7 +144,11 @@ if __name__ == "__main__":
 
     if want_stdio:
         seed_keyring_from_env() 
-        mcp.run()
+        try:
+            mcp.run()
+        finally:
+            close_http_client()
+            close_transaction_store()
     else:
         logger.info(f"Starting MCP on :{PORT} (API_URL={API_URL})")
         uvicorn.run(
@@ -0,0 +1,64 @@
+# tests/conftest.py
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Settings are read once at import; keep the tests off the real ERP, %APPDATA% and timers.
+os.environ.setdefault("APPDATA", tempfile.mkdtemp(prefix="finabit-tests-"))
+os.environ.setdefault("FAQ_API_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SERVER_API_URL", "http://127.0.0.1:9")
+os.environ.setdefault("MIRROR_ENABLED", "false")
+os.environ.setdefault("CATALOG_REFRESH_INTERVAL", "0")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def stub_url():
+    """benchmarks/stub_finabit.py in a subprocess; yields its base URL."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT / "benchmarks" / "stub_finabit.py"),
+         "--port", str(port), "--items", "2000", "--latency", "0.02"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                httpx.get(f"{url}/_stats", timeout=1)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("stub_finabit.py did not start")
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(5)
+
+
+@pytest.fixture
+def stub(stub_url):
+    """The stub reset to its defaults: fast, healthy, no extra per-day latency."""
+    httpx.post(f"{stub_url}/_control", json={
+        "latency": 0.02, "latency_per_day": 0.0, "error_rate": 0.0,
+        "status": 503, "down": False, "max_concurrency": 0,
+    })
+    return stub_url
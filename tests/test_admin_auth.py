@@ -0,0 +1,52 @@
+# tests/test_admin_auth.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth.config import create_access_token, verify_admin_token
+from app.core.config import settings
+
+
+def _check(header):
+    return asyncio.run(verify_admin_token(header))
+
+
+def test_admin_disabled_without_admin_user_ids(monkeypatch):
+    monkeypatch.setattr(settings, "admin_user_ids", "")
+    with pytest.raises(HTTPException) as e:
+        _check(f"Bearer {create_access_token(1)}")
+    assert e.value.status_code == 403
+
+
+def test_admin_allows_listed_users_only(monkeypatch):
+    monkeypatch.setattr(settings, "admin_user_ids", "1, 7")
+    assert _check(f"Bearer {create_access_token(7)}")["user_id"] == "7"
+    with pytest.raises(HTTPException) as e:
+        _check(f"Bearer {create_access_token(2)}")
+    assert e.value.status_code == 403
+
+
+@pytest.mark.parametrize("header", [None, "Basic abc", "Bearer not-a-jwt"])
+def test_admin_rejects_missing_or_invalid_tokens(monkeypatch, header):
+    monkeypatch.setattr(settings, "admin_user_ids", "1")
+    with pytest.raises(HTTPException) as e:
+        _check(header)
+    assert e.value.status_code == 401
+
+
+def test_diagnostics_require_admin(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.admin.router import router
+
+    monkeypatch.setattr(settings, "admin_user_ids", "1")
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    assert client.get("/admin/diagnostics").status_code == 401
+    assert client.get("/admin/diagnostics", headers={"Authorization": f"Bearer {create_access_token(2)}"}).status_code == 403
+    response = client.get("/admin/diagnostics", headers={"Authorization": f"Bearer {create_access_token(1)}"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"http_pool", "upstream", "coalescing", "auth_cache", "oauth"}
@@ -0,0 +1,64 @@
+# tests/test_cache.py
+import time
+
+from app.core.cache import ResponseCache, approx_size
+from app.core.config import settings
+
+
+def test_hit_miss_and_ttl(monkeypatch):
+    cache = ResponseCache(max_entries=10, max_bytes=10**6)
+    cache.set(("/a", 1), [1, 2, 3], ttl=60)
+    assert cache.get(("/a", 1)) == (True, [1, 2, 3])
+    assert cache.get(("/a", 2)) == (False, None)
+    cache.set(("/a", 3), "x", ttl=0)  # ttl 0: never stored
+    assert cache.get(("/a", 3)) == (False, None)
+
+    clock = time.monotonic() + 61
+    monkeypatch.setattr(time, "monotonic", lambda: clock)
+    assert cache.get(("/a", 1)) == (False, None)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["entries"]) == (1, 3, 1, 0)
+    assert stats["bytes"] == 0
+
+
+def test_least_recently_used_goes_first():
+    cache = ResponseCache(max_entries=2, max_bytes=10**6)
+    cache.set(("/a", 1), "one", ttl=60)
+    cache.set(("/a", 2), "two", ttl=60)
+    cache.get(("/a", 1))  # now the most recent
+    cache.set(("/a", 3), "three", ttl=60)
+    assert cache.get(("/a", 2)) == (False, None)
+    assert cache.get(("/a", 1))[0] and cache.get(("/a", 3))[0]
+    assert cache.evictions == 1
+
+
+def test_byte_bound():
+    value = ["x" * 100] * 10
+    size = approx_size(value)
+    cache = ResponseCache(max_entries=100, max_bytes=size * 2)
+    for n in range(3):
+        cache.set(("/a", n), value, ttl=60)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == size * 2
+    cache.set(("/a", "big"), value * 3, ttl=60)  # larger than the whole cache: skipped
+    assert cache.get(("/a", "big")) == (False, None)
+    assert cache.stats()["entries"] == 2
+
+
+def test_overwrite_and_flush_per_endpoint():
+    cache = ResponseCache(max_entries=10, max_bytes=10**6)
+    cache.set(("/a", 1), "old", ttl=60)
+    cache.set(("/a", 1), "new", ttl=60)
+    cache.set(("/b", 1), "b", ttl=60)
+    assert cache.get(("/a", 1)) == (True, "new")
+    assert cache.stats()["entries_per_endpoint"] == {"/a": 1, "/b": 1}
+    assert cache.flush("/a") == 1
+    assert cache.stats()["entries_per_endpoint"] == {"/b": 1}
+    assert cache.flush() == 1 and cache.stats()["bytes"] == 0
+
+
+def test_disabled_cache_stores_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    cache = ResponseCache(max_entries=10, max_bytes=10**6)
+    cache.set(("/a", 1), "x", ttl=60)
+    assert cache.get(("/a", 1)) == (False, None)
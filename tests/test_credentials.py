@@ -0,0 +1,74 @@
+# tests/test_credentials.py
+import asyncio
+import threading
+
+import httpx
+
+from app.utils import auth
+from app.utils.auth import CachedBasicAuth, CredentialProvider
+
+
+def _sources(monkeypatch, **found):
+    calls = []
+
+    def source(name):
+        def read():
+            calls.append((name, threading.current_thread() is threading.main_thread()))
+            return found.get(name)
+        return read
+
+    for name in ("keyring", "dpapi_env", "plain_env"):
+        monkeypatch.setattr(auth, f"_from_{name}", source(name))
+    return calls
+
+
+def test_keyring_is_read_first(monkeypatch):
+    calls = _sources(monkeypatch, keyring=("k", "1"), dpapi_env=("d", "2"), plain_env=("p", "3"))
+    provider = CredentialProvider()
+    assert provider.get() == ("k", "1")
+    assert provider.get() == ("k", "1")
+    assert [name for name, _ in calls] == ["keyring"]  # cached after the first lookup
+
+
+def test_falls_back_to_env_sources(monkeypatch):
+    _sources(monkeypatch, dpapi_env=("d", "2"), plain_env=("p", "3"))
+    assert CredentialProvider().get() == ("d", "2")
+    _sources(monkeypatch, plain_env=("p", "3"))
+    assert CredentialProvider().get() == ("p", "3")
+    _sources(monkeypatch)
+    assert CredentialProvider().get() == (None, None)
+
+
+def test_async_lookup_runs_off_the_loop(monkeypatch):
+    calls = _sources(monkeypatch, keyring=("k", "1"))
+    provider = CredentialProvider()
+    assert asyncio.run(provider.aget()) == ("k", "1")
+    assert calls == [("keyring", False)]
+
+
+def test_async_auth_flow_reloads_on_401(monkeypatch):
+    found = {"keyring": ("old", "pw")}
+    calls = []
+
+    def keyring():
+        calls.append(threading.current_thread() is threading.main_thread())
+        return found["keyring"]
+
+    monkeypatch.setattr(auth, "_from_keyring", keyring)
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200 if len(seen) > 1 else 401)
+
+    async def run():
+        provider = CredentialProvider()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await provider.aget()
+            found["keyring"] = ("new", "pw")  # changed by another login meanwhile
+            return await client.get("http://erp/api/Account/userinfo", auth=CachedBasicAuth(provider))
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert seen == [auth._basic_header("old", "pw")["Authorization"], auth._basic_header("new", "pw")["Authorization"]]
+    assert calls == [False, False]
@@ -0,0 +1,45 @@
+# tests/test_http_client.py
+import asyncio
+import threading
+
+from app.core import http_client
+from app.core.http_client import aclose_http_clients, get_async_http_client
+
+
+async def _get():
+    return get_async_http_client()
+
+
+def test_one_async_client_per_loop_all_closed_at_shutdown():
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    try:
+        theirs = asyncio.run_coroutine_threadsafe(_get(), other).result(5)
+
+        async def main():
+            ours = get_async_http_client()
+            assert get_async_http_client() is ours
+            assert ours is not theirs
+            await aclose_http_clients()
+            return ours
+
+        ours = asyncio.run(main())
+        assert ours.is_closed and theirs.is_closed
+        assert http_client._async_clients == {}
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(5)
+        other.close()
+
+
+def test_client_of_a_closed_loop_is_dropped():
+    first = asyncio.run(_get())  # loop ends without aclose_http_clients()
+
+    async def main():
+        client = get_async_http_client()
+        assert first not in http_client._async_clients.values()
+        assert list(http_client._async_clients.values()) == [client]
+        await aclose_http_clients()
+
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+# tests/test_items_repository.py
+import asyncio
+
+from app.repositories import items_repository
+from app.repositories.items_repository import iter_item_pages_async
+
+ITEMS = [{"ItemID": str(i)} for i in range(2500)]
+
+
+def _server(cap: int, requested_total_pages: bool, items=ITEMS):
+    """A GetAllItems that caps pageSize at `cap`; optionally reports total_pages for the requested size."""
+    calls = []
+
+    async def fetch(page_number: int, page_size: int):
+        calls.append((page_number, page_size))
+        size = min(page_size, cap)
+        pages_for = page_size if requested_total_pages else size
+        return {
+            "items": items[(page_number - 1) * size:page_number * size],
+            "total_count": len(items),
+            "total_pages": -(-len(items) // pages_for),
+            "current_page": page_number,
+        }
+
+    return fetch, calls
+
+
+async def _crawl(page_size: int):
+    return [page async for page in iter_item_pages_async(page_size, concurrency=4)]
+
+
+async def _attempt(page_size: int, attempts: int):
+    return [page async for page in iter_item_pages_async(page_size, concurrency=4, attempts=attempts)]
+
+
+def test_page_size_follows_the_server_cap(monkeypatch):
+    fetch, calls = _server(cap=1000, requested_total_pages=True)
+    monkeypatch.setattr(items_repository, "_fetch_items_page_async", fetch)
+    pages = asyncio.run(_crawl(5000))
+    ids = [item["ItemID"] for page in pages for item in page["items"]]
+    assert sorted(ids, key=int) == [item["ItemID"] for item in ITEMS]
+    assert sorted(calls) == [(1, 5000), (2, 1000), (3, 1000)]
+
+
+def test_uncapped_page_size_is_kept(monkeypatch):
+    fetch, calls = _server(cap=1000, requested_total_pages=False)
+    monkeypatch.setattr(items_repository, "_fetch_items_page_async", fetch)
+    pages = asyncio.run(_crawl(600))
+    assert sum(len(page["items"]) for page in pages) == len(ITEMS)
+    assert sorted(calls) == [(n, 600) for n in range(1, 6)]
+
+
+def test_catalog_within_page_one(monkeypatch):
+    fetch, calls = _server(cap=1000, requested_total_pages=True, items=ITEMS[:10])
+    monkeypatch.setattr(items_repository, "_fetch_items_page_async", fetch)
+    assert len(asyncio.run(_crawl(5000))) == 1
+    assert calls == [(1, 5000)]
+
+
+def test_failed_page_is_reported(monkeypatch):
+    fetch, calls = _server(cap=1000, requested_total_pages=False)
+
+    async def flaky(page_number: int, page_size: int):
+        if page_number == 2:
+            calls.append((page_number, page_size))
+            raise RuntimeError("HTTP 500")
+        return await fetch(page_number, page_size)
+
+    monkeypatch.setattr(items_repository, "_fetch_items_page_async", flaky)
+    pages = asyncio.run(_attempt(1000, attempts=0))
+    assert {"current_page": 2, "items": [], "error": "HTTP 500"} in pages
+    assert calls.count((2, 1000)) == 1  # attempts=0 still tries once
+    assert sum(len(page["items"]) for page in pages) == len(ITEMS) - 1000
@@ -0,0 +1,77 @@
+# tests/test_json_stream.py
+import asyncio
+import json
+
+import pytest
+
+from app.utils.json_stream import JsonArrayStream, abatched, aiter_json_array, batched, iter_json_array
+
+ROWS = [
+    {"id": i, "konsumatori": "Klienti çë", "emertimi": 'tricky "},{" ]', "sasia": str(i), "cmimi": 1.5,
+     "tags": [{"a": []}, None]}
+    for i in range(50)
+] + [7, -1.25e3, "a]", None, [], {}]
+BODY = json.dumps(ROWS, ensure_ascii=False).encode("utf-8")
+
+
+def _chunks(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1000, len(BODY)])
+def test_elements_split_across_chunks(size):
+    assert list(iter_json_array(_chunks(BODY, size))) == ROWS
+
+
+def test_multibyte_character_split_between_chunks():
+    body = json.dumps([{"name": "çokollatë"}], ensure_ascii=False).encode("utf-8")
+    cut = body.index("ç".encode("utf-8")) + 1  # inside the two-byte sequence
+    assert list(iter_json_array([body[:cut], body[cut:]])) == [{"name": "çokollatë"}]
+
+
+def test_feed_returns_completed_elements_only():
+    parser = JsonArrayStream()
+    assert parser.feed(b'[{"id": 1}, {"id": 2') == [{"id": 1}]
+    assert parser.feed(b'}, 3') == [{"id": 2}]
+    assert parser.feed(b"0") == []  # a number at the edge may still be growing
+    assert parser.feed(b"]") == [30]
+    assert parser.close() == []
+
+
+def test_top_level_object_returns_items():
+    assert list(iter_json_array([b'{"items": [', b'{"a": 1}]}'])) == [{"a": 1}]
+
+
+@pytest.mark.parametrize("body", [b"", b"[1, 2", b'[{"a": 1}', b'[{"a": "}]'])
+def test_truncated_body_raises(body):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array([body]))
+
+
+def test_async_stream_and_batches():
+    async def chunks():
+        for chunk in _chunks(BODY, 5):
+            yield chunk
+
+    async def run():
+        return [batch async for batch in abatched(aiter_json_array(chunks()), 16)]
+
+    batches = asyncio.run(run())
+    assert [len(b) for b in batches] == [16, 16, 16, 8]
+    assert sum(batches, []) == ROWS
+    assert list(batched(ROWS, 16)) == batches
+
+
+def test_rows_validated_straight_from_bytes():
+    from app.models.batch import sales_rows
+
+    raw = [
+        {"id": i, "data": "2024-01-02T10:00:00", "shifra": f"A{i}", "konsumatori": 'Klienti "},{"',
+         "sasia": str(i), "cmimi": 2.5}
+        for i in range(40)
+    ]
+    body = json.dumps(raw).encode("utf-8")
+    for size in (3, 50, len(body)):
+        assert list(iter_json_array(_chunks(body, size), sales_rows.validate_json)) == sales_rows.validate(raw)
+    envelope = json.dumps({"items": raw}).encode("utf-8")
+    assert list(iter_json_array([envelope], sales_rows.validate_json)) == sales_rows.validate(raw)
@@ -0,0 +1,67 @@
+# tests/test_oauth_store.py
+from datetime import datetime, timedelta
+
+from app.auth.state import AuthCode, AuthRequest, OAuthStore, RegisteredClient
+from app.core.config import settings
+
+LATER = timedelta(days=400)
+
+
+def _request(request_id: str = "r1") -> AuthRequest:
+    return AuthRequest(request_id, "client", "https://example.test/cb", "claudeai", "s", "c", "S256")
+
+
+def test_requests_expire_on_lookup(monkeypatch):
+    store = OAuthStore()
+    store.add_request(_request())
+    assert store.get_request("r1") is not None
+    monkeypatch.setattr(settings, "oauth_request_ttl", -1)
+    assert store.get_request("r1") is None
+    assert "r1" not in store.requests
+
+
+def test_tokens_are_kept_by_hash_only():
+    store = OAuthStore()
+    store.add_token("secret", 7, datetime.utcnow() + timedelta(hours=1))
+    assert "secret" not in store.tokens
+    assert store.get_token("secret").user_id == 7
+    assert store.get_token("other") is None
+    assert store.pop_token("secret").user_id == 7
+    assert store.get_token("secret") is None
+
+
+def test_sweep_drops_expired_records_and_keeps_live_ones():
+    store = OAuthStore()
+    now = datetime.utcnow()
+    store.add_request(_request())
+    store.add_code(AuthCode("old", 7, "client", "claudeai", "c", expires_at=now - timedelta(seconds=1)))
+    store.add_code(AuthCode("new", 7, "client", "claudeai", "c"))
+    store.add_token("gone", 7, now - timedelta(seconds=1))
+    store.add_token("live", 7, now + timedelta(hours=1))
+    assert store.sweep(now) == 2
+    assert set(store.codes) == {"new"}
+    assert store.get_token("live") is not None and store.get_token("gone") is None
+    assert store.get_request("r1") is not None
+    assert store.sweep(now + timedelta(seconds=settings.oauth_request_ttl + 1)) == 2  # r1, "new"
+    assert store.stats() == {"requests": 0, "codes": 0, "tokens": 1, "clients": 0, "swept": 4}
+
+
+def test_registered_clients_never_expire_by_default():
+    store = OAuthStore()
+    store.add_client(RegisteredClient("client", ["https://example.test/cb"]))
+    assert store.sweep(datetime.utcnow() + LATER) == 0
+    assert store.get_client("client") is not None
+
+
+def test_client_ttl_is_opt_in(monkeypatch):
+    monkeypatch.setattr(settings, "oauth_client_ttl", 3600)
+    store = OAuthStore()
+    store.add_client(RegisteredClient("idle", ["https://example.test/cb"]))
+    store.add_client(RegisteredClient("used", ["https://example.test/cb"]))
+    store.clients["idle"].last_used -= timedelta(hours=2)
+    store.clients["used"].last_used -= timedelta(minutes=30)
+    assert store.get_client("used") is not None  # refreshes last_used
+    assert store.sweep() == 1
+    assert set(store.clients) == {"used"}
+    store.clients["used"].last_used -= timedelta(hours=2)
+    assert store.get_client("used") is None and not store.clients
@@ -0,0 +1,225 @@
+# tests/test_resilience.py
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core import resilience
+from app.core.config import settings
+from app.core.http_client import aclose_http_clients, api_get_async
+from app.core.resilience import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, HostGuard
+from app.repositories.sharding import fetch_sharded
+
+
+def _hold(limiter: AdaptiveLimiter, n: int):
+    for _ in range(n):
+        limiter.acquire(1)
+
+
+def test_limiter_grows_while_in_use():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=10, tolerance=0)
+    for _ in range(20):
+        _hold(limiter, int(limiter.limit))
+        for _ in range(int(limiter.limit)):
+            limiter.release(0.01, overloaded=False, endpoint="/a")
+    assert limiter.limit > 4
+    assert limiter.decreases == 0
+
+
+def test_limiter_does_not_grow_when_idle():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=10, tolerance=0)
+    for _ in range(20):
+        _hold(limiter, 1)
+        limiter.release(0.01, overloaded=False, endpoint="/a")
+    assert limiter.limit == 4
+
+
+def test_limiter_backs_off_on_overload():
+    limiter = AdaptiveLimiter(initial=8, minimum=2, maximum=10, tolerance=0, backoff=0.5)
+    _hold(limiter, 1)
+    limiter.release(0.01, overloaded=True)
+    assert limiter.limit == 4
+    _hold(limiter, 1)
+    limiter.release(0.01, overloaded=True)  # same round trip: not cut twice
+    assert limiter.limit == 4
+    limiter._last_decrease -= 1
+    _hold(limiter, 1)
+    limiter.release(0.01, overloaded=True)
+    assert limiter.limit == 2  # floored at minimum
+    assert limiter.decreases == 2
+
+
+def test_limiter_ignores_latency_by_default():
+    limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=10, tolerance=0)
+    for latency in (0.01, 5.0, 0.01, 9.0):
+        _hold(limiter, 1)
+        limiter.release(latency, overloaded=False, endpoint="/a")
+        limiter._last_decrease -= 10
+    assert limiter.decreases == 0
+    assert limiter.baselines == {}
+
+
+def test_limiter_compares_latency_per_endpoint():
+    limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=10, tolerance=2.0)
+    for endpoint, latency in (("/items", 0.02), ("/transactions", 1.5), ("/items", 0.03), ("/transactions", 1.6)):
+        _hold(limiter, 1)
+        limiter.release(latency, overloaded=False, endpoint=endpoint)
+    assert limiter.decreases == 0
+    _hold(limiter, 1)
+    limiter.release(0.5, overloaded=False, endpoint="/items")  # 25x its own baseline
+    assert limiter.decreases == 1
+    assert limiter.stats()["baseline_ms"] == {"/items": 20.0, "/transactions": 1500.0}
+
+
+def test_limiter_rejects_after_queue_timeout():
+    limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=1, tolerance=0)
+    _hold(limiter, 1)
+    with pytest.raises(resilience.UpstreamError):
+        limiter.acquire(0.05)
+    assert limiter.rejected == 1
+
+
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker("erp", threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.before()
+        breaker.failure("HTTP 502")
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    time.sleep(0.06)
+    breaker.before()  # the single half-open probe
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before()  # everyone else still fails fast
+    breaker.success()
+    assert breaker.state == "closed"
+    breaker.before()
+
+
+def _response(status: int) -> httpx.Response:
+    return httpx.Response(status, request=httpx.Request("GET", "http://erp/api/Transactions/TransactionsList"))
+
+
+def test_host_guard_counts_only_outages_toward_breaker(guards):
+    guard = HostGuard("erp")
+    for status in (500, 400, 404) * settings.upstream_breaker_failures:
+        guard.admit()
+        guard.done(0.01, _response(status))
+    assert guard.breaker.state == "closed"
+    for _ in range(settings.upstream_breaker_failures):
+        guard.admit()
+        guard.done(0.01, _response(502))
+    assert guard.breaker.state == "open"
+
+
+def test_pool_timeout_is_retried_but_no_overload_or_outage(guards):
+    guard = HostGuard("erp")
+    limit = guard.limiter.limit
+    for _ in range(settings.upstream_breaker_failures * 2):
+        guard.admit()
+        guard.done(0.5, error=httpx.PoolTimeout("no free connection"))
+    assert guard.breaker.state == "closed" and guard.breaker.failures == 0
+    assert guard.limiter.limit == limit and guard.limiter.decreases == 0
+    assert guard.limiter.in_flight == 0
+    assert guard.retry_delay(0, error=httpx.PoolTimeout("no free connection")) is not None
+    guard.admit()
+    guard.done(0.5, error=httpx.ReadTimeout("slow"))
+    assert guard.limiter.decreases == 1 and guard.breaker.failures == 1
+
+
+def test_invalid_dates_never_reach_upstream(stub, monkeypatch):
+    from app.services.purchases import get_purchases_async
+    from app.services.sales import get_sales_async, iter_sales
+
+    monkeypatch.setattr(settings, "server_api_url", stub)
+    before = httpx.get(f"{stub}/_stats").json()["requests"]
+    with pytest.raises(ValueError, match="from_date 'bad'"):
+        asyncio.run(get_sales_async("bad", "2024-01-31"))
+    with pytest.raises(ValueError, match="to_date '2024-02-30'"):
+        asyncio.run(get_purchases_async("2024-02-01", "2024-02-30"))
+    with pytest.raises(ValueError):
+        next(iter_sales("2024-01-01", None))
+    assert httpx.get(f"{stub}/_stats").json()["requests"] == before
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker("erp", threshold=1, reset_timeout=0.05)
+    breaker.before()
+    breaker.failure("HTTP 503")
+    time.sleep(0.06)
+    breaker.before()
+    breaker.failure("HTTP 503")
+    assert breaker.state == "open"
+    assert breaker.trips == 2
+
+
+@pytest.fixture
+def guards(monkeypatch):
+    monkeypatch.setattr(resilience, "_guards", {})
+    monkeypatch.setattr(settings, "upstream_resilience", True)
+    return resilience._guards
+
+
+def test_host_guard_breaker_against_stub(stub, guards, monkeypatch):
+    monkeypatch.setattr(settings, "upstream_retry_attempts", 1)
+    monkeypatch.setattr(settings, "upstream_breaker_reset", 0.2)
+    httpx.post(f"{stub}/_control", json={"down": True, "status": 502})
+
+    async def run():
+        try:
+            for _ in range(settings.upstream_breaker_failures):
+                response = await api_get_async(f"{stub}/api/Account/userinfo")
+                assert response.status_code == 200  # userinfo ignores "down"
+            for _ in range(settings.upstream_breaker_failures):
+                response = await api_get_async(f"{stub}/api/Items/GetAllItems")
+                assert response.status_code == 502
+            with pytest.raises(CircuitOpenError):
+                await api_get_async(f"{stub}/api/Items/GetAllItems")
+            httpx.post(f"{stub}/_control", json={"down": False})
+            await asyncio.sleep(0.25)
+            response = await api_get_async(f"{stub}/api/Items/GetAllItems")
+            assert response.status_code == 200
+        finally:
+            await aclose_http_clients()
+
+    asyncio.run(run())
+    (guard,) = guards.values()
+    assert guard.breaker.state == "closed"
+    assert guard.breaker.trips == 1
+
+
+def test_limit_stays_put_under_normal_load(stub, guards):
+    """Item pages and multi-day TransactionsList shards side by side: no overload, no back-off."""
+    httpx.post(f"{stub}/_control", json={"latency_per_day": 0.01})
+
+    async def transactions(from_date: str, to_date: str):
+        response = await api_get_async(
+            f"{stub}/api/Transactions/TransactionsList",
+            params={"FromDate": from_date, "ToDate": to_date, "TransactionTypeID": 2},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def items(page: int):
+        response = await api_get_async(f"{stub}/api/Items/GetAllItems",
+                                       params={"pageNumber": page, "pageSize": 100})
+        response.raise_for_status()
+
+    async def run():
+        try:
+            (rows, failed), *_ = await asyncio.gather(
+                fetch_sharded(transactions, "2024-01-01", "2024-06-30", shard_days=3, concurrency=4),
+                *(items(page) for page in range(1, 21)),
+            )
+            return rows, failed
+        finally:
+            await aclose_http_clients()
+
+    rows, failed = asyncio.run(run())
+    assert rows and not failed
+    (guard,) = guards.values()
+    assert guard.limiter.decreases == 0
+    assert guard.limiter.rejected == 0
+    assert int(guard.limiter.limit) >= settings.upstream_initial_concurrency
@@ -0,0 +1,54 @@
+# tests/test_row_validation.py
+from datetime import datetime
+
+import orjson
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.batch import item_rows, sales_rows
+
+ROW = {"id": 7, "data": "2024-03-01T09:00:00", "numri": "F1", "shifra": "A1", "sasia": "2", "cmimi": 2.5,
+       "konsumatori": "Klienti"}
+
+
+@pytest.fixture(params=[False, True], ids=["checked", "trusted"])
+def trusted(request, monkeypatch):
+    monkeypatch.setattr(settings, "upstream_trusted", request.param)
+    return request.param
+
+
+def test_fields_validate_only_those_columns(trusted):
+    bad = {**ROW, "id": "not a number"}  # not requested, so never looked at
+    rows = sales_rows.validate_json(orjson.dumps([ROW, bad]), ["Sasia", "shifra", "Data"])
+    assert rows == [{"Sasia": 2.0, "Shifra": "A1", "Data": datetime(2024, 3, 1, 9)}] * 2
+    assert list(rows[0]) == ["Sasia", "Shifra", "Data"]
+    if not trusted:  # trusted mode passes ints through unchecked
+        with pytest.raises(ValidationError):
+            sales_rows.validate_json(orjson.dumps([bad]), ["ID"])
+
+
+def test_whole_rows_without_fields(trusted):
+    (row,) = sales_rows.validate([ROW])
+    assert set(row) == set(sales_rows.model.model_fields)
+    assert row["Konsumatori"] == "Klienti" and row["Komercialisti"] is None
+
+
+def test_field_set_adapters_are_cached():
+    adapter = sales_rows.adapter_for(["Shifra", "Sasia"])
+    assert sales_rows.adapter_for(["shifra", "SASIA"]) is adapter
+    assert sales_rows.adapter_for(["Sasia", "Shifra"]) is not adapter
+    assert sales_rows.adapter_for(None) is sales_rows.adapter
+
+
+def test_envelope_and_unknown_fields():
+    body = orjson.dumps({"items": [{"itemID": "X1", "itemName": "Qumësht"}]})
+    assert item_rows.validate_json(body, ["ItemID"]) == [{"ItemID": "X1"}]
+    with pytest.raises(ValueError, match="Unknown field"):
+        item_rows.adapter_for(["Nope"])
+
+
+def test_drop_nulls():
+    rows = sales_rows.validate([ROW], ["Shifra", "Komercialisti"])
+    assert sales_rows.project(rows, drop_nulls=True) == [{"Shifra": "A1"}]
+    assert sales_rows.project(rows) is rows
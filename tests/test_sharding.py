@@ -0,0 +1,84 @@
+# tests/test_sharding.py
+import asyncio
+import random
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+
+from app.repositories.sharding import fetch_sharded, merge_rows
+
+
+def line(doc: int, day: date, shifra: str, sasia: float = 1.0):
+    return {"ID": doc, "Data": datetime(day.year, day.month, day.day, 9), "Shifra": shifra,
+            "Sasia": sasia, "Cmimi": 2.5}
+
+
+def test_lines_of_one_document_are_kept():
+    day = date(2024, 1, 2)
+    lines = [line(42, day, "A1"), line(42, day, "B2"), line(42, day, "A1", sasia=3.0)]
+    assert merge_rows([(day, lines)]) == lines
+
+
+def test_chunks_follow_shard_order_and_repeats_across_shards_are_dropped():
+    first, second = date(2024, 1, 1), date(2024, 1, 2)
+    early = [line(1, first, "A1"), line(1, first, "B2")]
+    late = [line(2, second, "C3"), early[1]]
+    assert merge_rows([(second, late), (first, early)]) == early + late[:1]
+
+
+def test_fetch_sharded_keeps_every_line():
+    async def fetch(from_date, to_date):
+        start, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+        days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        return [line(d.toordinal(), d, shifra) for d in days for shifra in ("A1", "B2")]
+
+    rows, failed = asyncio.run(fetch_sharded(fetch, "2024-01-01", "2024-01-10", shard_days=3))
+    assert not failed
+    assert len(rows) == 20
+    assert [r["Data"] for r in rows] == sorted(r["Data"] for r in rows)
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "http://erp.test/api/Transactions/TransactionsList")
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=httpx.Response(status, request=request))
+
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    async def fetch(from_date, to_date):
+        calls.append((from_date, to_date))
+        raise _status_error(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(fetch_sharded(fetch, "2024-01-01", "2024-01-10", shard_days=10, attempts=3))
+    assert len(calls) == 1
+
+
+def test_throttling_is_retried(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda a, b: 0)
+    calls = []
+
+    async def fetch(from_date, to_date):
+        calls.append((from_date, to_date))
+        if len(calls) == 1:
+            raise _status_error(429)
+        return [line(1, date.fromisoformat(from_date), "A1")]
+
+    rows, failed = asyncio.run(fetch_sharded(fetch, "2024-01-01", "2024-01-01", attempts=3))
+    assert len(calls) == 2 and len(rows) == 1 and not failed
+
+
+def test_pool_timeouts_do_not_split_shards(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda a, b: 0)
+    calls = []
+
+    async def fetch(from_date, to_date):
+        calls.append((from_date, to_date))
+        if len(calls) == 1:
+            raise httpx.PoolTimeout("no free connection")
+        return []
+
+    rows, failed = asyncio.run(fetch_sharded(fetch, "2024-01-01", "2024-01-04", shard_days=4, attempts=3))
+    assert calls == [("2024-01-01", "2024-01-04")] * 2 and not failed
@@ -0,0 +1,99 @@
+# tests/test_singleflight.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core import singleflight
+from app.core.singleflight import SingleFlight, make_key
+
+
+@pytest.fixture
+def flight(monkeypatch):
+    monkeypatch.setattr(singleflight, "_groups", {})
+    return SingleFlight("test")
+
+
+def test_make_key_normalizes_params():
+    assert make_key("/a", {"b": 2, "a": " x ", "c": None, "d": ""}) == ("/a", ("a", "x"), ("b", "2"))
+    assert make_key("/a", {"a": 1}) == make_key("/a", {"a": "1"})
+    assert make_key("/a", {"a": 1}, scope="sales") != make_key("/a", {"a": 1}, scope="purchases")
+
+
+def test_concurrent_calls_share_one_execution(flight):
+    runs = []
+
+    async def load():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"rows": [1, 2]}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", load) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(runs) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats() == {"calls": 10, "upstream_calls": 1, "coalesced": 9, "in_flight": 0}
+
+
+def test_finished_calls_are_not_remembered(flight):
+    async def run():
+        await flight.do("k", lambda: asyncio.sleep(0, "a"))
+        return await flight.do("k", lambda: asyncio.sleep(0, "b"))
+
+    assert asyncio.run(run()) == "b"
+    assert flight.executions == 2
+
+
+def test_errors_reach_every_waiter(flight):
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert [str(e) for e in errors] == ["upstream down"] * 3
+    assert flight.executions == 1
+
+
+def test_cancelled_waiter_does_not_cancel_the_call(flight):
+    async def load():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", load))
+        second = asyncio.ensure_future(flight.do("k", load))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_do_sync_across_threads(flight):
+    runs = []
+    results = []
+    start = threading.Barrier(8)
+
+    def load():
+        runs.append(1)
+        time.sleep(0.1)
+        return "rows"
+
+    def worker():
+        start.wait()
+        results.append(flight.do_sync("k", load))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["rows"] * 8
+    assert len(runs) == 1
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,37 @@
+# tests/test_tool_results.py
+import asyncio
+from datetime import datetime
+
+import numpy as np
+from fastmcp import Client, FastMCP
+
+from app.tools.results import json_result
+
+PAYLOAD = {"rows": [{"Data": datetime(2024, 3, 1, 9), "Sasia": np.float64(2.5)}], "total": np.int64(1)}
+
+
+def test_dict_results_carry_structured_content():
+    result = json_result(PAYLOAD)
+    assert result.structured_content == {"rows": [{"Data": "2024-03-01T09:00:00", "Sasia": 2.5}], "total": 1}
+    assert result.content[0].text == '{"rows":[{"Data":"2024-03-01T09:00:00","Sasia":2.5}],"total":1}'
+
+
+def test_list_results_are_text_only():
+    result = json_result([1, 2])
+    assert result.structured_content is None
+    assert result.content[0].text == "[1,2]"
+
+
+def test_structured_content_reaches_the_client():
+    server = FastMCP("test")
+
+    @server.tool
+    async def summary():
+        return json_result(PAYLOAD)
+
+    async def call():
+        async with Client(server) as client:
+            return await client.call_tool("summary")
+
+    result = asyncio.run(call())
+    assert result.structured_content == {"rows": [{"Data": "2024-03-01T09:00:00", "Sasia": 2.5}], "total": 1}
@@ -0,0 +1,161 @@
+# tests/test_transactions_mirror.py
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.repositories.transactions_store import TransactionStore
+from app.services.analytics import _cubes_apply
+from app.services import sales, transactions_mirror
+from app.services.transactions_mirror import ensure_sync_started, last_closed_day, load_mirrored, mirror_applies
+
+
+def rows_for(day: date, n: int = 3):
+    return [
+        {"ID": day.toordinal() * 10 + k, "Data": datetime(day.year, day.month, day.day, 9 + k),
+         "Numri": f"F{k}", "ID_Konsumatorit": k, "Konsumatori": f"Klienti {k}", "Komercialisti": "Agjent",
+         "Statusi_Faturimit": "Faturuar", "Shifra": f"A{k}", "Emertimi": "Artikull", "Njesia_Artik": "copë",
+         "Sasia": float(k + 1), "Cmimi": 2.5}
+        for k in range(n)
+    ]
+
+
+def rows_between(start: date, end: date):
+    return [row for n in range((end - start).days + 1) for row in rows_for(start + timedelta(days=n))]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = TransactionStore(str(tmp_path / "transactions.sqlite3"))
+    monkeypatch.setattr(transactions_mirror, "get_transaction_store", lambda: store)
+    monkeypatch.setattr(settings, "mirror_enabled", True)
+    yield store
+    store.close()
+
+
+def test_saved_days_are_covered_until_marked_dirty(store):
+    start, end = date(2024, 3, 1), date(2024, 3, 5)
+    store.save_days(2, start, end, rows_between(start, end))
+    assert store.covered_days(2, date(2024, 2, 28), date(2024, 3, 10)) == {
+        start + timedelta(days=n) for n in range(5)
+    }
+    assert store.covered_days(1, start, end) == set()  # per transaction type
+    assert store.mark_dirty(2, date(2024, 3, 2), date(2024, 3, 3)) == 2
+    assert store.covered_days(2, start, end) == {date(2024, 3, 1), date(2024, 3, 4), date(2024, 3, 5)}
+    assert store.dirty_days(2) == [date(2024, 3, 2), date(2024, 3, 3)]
+
+
+def test_empty_day_is_covered_and_rows_round_trip(store):
+    day = date(2024, 3, 1)
+    store.save_days(2, day, day + timedelta(days=1), rows_for(day))  # the 2nd had no sales
+    assert store.covered_days(2, day, day + timedelta(days=1)) == {day, day + timedelta(days=1)}
+    assert store.query(2, day, day + timedelta(days=1)) == rows_for(day)
+
+
+def test_cube_matches_rows(store):
+    start, end = date(2024, 3, 1), date(2024, 3, 10)
+    store.save_days(2, start, end, rows_between(start, end))
+    (month,) = store.cube(2, start, end, ["month"])
+    rows = store.query(2, start, end)
+    assert month == ("2024-03", len(rows), sum(r["Sasia"] for r in rows),
+                     pytest.approx(sum(r["Sasia"] * r["Cmimi"] for r in rows)))
+    assert sorted(store.cube(2, start, end, ["Shifra"]))[0][:2] == ("A0", 10)
+
+
+def test_load_mirrored_writes_back_closed_days_only(store):
+    end = date.today()
+    start = end - timedelta(days=9)
+    calls = []
+
+    async def fetch(from_date, to_date):
+        calls.append((from_date, to_date))
+        return rows_between(date.fromisoformat(from_date), date.fromisoformat(to_date))
+
+    first = asyncio.run(load_mirrored(2, start.isoformat(), end.isoformat(), fetch))
+    assert calls == [(start.isoformat(), end.isoformat())]
+    closed = last_closed_day()
+    assert store.covered_days(2, start, end) == {start + timedelta(days=n) for n in range((closed - start).days + 1)}
+
+    calls.clear()
+    second = asyncio.run(load_mirrored(2, start.isoformat(), end.isoformat(), fetch))
+    assert calls == [((closed + timedelta(days=1)).isoformat(), end.isoformat())]  # open days only
+    assert second == first == rows_between(start, end)
+
+
+def test_fields_read_only_those_columns(store):
+    end = date.today()
+    start = end - timedelta(days=9)
+
+    async def fetch(from_date, to_date):
+        return rows_between(date.fromisoformat(from_date), date.fromisoformat(to_date))
+
+    fields = ("Shifra", "Data")
+    expected = [{k: row[k] for k in fields} for row in rows_between(start, end)]
+    assert asyncio.run(load_mirrored(2, start.isoformat(), end.isoformat(), fetch, fields)) == expected
+    assert asyncio.run(load_mirrored(2, start.isoformat(), end.isoformat(), fetch, fields)) == expected
+    assert store.query(2, start, start, ["Sasia"]) == [{"Sasia": float(k + 1)} for k in range(3)]
+
+
+def test_unmirrored_range_comes_back_as_the_erp_sent_it(store):
+    today = date.today()
+    lines = rows_for(today, 3)
+    for row in lines:
+        row["ID"] = 42  # line items of one document
+    lines.reverse()
+
+    async def fetch(from_date, to_date):
+        return list(lines)
+
+    assert asyncio.run(load_mirrored(2, today.isoformat(), today.isoformat(), fetch)) == lines
+
+
+def test_short_unmirrored_frame_is_streamed(store, monkeypatch):
+    today = date.today().isoformat()
+
+    async def stream(*args, **kwargs):
+        yield rows_for(date.today())
+
+    async def materialize(*args):
+        raise AssertionError("materialized instead of streamed")
+
+    monkeypatch.setattr(sales, "aiter_sales", stream)
+    monkeypatch.setattr(sales, "_load_sales_async", materialize)
+    frame = asyncio.run(sales._load_sales_frame_async(today, today, 2, None, None, None))
+    assert len(frame) == 3
+
+
+def test_filtered_queries_never_use_the_mirror(monkeypatch):
+    monkeypatch.setattr(settings, "mirror_enabled", True)
+    assert mirror_applies(2, "2024-01-01", "2024-01-31")
+    assert not mirror_applies(2, "2024-01-01", "2024-01-31", item_id="A1")
+    assert not mirror_applies(2, "2024-01-01", "2024-01-31", item_name="qumësht")
+    assert not mirror_applies(2, "2024-01-01", "2024-01-31", partner_name="Klienti")
+    assert not mirror_applies(2, "2024-01-31", "2024-01-01")
+    assert not mirror_applies(2, "bad", "2024-01-01")
+
+
+def test_only_mirrored_types_use_the_mirror(monkeypatch):
+    monkeypatch.setattr(settings, "mirror_enabled", True)
+    monkeypatch.setattr(settings, "mirror_transaction_types", "1,2")
+    assert mirror_applies(1, "2024-01-01", "2024-01-31")
+    assert not mirror_applies(7, "2024-01-01", "2024-01-31")
+    assert _cubes_apply(2, "2024-01-01", "2024-01-31", ["month"], None, None, None)
+    assert not _cubes_apply(7, "2024-01-01", "2024-01-31", ["month"], None, None, None)
+
+
+def test_backfill_sync_is_opt_in(monkeypatch):
+    monkeypatch.setattr(settings, "mirror_enabled", True)
+    monkeypatch.setattr(transactions_mirror, "_sync_task", None)
+
+    async def start():
+        ensure_sync_started()
+        task = transactions_mirror._sync_task
+        if task is not None:
+            task.cancel()
+        return task
+
+    monkeypatch.setattr(settings, "mirror_sync", False)
+    assert asyncio.run(start()) is None
+    monkeypatch.setattr(settings, "mirror_sync", True)
+    assert asyncio.run(start()) is not None